@@ -0,0 +1,228 @@
+"""
+ASGI entry point: the same API, with every request run on the database executor
+
+    uvicorn asgi:app --port 5001 --workers 2
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+Run from backend/. The event loop only moves bytes; each request is handed
+to repo/db_executor.py as a whole. Writes to shops and equipment run on
+the writer thread of the database they change, and everything else runs
+on the reader threads. Thousands of idle or slow clients then cost a
+coroutine each instead of a worker thread, and writes to one file queue
+in order instead of contending for SQLite's lock.
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+
+from server import app as flask_app
+from db_executor import db_executor, ExecutorBusyError
+from write_queue import is_enabled as write_queue_enabled
+from connection_pool import close_all_connections
+
+# Writes under these prefixes go to that database's writer thread. Auth
+# writes stay on the readers: their cost is password hashing, which would
+# otherwise queue behind one thread, and their rare writes are small.
+WRITER_FOR_PREFIX = (
+    ("/api/shops", "shop_spaces"),
+    ("/api/equipment", "equipment"),
+)
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Request bodies are read into memory before dispatch
+MAX_BODY_BYTES = int(os.environ.get("ASGI_MAX_BODY_BYTES", 16 * 1024 * 1024))
+
+# Response chunks buffered between a database thread and the event loop
+STREAM_BUFFER_CHUNKS = 8
+
+
+def writer_for(method, path):
+    """Database whose writer thread should serve this request, or None for the readers"""
+    if method not in WRITE_METHODS or write_queue_enabled():
+        # With the write queue on, its writer threads order and batch the
+        # writes; holding one request per file here would leave nothing to batch
+        return None
+    for prefix, database in WRITER_FOR_PREFIX:
+        if path == prefix or path.startswith(prefix + "/"):
+            return database
+    return None
+
+
+def _wsgi_environ(scope, body):
+    """Build a WSGI environ for an ASGI HTTP scope and its fully read body"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client")
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0] if client else "",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                   + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class _Abandoned(Exception):
+    """The client went away; stop producing the response"""
+
+
+class AsgiApp:
+    """
+    Serve a WSGI app over ASGI, running each request on a DatabaseExecutor thread
+
+    Args:
+        wsgi_app (callable): The Flask app (or any WSGI app)
+        executor (DatabaseExecutor): Where requests run; the process-wide one by default
+    """
+
+    def __init__(self, wsgi_app, executor=db_executor):
+        self.wsgi_app = wsgi_app
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type '{scope['type']}'")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                close_all_connections()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > MAX_BODY_BYTES:
+                await _send_json(send, 413, {"error": "Request body too large"})
+                return
+            if not message.get("more_body", False):
+                break
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=STREAM_BUFFER_CHUNKS)
+        abandoned = threading.Event()
+        try:
+            future = self.executor.submit(
+                self._run_wsgi, _wsgi_environ(scope, b"".join(chunks)), loop, queue, abandoned,
+                database=writer_for(scope["method"], scope["path"])
+            )
+        except ExecutorBusyError as e:
+            await _send_json(send, 503, {"error": str(e)}, [(b"retry-after", b"1")])
+            return
+
+        done = asyncio.wrap_future(future)
+        started = False
+
+        async def forward(item):
+            nonlocal started
+            kind, *payload = item
+            if kind == "start":
+                await send({"type": "http.response.start", "status": payload[0], "headers": payload[1]})
+                started = True
+            else:
+                await send({"type": "http.response.body", "body": payload[0], "more_body": True})
+
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, done}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                await forward(getter.result())
+            # The thread has finished; everything it produced is already queued
+            while not queue.empty():
+                await forward(queue.get_nowait())
+            error = done.exception()
+            if error is not None and not started:
+                await _send_json(send, 500, {"error": str(error)})
+                return
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except BaseException:
+            # Client gone or task cancelled: let the thread stop at its next chunk
+            abandoned.set()
+            while not done.done():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    await asyncio.sleep(0.01)
+            raise
+
+    def _run_wsgi(self, environ, loop, queue, abandoned):
+        """Run the WSGI app on this database thread, handing the response to the event loop"""
+        def emit(item):
+            if abandoned.is_set():
+                raise _Abandoned()
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ]
+            return lambda data: emit(("body", data))
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            emit(("start", response["status"], response["headers"]))
+            for chunk in result:
+                if chunk:
+                    emit(("body", chunk))
+        except _Abandoned:
+            pass
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+
+app = AsgiApp(flask_app)
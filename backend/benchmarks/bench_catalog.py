@@ -0,0 +1,80 @@
+"""
+Catalog read benchmark: cached vs uncached
+
+Fills a throwaway equipment database with a catalog of the given size and
+times the full catalog listing and single-type lookups, once straight from
+SQLite and once through the in-memory catalog cache.
+
+Usage (from backend/):
+    python benchmarks/bench_catalog.py [--types 5000] [--repeat 200]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "repo"))
+
+import equipment_library_db
+from connection_pool import close_all_connections
+
+
+def _uncached_catalog():
+    with equipment_library_db._connect() as conn:
+        rows = conn.execute("SELECT * FROM equipment_types ORDER BY equipment_name").fetchall()
+        return [dict(row) for row in rows]
+
+
+def _uncached_type(equipment_type_id):
+    with equipment_library_db._connect() as conn:
+        row = conn.execute("SELECT * FROM equipment_types WHERE id = ?", (equipment_type_id,)).fetchone()
+        return dict(row) if row else None
+
+
+def _time(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(types, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        equipment_library_db.DB_PATH = Path(tmp) / "equipment.db"
+        with equipment_library_db._connect() as conn:
+            conn.executemany(
+                """INSERT INTO equipment_types (equipment_name, description, width, height, depth,
+                                                maintenance_interval_days, manufacturer, model)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(f"Tool {i:05d}", "Benchmark tool", 10 + i % 50, 30, 10 + i % 40, 90, f"Maker {i % 40}", f"M-{i}")
+                 for i in range(types)]
+            )
+            conn.commit()
+        ids = [random.randint(1, types) for _ in range(repeat)]
+        lookups = iter(ids * 2)
+
+        equipment_library_db.get_equipment_catalog()  # warm the cache
+        results = [
+            ("full catalog, uncached", _time(_uncached_catalog, repeat)),
+            ("full catalog, cached", _time(equipment_library_db.get_equipment_catalog, repeat)),
+            ("type by id, uncached", _time(lambda: _uncached_type(next(lookups)), repeat)),
+            ("type by id, cached", _time(lambda: equipment_library_db.get_equipment_type_by_id(next(lookups)), repeat)),
+        ]
+
+        print(f"{types} equipment types, {repeat} calls each")
+        print(f"{'operation':<26}{'us/call':>12}")
+        for label, micros in results:
+            print(f"{label:<26}{micros:>12.1f}")
+        print(equipment_library_db.catalog_cache_stats())
+        equipment_library_db._catalog_cache.close()
+        close_all_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--types", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.types, args.repeat)
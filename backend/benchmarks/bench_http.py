@@ -0,0 +1,135 @@
+"""
+HTTP load test for the shop GET and PUT routes
+
+Registers a throwaway user with one shop on a running server, then drives
+GET /api/shops/<id> and PUT /api/shops/<id> from many client threads over
+keep-alive connections. Prints requests per second and latency
+percentiles per route, so the dev server and gunicorn can be compared on
+the same machine.
+
+Usage (from backend/, with the server already running):
+    python server.py                                  # dev server, port 5001
+    gunicorn -c gunicorn.conf.py wsgi:app             # or the production stack
+    python benchmarks/bench_http.py [--url http://127.0.0.1:5001] [--seconds 10] [--concurrency 16] [--put-ratio 0.2]
+
+The shop is deleted afterwards; the bench_<timestamp> user stays behind.
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class Client:
+    """One keep-alive HTTP connection, reopened if the server drops it"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.getheader("Connection", "").lower() == "close":
+                    self.conn.close()
+                    self.conn = None
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+def _setup(url):
+    client = Client(url)
+    username = f"bench_{int(time.time() * 1000)}"
+    status, _ = client.request("POST", "/api/auth/register", {
+        "username": username, "name": "Bench User", "email": f"{username}@example.com", "password": "bench-password"
+    })
+    assert status == 201, f"register failed with {status}"
+    status, data = client.request("POST", "/api/shops/", {
+        "username": username, "shop_name": "BenchShop", "length": 40, "width": 30, "height": 10
+    })
+    assert status == 201, f"create shop failed with {status}"
+    return json.loads(data)["shop"]["shop_id"]
+
+
+def _worker(url, shop_id, put_ratio, deadline, results, lock):
+    client = Client(url)
+    local = {"GET": [], "PUT": []}
+    statuses = {}
+    while time.perf_counter() < deadline:
+        method = "PUT" if random.random() < put_ratio else "GET"
+        body = {"length": random.randint(20, 60)} if method == "PUT" else None
+        start = time.perf_counter()
+        try:
+            status, _ = client.request(method, f"/api/shops/{shop_id}", body)
+        except (OSError, http.client.HTTPException):
+            status = "connection error"
+        local[method].append(time.perf_counter() - start)
+        key = f"{method} {status}"
+        statuses[key] = statuses.get(key, 0) + 1
+    with lock:
+        for method, latencies in local.items():
+            results["latencies"][method].extend(latencies)
+        for key, count in statuses.items():
+            results["statuses"][key] = results["statuses"].get(key, 0) + count
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run(url, seconds, concurrency, put_ratio):
+    shop_id = _setup(url)
+    results = {"latencies": {"GET": [], "PUT": []}, "statuses": {}}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_worker, args=(url, shop_id, put_ratio, deadline, results, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    Client(url).request("DELETE", f"/api/shops/{shop_id}")
+
+    print(f"{url}: {concurrency} clients for {elapsed:.1f}s, {put_ratio:.0%} PUT")
+    print(f"{'route':<24}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    total = 0
+    for method, latencies in results["latencies"].items():
+        if not latencies:
+            continue
+        latencies.sort()
+        total += len(latencies)
+        print(f"{method + ' /api/shops/<id>':<24}{len(latencies):>10}{len(latencies) / elapsed:>10.0f}"
+              f"{statistics.median(latencies) * 1000:>10.1f}{_percentile(latencies, 0.95) * 1000:>10.1f}"
+              f"{_percentile(latencies, 0.99) * 1000:>10.1f}")
+    print(f"{'total':<24}{total:>10}{total / elapsed:>10.0f}")
+    print("responses:", dict(sorted(results["statuses"].items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--put-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.url, args.seconds, args.concurrency, args.put_ratio)
@@ -0,0 +1,71 @@
+"""
+Login throughput benchmark for the password hashers
+
+Runs concurrent logins against a throwaway users database for a range of
+hasher costs and prints per-login latency and logins per second, so the
+cost settings in password_hashing.py can be chosen against real numbers.
+
+Usage (from backend/):
+    python benchmarks/bench_login.py [--logins 200] [--threads 16]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "repo"))
+
+import password_hashing
+import users_functions
+from password_hashing import ScryptHasher, Pbkdf2Hasher
+from connection_pool import close_all_connections
+
+CONFIGS = [
+    ("pbkdf2_sha256 100k", Pbkdf2Hasher(iterations=100000)),
+    ("pbkdf2_sha256 600k", Pbkdf2Hasher(iterations=600000)),
+    ("scrypt n=2^13", ScryptHasher(n=2 ** 13)),
+    ("scrypt n=2^14", ScryptHasher(n=2 ** 14)),
+    ("scrypt n=2^15", ScryptHasher(n=2 ** 15)),
+]
+
+
+def _timed_login(username, password):
+    start = time.perf_counter()
+    user = users_functions.auth_user(username, password)
+    assert user is not None, "login failed"
+    return time.perf_counter() - start
+
+
+def run(logins, threads):
+    print(f"{logins} logins, {threads} client threads, {password_hashing.hashing_pool.workers} hashing workers")
+    print(f"{'hasher':<22}{'p50 ms':>10}{'p95 ms':>10}{'logins/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        users_functions.DB_PATH = Path(tmp) / "users.db"
+        for i, (label, hasher) in enumerate(CONFIGS):
+            password_hashing.set_hasher(hasher)
+            username = f"bench{i}"
+            users_functions.add_user(username, "Bench", f"{username}@example.com", "benchmark-password")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as clients:
+                latencies = list(clients.map(
+                    lambda _: _timed_login(username, "benchmark-password"), range(logins)
+                ))
+            elapsed = time.perf_counter() - start
+
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+            print(f"{label:<22}{p50:>10.1f}{p95:>10.1f}{logins / elapsed:>12.1f}")
+        close_all_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    run(args.logins, args.threads)
@@ -0,0 +1,53 @@
+# gunicorn settings for the Set Up Shop API
+#
+#     gunicorn -c gunicorn.conf.py wsgi:app        (from backend/)
+#
+# Worker model: a few processes, each with a pool of threads (gthread).
+# SQLite in WAL mode lets any number of readers run alongside one writer
+# per database file, and the sqlite3 module releases the GIL while a query
+# runs, so threads give cheap read concurrency inside a process while extra
+# processes add CPU for JSON encoding and password hashing. More processes
+# than cores only adds writers queueing on the same file lock (each waits
+# up to busy_timeout), so workers default to the core count, capped at 4.
+#
+# Every setting can be overridden with the environment variables below.
+#
+# Graceful reload: `kill -HUP <master pid>` starts new workers with fresh
+# code and lets the old ones finish in-flight requests (graceful_timeout).
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")
+
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", min(4, multiprocessing.cpu_count())))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Each thread keeps one pooled connection per database file; a request
+# waiting on the SQLite write lock can block for the 5 s busy_timeout, so
+# the worker timeout must stay well above it.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot accumulate; the jitter
+# keeps them from restarting together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 500))
+
+# Import the app in each worker rather than in the master: SQLite
+# connections and the catalog cache watcher must never cross a fork
+preload_app = False
+
+# Development convenience: restart workers when code changes
+reload = os.environ.get("GUNICORN_RELOAD") == "1"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def worker_exit(server, worker):
+    """Close this worker's pooled SQLite connections on shutdown"""
+    from connection_pool import close_all_connections
+    close_all_connections()
@@ -5,7 +5,9 @@ from pathlib import Path
 # Add repo directory to Python path
 sys.path.append(str(Path(__file__).parent.parent.parent / "repo"))
 
-from users_functions import add_user, auth_user, get_user_by_id, check_usernames
+from users_functions import add_user, auth_user, get_user_by_id, check_usernames_page
+from users_functions import search_users as search_user_index
+from password_hashing import HashingBusyError
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -34,6 +36,8 @@ def register():
         else:
             return jsonify({"error": "Failed to create user"}), 500
 
+    except HashingBusyError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -60,6 +64,8 @@ def login():
         else:
             return jsonify({"error": "Invalid credentials"}), 401
 
+    except HashingBusyError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -79,16 +85,33 @@ def get_user(user_id):
 
 @auth_bp.route('/search', methods=['GET'])
 def search_users():
-    """Search users by username or name"""
+    """
+    Search users by username or name
+
+    ?mode=contains (default) ranks matches anywhere, ?mode=prefix autocompletes
+    usernames, ?limit= caps either; ?mode=browse (or a cursor) pages through every
+    match in username order.
+    """
     try:
         search_term = request.args.get('q', '')
 
         if not search_term:
             return jsonify({"error": "Search term required"}), 400
 
-        users = check_usernames(search_term)
+        mode = request.args.get('mode', 'contains')
+        if mode == 'browse' or 'cursor' in request.args:
+            page = check_usernames_page(
+                search_term,
+                limit=request.args.get('limit'),
+                cursor=request.args.get('cursor')
+            )
+            return jsonify(page), 200
+
+        users = search_user_index(search_term, limit=request.args.get('limit'), mode=mode)
 
         return jsonify({"users": users}), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -7,25 +7,56 @@ sys.path.append(str(Path(__file__).parent.parent.parent / "repo"))
 
 from equipment_library_db import (
     get_equipment_catalog,
+    search_equipment_catalog,
     get_equipment_type_by_id,
     add_equipment_type,
     get_equipment_by_user,
+    get_user_equipment_page,
     add_equipment_to_user,
+    bulk_add_equipment_to_user,
     get_user_equipment_by_id,
     perform_maintenance,
     delete_user_equipment,
-    get_maintenance_summary
+    get_maintenance_summary,
+    get_maintenance_summaries,
+    get_catalog_version,
+    iter_all_user_equipment
 )
+from routes.http_cache import make_etag, not_modified, with_etag
+from routes.streaming import stream_list, iter_upload_rows
 
 equipment_bp = Blueprint('equipment', __name__)
 
 # Equipment Catalog Routes
 @equipment_bp.route('/catalog', methods=['GET'])
 def get_catalog():
-    """Get all available equipment types"""
+    """
+    Get equipment types (supports If-None-Match)
+
+    With any of ?q=&manufacturer=&max_width=&max_depth=&limit= the catalog is
+    searched and filtered server-side; without them every type is returned.
+    """
     try:
-        catalog = get_equipment_catalog()
-        return jsonify({"equipment": catalog}), 200
+        search_params = ('q', 'manufacturer', 'max_width', 'max_depth', 'limit')
+        searching = any(name in request.args for name in search_params)
+        etag = make_etag("catalog", get_catalog_version(), request.query_string.decode() if searching else "")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        if searching:
+            catalog = search_equipment_catalog(
+                q=request.args.get('q'),
+                manufacturer=request.args.get('manufacturer'),
+                max_width=request.args.get('max_width'),
+                max_depth=request.args.get('max_depth'),
+                limit=request.args.get('limit')
+            )
+        else:
+            catalog = get_equipment_catalog()
+        return with_etag(jsonify({"equipment": catalog}), etag), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -61,10 +92,27 @@ def add_catalog_equipment():
 # User Equipment Routes
 @equipment_bp.route('/user/<int:user_id>', methods=['GET'])
 def get_user_equipment(user_id):
-    """Get all equipment owned by a user"""
+    """Get all equipment owned by a user, or one page of it with ?limit=&cursor="""
     try:
+        if 'limit' in request.args or 'cursor' in request.args:
+            page = get_user_equipment_page(
+                user_id,
+                limit=request.args.get('limit'),
+                cursor=request.args.get('cursor')
+            )
+            return jsonify(page), 200
         equipment = get_equipment_by_user(user_id)
         return jsonify({"equipment": equipment}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@equipment_bp.route('/user-equipment', methods=['GET'])
+def stream_all_user_equipment():
+    """Stream equipment owned by every user (JSON, or NDJSON with Accept: application/x-ndjson)"""
+    try:
+        return stream_list("equipment", iter_all_user_equipment())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -86,6 +134,17 @@ def add_user_equipment(user_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@equipment_bp.route('/user/<int:user_id>/bulk', methods=['POST'])
+def bulk_add_user_equipment(user_id):
+    """Add many pieces of equipment from a CSV, NDJSON or JSON upload ({"items": [...]})"""
+    try:
+        result = bulk_add_equipment_to_user(user_id, iter_upload_rows("items"))
+        return jsonify(result), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @equipment_bp.route('/<int:equipment_id>', methods=['GET'])
 def get_equipment(equipment_id):
     """Get specific equipment instance"""
@@ -129,6 +188,32 @@ def record_maintenance(equipment_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@equipment_bp.route('/user/<int:user_id>/maintenance-summary', methods=['GET'])
+def get_user_maintenance_summary(user_id):
+    """Get maintenance counts for a user"""
+    try:
+        summary = get_maintenance_summary(user_id)
+        return jsonify(summary), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@equipment_bp.route('/maintenance-summaries', methods=['GET'])
+def get_fleet_maintenance_summaries():
+    """Get maintenance counts for many users, e.g. ?user_ids=1,2,3"""
+    try:
+        raw_ids = request.args.get('user_ids', '')
+        try:
+            user_ids = [int(part) for part in raw_ids.split(',') if part.strip()]
+        except ValueError:
+            return jsonify({"error": "user_ids must be a comma-separated list of integers"}), 400
+
+        if not user_ids:
+            return jsonify({"error": "user_ids is required"}), 400
+
+        summaries = get_maintenance_summaries(user_ids)
+        return jsonify({"summaries": summaries}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 @equipment_bp.route('/maintenance-schedule/<int:user_id>', methods=['GET'])
 def get_maintenance_schedule_route(user_id):
@@ -0,0 +1,28 @@
+# Helpers for ETag / If-None-Match handling on GET routes
+import hashlib
+from flask import request, Response
+
+
+def make_etag(*parts):
+    """Build an opaque ETag value from version parts"""
+    raw = ":".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def not_modified(etag):
+    """
+    Return a 304 response if the client already has this ETag, else None
+
+    Call this with a cheaply computed version before loading the full payload.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        return with_etag(response, etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Attach the ETag and ask clients to revalidate on every use"""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,192 @@
+# Opt-in request profiling: wall time, SQLite work and JSON encoding per request
+#
+# init_instrumentation(app) adds before/after_request hooks that collect
+# query_metrics for the request, report it in a Server-Timing header and
+# fold it into per-route histograms served by GET /api/debug/metrics.
+# Streamed responses are written after after_request runs, so only the work
+# done before the first byte is counted for them.
+import threading
+import time
+from flask import Blueprint, current_app, g, has_request_context, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+import query_metrics
+
+# Upper bounds (ms) of the request time histogram buckets; slower requests land in "+Inf"
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Statements listed by GET /api/debug/metrics, slowest total first
+TOP_STATEMENTS = 20
+
+debug_bp = Blueprint("debug", __name__)
+
+
+class RouteMetrics:
+    """Totals and a request time histogram for one route"""
+
+    __slots__ = ("requests", "wall_ms", "max_wall_ms", "queries", "db_ms", "rows", "json_ms", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.wall_ms = 0.0
+        self.max_wall_ms = 0.0
+        self.queries = 0
+        self.db_ms = 0.0
+        self.rows = 0
+        self.json_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, wall_ms, stats, json_ms):
+        self.requests += 1
+        self.wall_ms += wall_ms
+        self.max_wall_ms = max(self.max_wall_ms, wall_ms)
+        self.queries += stats.queries
+        self.db_ms += stats.db_seconds * 1000
+        self.rows += stats.rows
+        self.json_ms += json_ms
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if wall_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def to_dict(self):
+        labels = [f"le_{bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + ["+Inf"]
+        per_request = max(self.requests, 1)
+        return {
+            "requests": self.requests,
+            "avg_wall_ms": round(self.wall_ms / per_request, 3),
+            "max_wall_ms": round(self.max_wall_ms, 3),
+            "avg_queries": round(self.queries / per_request, 2),
+            "avg_db_ms": round(self.db_ms / per_request, 3),
+            "avg_rows": round(self.rows / per_request, 2),
+            "avg_json_ms": round(self.json_ms / per_request, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class MetricsRegistry:
+    """Per-route and per-statement totals for one app, safe to update from many request threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._statements = {}  # sql -> [executions, seconds, rows]
+
+    def record(self, route, wall_ms, stats, json_ms):
+        with self._lock:
+            metrics = self._routes.get(route)
+            if metrics is None:
+                metrics = self._routes[route] = RouteMetrics()
+            metrics.add(wall_ms, stats, json_ms)
+            for sql, (executions, seconds, rows) in stats.statements.items():
+                total = self._statements.get(sql)
+                if total is None:
+                    total = self._statements[sql] = [0, 0.0, 0]
+                total[0] += executions
+                total[1] += seconds
+                total[2] += rows
+
+    def snapshot(self):
+        """
+        Get the collected metrics
+
+        Returns:
+            dict: 'routes' keyed by "METHOD /rule" and the slowest 'statements' by total time
+        """
+        with self._lock:
+            routes = {route: metrics.to_dict() for route, metrics in sorted(self._routes.items())}
+            slowest = sorted(self._statements.items(), key=lambda item: item[1][1], reverse=True)[:TOP_STATEMENTS]
+        return {
+            "routes": routes,
+            "statements": [
+                {"sql": " ".join(sql.split()), "executions": executions,
+                 "total_ms": round(seconds * 1000, 3), "rows": rows}
+                for sql, (executions, seconds, rows) in slowest
+            ],
+        }
+
+    def reset(self):
+        """Forget everything collected so far"""
+        with self._lock:
+            self._routes.clear()
+            self._statements.clear()
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, adding the time spent in dumps to the current request's profile"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            if has_request_context() and "profile_started" in g:
+                g.profile_json_seconds += time.perf_counter() - started
+
+
+def _start_profile():
+    if request.blueprint == debug_bp.name:
+        return  # reading the metrics should not show up in them
+    g.profile_started = time.perf_counter()
+    g.profile_json_seconds = 0.0
+    query_metrics.start()
+
+
+def _finish_profile(response):
+    stats = query_metrics.stop()
+    if stats is None or "profile_started" not in g:
+        return response
+    wall_ms = (time.perf_counter() - g.profile_started) * 1000
+    json_ms = g.profile_json_seconds * 1000
+    route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+    current_app.extensions["instrumentation"].record(route, wall_ms, stats, json_ms)
+    response.headers["Server-Timing"] = ", ".join((
+        f"app;dur={wall_ms:.2f}",
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries"',
+        f'rows;desc="{stats.rows}"',
+        f"json;dur={json_ms:.2f}",
+    ))
+    return response
+
+
+def _discard_profile(exc):
+    # after_request is skipped when a request fails outright; never leave a collection running
+    query_metrics.stop()
+
+
+@debug_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Per-route request histograms and the slowest SQL statements since startup (or the last reset)"""
+    return jsonify(current_app.extensions["instrumentation"].snapshot()), 200
+
+
+@debug_bp.route("/metrics", methods=["DELETE"])
+def reset_metrics():
+    """Clear collected metrics, e.g. before a load test"""
+    current_app.extensions["instrumentation"].reset()
+    return jsonify({"message": "Metrics reset"}), 200
+
+
+def init_instrumentation(app):
+    """
+    Turn on request profiling for app
+
+    Switches the connection pool to instrumented connections, times JSON
+    encoding, adds the request hooks and registers /api/debug/metrics.
+
+    Args:
+        app (Flask): Application to instrument, before it serves its first request
+
+    Returns:
+        MetricsRegistry: Where the app's metrics are collected
+    """
+    registry = app.extensions["instrumentation"] = MetricsRegistry()
+    query_metrics.enable()
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_discard_profile)
+    app.register_blueprint(debug_bp, url_prefix="/api/debug")
+    return registry
@@ -10,24 +10,62 @@ from shop_space_functions import (
     get_shop_space_by_id,
     get_shop_spaces_by_username,
     add_equipment_to_shop_space,
+    bulk_place_equipment,
     remove_equipment_from_shop_space,
-    update_shop_space_dimensions,
+    update_shop_space,
     update_equipment_position,
     delete_shop_space,
+    apply_layout_patch,
     get_all_shop_spaces,
+    iter_all_shop_spaces,
+    get_shop_spaces_page,
+    get_shop_conflicts,
+    get_shop_space_version,
+    get_shop_spaces_fingerprint,
+    PlacementConflictError,
+    ShopVersionConflictError,
 )
+from routes.http_cache import make_etag, not_modified, with_etag
+from routes.streaming import stream_list, wants_ndjson, iter_upload_rows
 from models.placement import Position, EquipmentPlacement
 from models.shop_size import ShopSize   # 👈 correct import
 
 shop_bp = Blueprint("shops", __name__)
 
 
+def _expected_version(data=None, key="version"):
+    """Shop version an edit is based on, from key in the JSON body or query string (None if absent)"""
+    raw = (data or {}).get(key, request.args.get(key))
+    if raw is None or raw == "":
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be an integer")
+
+
+def _version_conflict(e):
+    """409 telling the client to reload the shop and reapply its edit"""
+    return jsonify({"error": str(e), "current_version": e.current_version}), 409
+
+
 @shop_bp.route("/", methods=["GET"])
 def get_all_shops():
-    """Get all shop spaces"""
+    """Get all shop spaces (?limit=&cursor= for one page, ?stream=1 or NDJSON to stream them)"""
     try:
-        shops = get_all_shop_spaces()
-        return jsonify({"shops": shops}), 200
+        if request.args.get("stream") == "1" or wants_ndjson():
+            return stream_list("shops", iter_all_shop_spaces())
+
+        if "limit" in request.args or "cursor" in request.args:
+            page = get_shop_spaces_page(
+                limit=request.args.get("limit"),
+                cursor=request.args.get("cursor")
+            )
+            return jsonify(page), 200
+
+        return jsonify({"shops": get_all_shop_spaces()}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -108,8 +146,12 @@ def add_equipment_to_shop(shop_id):
         if any(coord is None for coord in [position.x, position.y, position.z]):
             return jsonify({"error": "All coordinates are required"}), 400
         
-        # Call function with clean interface (only 2 parameters!)
-        shop = add_equipment_to_shop_space(shop_id, placement)
+        # Optional server-side collision/clearance check
+        validate = data.get('validate') or request.args.get('validate')
+
+        shop = add_equipment_to_shop_space(
+            shop_id, placement, validate=validate, expected_version=_expected_version(data)
+        )
         
         if shop:
             return jsonify({
@@ -119,6 +161,27 @@ def add_equipment_to_shop(shop_id):
         else:
             return jsonify({"error": "Failed to add equipment"}), 500
             
+    except ShopVersionConflictError as e:
+        return _version_conflict(e)
+    except PlacementConflictError as e:
+        return jsonify({"error": str(e), "conflicts": e.conflicts}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@shop_bp.route('/<shop_id>/equipment/bulk', methods=['POST'])
+def bulk_add_equipment_to_shop(shop_id):
+    """Place many pieces of equipment from a CSV, NDJSON or JSON upload ({"placements": [...]})"""
+    try:
+        result = bulk_place_equipment(
+            shop_id,
+            iter_upload_rows("placements"),
+            validate=request.args.get('validate')
+        )
+        return jsonify(result), 200
+    except ShopVersionConflictError as e:
+        return _version_conflict(e)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -126,68 +189,126 @@ def add_equipment_to_shop(shop_id):
 
 @shop_bp.route('/<shop_id>', methods=['GET'])
 def get_shop(shop_id):
-    """Get shop space by ID"""
+    """Get shop space by ID (supports If-None-Match)"""
     try:
+        # Answer 304 from the version column alone, before loading placements
+        version = get_shop_space_version(shop_id)
+        if version is None:
+            return jsonify({"error": "Shop not found"}), 404
+        cached = not_modified(make_etag("shop", shop_id, version))
+        if cached:
+            return cached
+
         shop = get_shop_space_by_id(shop_id)
         if shop:
-            return jsonify({"shop": shop}), 200
+            response = jsonify({"shop": shop})
+            return with_etag(response, make_etag("shop", shop_id, shop['version'])), 200
         else:
             return jsonify({"error": "Shop not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@shop_bp.route('/<shop_id>/conflicts', methods=['GET'])
+def get_conflicts(shop_id):
+    """Get collisions and clearance problems for a shop"""
+    try:
+        conflicts = get_shop_conflicts(shop_id)
+        if conflicts is None:
+            return jsonify({"error": "Shop not found"}), 404
+        return jsonify(conflicts), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @shop_bp.route('/user/<username>', methods=['GET'])
 def get_user_shops(username):
-    """Get all shop spaces for a username"""
+    """Get shop spaces for a username (supports If-None-Match, or ?limit=&cursor= for one page)"""
     try:
+        if "limit" in request.args or "cursor" in request.args:
+            page = get_shop_spaces_page(
+                username=username,
+                limit=request.args.get("limit"),
+                cursor=request.args.get("cursor")
+            )
+            return jsonify(page), 200
+
+        etag = make_etag("user-shops", get_shop_spaces_fingerprint(username))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         shops = get_shop_spaces_by_username(username)
-        return jsonify({"shops": shops}), 200
+        return with_etag(jsonify({"shops": shops}), etag), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @shop_bp.route('/<shop_id>', methods=['PUT'])
 def update_shop_dimensions(shop_id):
-    """Update shop space dimensions and equipment positions"""
+    """Update shop space dimensions and equipment positions (409 if 'version' is given and stale)"""
     try:
         data = request.get_json()
+        expected_version = _expected_version(data)
+
+        updates = [
+            {
+                "equipment_id": eq_update.get('equipment_id'),
+                "x": eq_update.get('x'),
+                "y": eq_update.get('y'),
+                "z": eq_update.get('z', 0),
+                "rotation_deg": eq_update.get('rotation_deg', 0),
+            }
+            for eq_update in data.get('equipment_positions') or []
+            if eq_update.get('equipment_id') is not None
+        ]
 
-        # Update shop dimensions and name
-        shop = update_shop_space_dimensions(
+        # Dimensions, name and equipment positions commit (or conflict) together
+        shop, results = update_shop_space(
             shop_id,
             length=data.get('length'),
             width=data.get('width'),
             height=data.get('height'),
-            shop_name=data.get('shop_name')
+            shop_name=data.get('shop_name'),
+            equipment_positions=updates,
+            validate=data.get('validate'),
+            expected_version=expected_version
         )
 
         if not shop:
             return jsonify({"error": "Shop not found"}), 404
 
-        # Update equipment positions if provided
-        equipment_updates = data.get('equipment_positions')
-        if equipment_updates:
-            for eq_update in equipment_updates:
-                equipment_id = eq_update.get('equipment_id')
-                x = eq_update.get('x')
-                y = eq_update.get('y')
-                z = eq_update.get('z', 0)
-                rotation_deg = eq_update.get('rotation_deg', 0)
-
-                if equipment_id is not None:
-                    try:
-                        update_equipment_position(shop_id, equipment_id, x, y, z, rotation_deg=rotation_deg)
-                    except ValueError as e:
-                        # Log the error but don't fail the entire save
-                        print(f"Warning: Could not update equipment {equipment_id}: {e}")
-
-            # Refetch shop to get updated equipment positions
-            shop = get_shop_space_by_id(shop_id)
+        # Partial failures don't fail the entire save; report them instead
+        failed_updates = [r for r in results if not r['success']]
 
         return jsonify({
             "message": "Shop updated successfully",
-            "shop": shop
+            "shop": shop,
+            "failed_updates": failed_updates
         }), 200
 
+    except ShopVersionConflictError as e:
+        return _version_conflict(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@shop_bp.route('/<shop_id>/layout', methods=['PATCH'])
+def patch_shop_layout(shop_id):
+    """Apply move/rotate/add/remove operations to a shop at 'base_version'; returns only what changed"""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = apply_layout_patch(
+            shop_id,
+            data.get('operations'),
+            _expected_version(data, "base_version"),
+            validate=data.get('validate') or request.args.get('validate')
+        )
+        return with_etag(jsonify(result), make_etag("shop", shop_id, result['version'])), 200
+    except ShopVersionConflictError as e:
+        return _version_conflict(e)
+    except PlacementConflictError as e:
+        return jsonify({"error": str(e), "conflicts": e.conflicts}), 409
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -211,7 +332,7 @@ def delete_shop(shop_id):
 def remove_equipment_from_shop(shop_id, equipment_id):
     """Remove equipment from shop space"""
     try:
-        shop = remove_equipment_from_shop_space(shop_id, equipment_id)
+        shop = remove_equipment_from_shop_space(shop_id, equipment_id, expected_version=_expected_version())
 
         if shop:
             return jsonify({
@@ -221,6 +342,8 @@ def remove_equipment_from_shop(shop_id, equipment_id):
         else:
             return jsonify({"error": "Shop not found"}), 404
 
+    except ShopVersionConflictError as e:
+        return _version_conflict(e)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
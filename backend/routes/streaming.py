@@ -0,0 +1,89 @@
+# Helpers for streaming large lists and uploads without building them in memory
+import csv
+import io
+import json
+from flask import request, Response, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_ndjson():
+    """True if the client prefers newline-delimited JSON over a JSON document"""
+    best = request.accept_mimetypes.best_match([NDJSON_MIMETYPE, "application/json"])
+    return best == NDJSON_MIMETYPE
+
+
+def _json_chunks(key, items):
+    """Yield {"<key>": [item, item, ...]} one item at a time"""
+    yield '{"%s": [' % key
+    first = True
+    for item in items:
+        if not first:
+            yield ","
+        yield json.dumps(item, default=str)
+        first = False
+    yield "]}"
+
+
+def _ndjson_chunks(items):
+    """Yield one JSON document per line"""
+    for item in items:
+        yield json.dumps(item, default=str) + "\n"
+
+
+def stream_list(key, items):
+    """
+    Stream an iterable of dicts as a JSON object or NDJSON
+
+    Items are serialized one at a time as the response is written, so peak
+    memory stays at one row however many rows the iterator produces.
+
+    Args:
+        key (str): Top-level key wrapping the array in JSON mode
+        items (iterable): Lazily produced JSON-serializable dicts
+
+    Returns:
+        Response: Streamed response; NDJSON if the Accept header asks for it
+    """
+    if wants_ndjson():
+        chunks, mimetype = _ndjson_chunks(items), NDJSON_MIMETYPE
+    else:
+        chunks, mimetype = _json_chunks(key, items), "application/json"
+    return Response(stream_with_context(chunks), mimetype=mimetype)
+
+
+def iter_upload_rows(list_key="items"):
+    """
+    Yield rows from the request body as they are read
+
+    CSV (text/csv, first line is the header) and NDJSON are parsed straight
+    off the request stream one line at a time. A JSON body is accepted too,
+    either a list or an object holding the list under list_key, but is
+    parsed whole.
+
+    Args:
+        list_key (str): Key holding the rows in a JSON object body
+
+    Yields:
+        One row: a dict of strings for CSV; JSON rows as parsed, which the
+        caller must check are objects
+    """
+    mimetype = request.mimetype
+    if mimetype in ("text/csv", "application/csv"):
+        text = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+        yield from csv.DictReader(text)
+    elif mimetype == NDJSON_MIMETYPE:
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    raise ValueError(f"Invalid NDJSON line: {line[:80]!r}")
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get(list_key)
+        if not isinstance(data, list):
+            raise ValueError(f"Expected CSV, NDJSON or a JSON list under '{list_key}'")
+        yield from data
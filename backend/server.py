@@ -1,5 +1,6 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import os
 import sys
 from pathlib import Path
 
@@ -24,24 +25,67 @@ from shop_space_functions import (
     update_shop_space_dimensions,
     delete_shop_space
 )
-
-app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
+from connection_pool import pool_stats
+from identity_cache import identity_cache_stats
+from password_hashing import hashing_stats
+from equipment_library_db import catalog_cache_stats
+from db_executor import db_executor_stats
+from write_queue import write_queue_stats
 
 # Health check endpoint
-@app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "ok", "message": "Set Up Shop API is running"}), 200
+    return jsonify({
+        "status": "ok",
+        "message": "Set Up Shop API is running",
+        "db_pool": pool_stats(),
+        "identity_cache": identity_cache_stats(),
+        "password_hashing": hashing_stats(),
+        "catalog_cache": catalog_cache_stats(),
+        "db_executor": db_executor_stats(),
+        "write_queue": write_queue_stats()
+    }), 200
+
+
+def create_app(profiling=None):
+    """
+    Build the Flask application
+
+    The module-level app below is built with it once at import; the dev
+    server, wsgi.py and asgi.py serve that app.
+
+    Args:
+        profiling (bool, optional): Turn on request profiling; defaults to REQUEST_PROFILING=1
+
+    Returns:
+        Flask: Configured application
+    """
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for React frontend
+
+    app.add_url_rule('/api/health', 'health_check', health_check, methods=['GET'])
+
+    # Import routes
+    from routes.auth_routes import auth_bp
+    from routes.equipment_routes import equipment_bp
+    from routes.shop_routes import shop_bp
+
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(equipment_bp, url_prefix='/api/equipment')
+    app.register_blueprint(shop_bp, url_prefix='/api/shops')
+
+    # Opt-in profiling: Server-Timing headers and /api/debug/metrics
+    if profiling is None:
+        profiling = os.environ.get('REQUEST_PROFILING') == '1'
+    if profiling:
+        from routes.instrumentation import init_instrumentation
+        init_instrumentation(app)
+
+    return app
 
-# Import routes
-from routes.auth_routes import auth_bp
-from routes.equipment_routes import equipment_bp
-from routes.shop_routes import shop_bp
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(equipment_bp, url_prefix='/api/equipment')
-app.register_blueprint(shop_bp, url_prefix='/api/shops')
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    # Single-process development server with the debugger; use wsgi.py behind gunicorn in production
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1', port=int(os.environ.get('PORT', 5001)), threaded=True)
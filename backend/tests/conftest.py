@@ -0,0 +1,112 @@
+"""
+Shared fixtures for backend tests
+Provides throwaway copies of the three SQLite databases so tests do not
+touch the real files in db/
+"""
+import pytest
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Add repo and backend to path
+sys.path.insert(0, str(PROJECT_ROOT / "repo"))
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+
+@pytest.fixture
+def temp_dbs(tmp_path, monkeypatch):
+    """Point every repo module at fresh databases inside tmp_path"""
+    import users_db
+    import users_functions
+    import equipment_library_db
+    import shop_space_functions
+    import password_hashing
+    from connection_pool import close_all_connections
+    from identity_cache import identity_cache
+    from write_queue import shutdown_all as shutdown_write_queues
+
+    users_path = tmp_path / "users.db"
+    equipment_path = tmp_path / "equipment.db"
+    shops_path = tmp_path / "shop_spaces.db"
+
+    users_db.init_db(users_path)
+    equipment_library_db.init_equipment_db(equipment_path)
+
+    monkeypatch.setattr(users_functions, "DB_PATH", users_path)
+    monkeypatch.setattr(equipment_library_db, "DB_PATH", equipment_path)
+    monkeypatch.setattr(shop_space_functions, "DB_PATH", shops_path)
+    monkeypatch.setattr(shop_space_functions, "EQUIPMENT_DB_PATH", equipment_path)
+    # Keep password hashing cheap; test_password_hashing covers the real costs
+    monkeypatch.setattr(password_hashing, "_hasher", password_hashing.Pbkdf2Hasher(iterations=1000))
+
+    identity_cache.clear()
+    yield {"users": users_path, "equipment": equipment_path, "shop_spaces": shops_path}
+
+    identity_cache.clear()
+    shutdown_write_queues()
+    close_all_connections()
+
+
+@pytest.fixture
+def owned_equipment(temp_dbs):
+    """Create a user with a shop and three pieces of equipment"""
+    from users_functions import add_user
+    from equipment_library_db import add_equipment_type, add_equipment_to_user
+    from shop_space_functions import create_shop_space
+
+    user = add_user("fixture_user", "Fixture User", "fixture@example.com", "password123")
+    saw = add_equipment_type("Fixture Saw", "Test saw", 24, 36, 36, 30)
+    equipment = [add_equipment_to_user(user['id'], saw['id']) for _ in range(3)]
+    shop = create_shop_space(user['username'], "FixtureShop", 40.0, 30.0, 10.0)
+
+    return {"user": user, "shop": shop, "equipment": equipment, "equipment_type": saw}
+
+
+@pytest.fixture
+def place(temp_dbs):
+    """place(shop_id, equipment_id, x, y=5.0, rotation_deg=0.0, **kwargs) puts equipment on a shop floor"""
+    from shop_space_functions import add_equipment_to_shop_space
+    from models.placement import Position, EquipmentPlacement
+
+    def place(shop_id, equipment_id, x, y=5.0, rotation_deg=0.0, **kwargs):
+        placement = EquipmentPlacement(equipment_id, Position(x, y, 0.0), rotation_deg=rotation_deg)
+        return add_equipment_to_shop_space(shop_id, placement, **kwargs)
+
+    return place
+
+
+@pytest.fixture
+def placed_equipment(owned_equipment, place):
+    """owned_equipment with all three pieces placed in its shop, 4 ft apart and each turned 90 degrees more"""
+    shop_id = owned_equipment['shop']['shop_id']
+    for i, item in enumerate(owned_equipment['equipment']):
+        shop = place(shop_id, item['id'], 4.0 * i + 0.25, 2.5, rotation_deg=90.0 * i)
+    return {**owned_equipment, "shop": shop}
+
+
+@pytest.fixture
+def query_log(temp_dbs):
+    """Record every SQL statement run on pooled connections opened from now on"""
+    from connection_pool import add_connect_hook, remove_connect_hook, close_all_connections
+
+    statements = []
+
+    def trace(conn, db_key):
+        conn.set_trace_callback(statements.append)
+
+    close_all_connections()
+    add_connect_hook(trace)
+    yield statements
+    remove_connect_hook(trace)
+    close_all_connections()
+
+
+@pytest.fixture
+def client(temp_dbs):
+    """Flask test client wired to the temporary databases"""
+    from server import app
+
+    app.config["TESTING"] = True
+    with app.test_client() as test_client:
+        yield test_client
@@ -0,0 +1,169 @@
+"""
+Tests for the ASGI entry point and the database executor behind it
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from db_executor import DatabaseExecutor, ExecutorBusyError
+
+
+async def _call(app, method, path, body=None, headers=()):
+    """Drive one request through an ASGI app; returns (status, headers dict, body chunks)"""
+    raw = json.dumps(body).encode("utf-8") if body is not None else b""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "method": method, "path": path, "query_string": query.encode(),
+        "headers": [(b"content-type", b"application/json")] + [(k.encode(), v.encode()) for k, v in headers],
+        "server": ("testserver", 80), "client": ("127.0.0.1", 5000), "scheme": "http", "http_version": "1.1",
+    }
+    received = iter([{"type": "http.request", "body": raw, "more_body": False}])
+    messages = []
+
+    async def receive():
+        return next(received, {"type": "http.disconnect"})
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    chunks = [m["body"] for m in messages[1:] if m["body"]]
+    assert messages[-1].get("more_body", False) is False
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, chunks
+
+
+def _json(chunks):
+    return json.loads(b"".join(chunks))
+
+
+@pytest.fixture
+def executor():
+    executor = DatabaseExecutor(readers=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def asgi_app(temp_dbs, executor):
+    from asgi import AsgiApp
+    from server import create_app
+
+    return AsgiApp(create_app(profiling=False), executor)
+
+
+class TestAsgiApp:
+    """Test requests served through the ASGI adapter"""
+
+    def test_serves_the_same_endpoints(self, owned_equipment, asgi_app, client):
+        """Test 1: GET and PUT answer exactly like the WSGI app"""
+        shop_id = owned_equipment['shop']['shop_id']
+
+        status, headers, chunks = asyncio.run(_call(asgi_app, "GET", f"/api/shops/{shop_id}"))
+        assert status == 200 and headers["etag"]
+        assert _json(chunks) == client.get(f"/api/shops/{shop_id}").get_json()
+
+        status, _, chunks = asyncio.run(_call(asgi_app, "PUT", f"/api/shops/{shop_id}", {"length": 55}))
+        assert status == 200 and _json(chunks)['shop']['length'] == 55
+
+    def test_writes_run_on_the_database_writer_thread(self, owned_equipment, asgi_app, executor, monkeypatch):
+        """Test 2: Shop writes go to the shop_spaces writer, reads to the reader pool"""
+        import shop_space_functions
+        import write_queue
+
+        # Routing with the write queue on is covered by test 6
+        monkeypatch.setattr(write_queue, "_enabled", False)
+        threads = []
+        real_update = shop_space_functions.update_shop_space
+        monkeypatch.setattr("routes.shop_routes.update_shop_space",
+                            lambda *a, **k: threads.append(threading.current_thread().name) or real_update(*a, **k))
+        shop_id = owned_equipment['shop']['shop_id']
+
+        asyncio.run(_call(asgi_app, "PUT", f"/api/shops/{shop_id}", {"height": 12}))
+        asyncio.run(_call(asgi_app, "GET", f"/api/shops/{shop_id}"))
+
+        assert threads[0].startswith("db-writer-shop_spaces")
+        stats = executor.stats()
+        assert stats["writes"]["shop_spaces"] == 1 and stats["completed"] == 2 and stats["pending"] == 0
+
+    def test_concurrent_writes_are_serialized(self, owned_equipment, asgi_app):
+        """Test 3: Many simultaneous PUTs all succeed and each bumps the version once"""
+        shop_id = owned_equipment['shop']['shop_id']
+        start_version = owned_equipment['shop']['version']
+
+        async def burst():
+            return await asyncio.gather(*(
+                _call(asgi_app, "PUT", f"/api/shops/{shop_id}", {"length": 20 + i}) for i in range(25)
+            ))
+
+        results = asyncio.run(burst())
+
+        assert [status for status, _, _ in results] == [200] * 25
+        versions = sorted(_json(chunks)['shop']['version'] for _, _, chunks in results)
+        assert versions == list(range(start_version + 1, start_version + 26))
+
+    def test_streamed_responses_arrive_in_chunks(self, owned_equipment, asgi_app):
+        """Test 4: Streaming routes are forwarded chunk by chunk"""
+        from shop_space_functions import create_shop_space
+
+        for i in range(3):
+            create_shop_space("fixture_user", f"Extra{i}", 10, 10, 8)
+
+        status, headers, chunks = asyncio.run(
+            _call(asgi_app, "GET", "/api/shops/?stream=1", headers=[("accept", "application/x-ndjson")])
+        )
+
+        assert status == 200 and headers["content-type"] == "application/x-ndjson"
+        assert len(chunks) == 4
+        assert {json.loads(chunk)['shop_name'] for chunk in chunks} == {"FixtureShop", "Extra0", "Extra1", "Extra2"}
+
+
+class TestExecutorLimits:
+    """Test backpressure from the database executor"""
+
+    def test_full_executor_returns_503(self, owned_equipment, temp_dbs):
+        """Test 5: Past max_pending, requests are turned away instead of queued"""
+        from asgi import AsgiApp
+        from server import create_app
+
+        full = DatabaseExecutor(readers=1, max_pending=0)
+        try:
+            status, headers, _ = asyncio.run(_call(AsgiApp(create_app(profiling=False), full), "GET", "/api/health"))
+            with pytest.raises(ExecutorBusyError):
+                full.submit(print)
+        finally:
+            full.shutdown()
+
+        assert status == 503 and headers["retry-after"] == "1"
+        assert full.stats()["rejected"] == 2
+
+
+class TestWriteQueueRouting:
+    """Test ASGI routing with the write queue on"""
+
+    def test_write_queue_takes_over_write_ordering(self, owned_equipment, asgi_app, executor, monkeypatch):
+        """Test 6: With the write queue on, writes run on readers and commit through the queue"""
+        import write_queue
+
+        monkeypatch.setattr(write_queue, "_enabled", True)
+        shop_id = owned_equipment['shop']['shop_id']
+        start_version = owned_equipment['shop']['version']
+
+        async def burst():
+            return await asyncio.gather(*(
+                _call(asgi_app, "PUT", f"/api/shops/{shop_id}", {"length": 20 + i}) for i in range(10)
+            ))
+
+        before = write_queue.write_queue_stats()["queues"].get("shop_spaces", {"writes": 0})
+        try:
+            results = asyncio.run(burst())
+            queued = write_queue.write_queue_stats()["queues"]["shop_spaces"]
+        finally:
+            write_queue.shutdown_all()
+
+        versions = sorted(_json(chunks)['shop']['version'] for _, _, chunks in results)
+        assert versions == list(range(start_version + 1, start_version + 11))
+        assert executor.stats()["writes"]["shop_spaces"] == 0
+        assert queued["writes"] - before["writes"] == 10
@@ -0,0 +1,172 @@
+"""
+Tests for bulk equipment and placement imports
+"""
+import json
+
+import pytest
+
+from equipment_library_db import bulk_add_equipment_to_user, get_equipment_by_user
+from shop_space_functions import bulk_place_equipment, get_shop_space_by_id, get_shop_space_version
+
+
+class TestBulkAddEquipment:
+    """Test bulk_add_equipment_to_user"""
+
+    def test_valid_rows_inserted_in_one_statement(self, owned_equipment, query_log):
+        """Test 1: Valid items go in inside one transaction; bad rows are reported"""
+        user_id = owned_equipment['user']['id']
+        type_id = owned_equipment['equipment_type']['id']
+        items = [{"equipment_type_id": type_id, "notes": f"#{i}"} for i in range(50)]
+        items.insert(10, {"equipment_type_id": 9999})
+        items.insert(20, {"equipment_type_id": type_id, "purchase_date": "not-a-date"})
+        query_log.clear()
+
+        result = bulk_add_equipment_to_user(user_id, iter(items))
+
+        assert result['inserted'] == 50
+        assert [e['row'] for e in result['errors']] == [11, 21]
+        assert len(get_equipment_by_user(user_id)) == 53
+        # BEGIN on the calling thread, BEGIN IMMEDIATE on a write queue's writer thread
+        assert [s.split()[0] for s in query_log if s.split()[0] in ("BEGIN", "COMMIT")] == ["BEGIN", "COMMIT"]
+        assert not [s for s in query_log if "FROM users" in s]  # owner came from the identity cache
+
+    def test_unknown_user_rejected(self, owned_equipment):
+        """Test 2: A missing user fails the whole call"""
+        with pytest.raises(ValueError):
+            bulk_add_equipment_to_user(9999, [])
+
+    def test_upload_is_read_before_the_transaction(self, owned_equipment, query_log):
+        """Test 3: Every row is read from the upload before the write transaction begins"""
+        type_id = owned_equipment['equipment_type']['id']
+        began_while_reading = []
+
+        def upload():
+            for i in range(5):
+                began_while_reading.append(any(s.startswith("BEGIN") for s in query_log))
+                yield {"equipment_type_id": type_id, "notes": f"#{i}"}
+
+        result = bulk_add_equipment_to_user(owned_equipment['user']['id'], upload())
+
+        assert result['inserted'] == 5
+        assert began_while_reading == [False] * 5
+
+
+class TestBulkPlaceEquipment:
+    """Test bulk_place_equipment"""
+
+    def test_ownership_checked_in_one_query(self, owned_equipment, query_log):
+        """Test 4: Owned equipment is placed, foreign and duplicate IDs are skipped"""
+        shop_id = owned_equipment['shop']['shop_id']
+        ids = [e['id'] for e in owned_equipment['equipment']]
+        version = get_shop_space_version(shop_id)
+        query_log.clear()
+
+        result = bulk_place_equipment(shop_id, [
+            {"equipment_id": ids[0], "x_coordinate": 2, "y_coordinate": 2},
+            {"equipment_id": ids[1], "x_coordinate": "8", "y_coordinate": "2", "rotation_deg": "90"},
+            {"equipment_id": 9999, "x_coordinate": 1, "y_coordinate": 1},
+            {"equipment_id": ids[0], "x_coordinate": 5, "y_coordinate": 5},
+            {"equipment_id": ids[2], "x_coordinate": 1},
+        ])
+
+        assert result['placed'] == 2
+        assert [e['row'] for e in result['errors']] == [3, 4, 5]
+        ownership = [s for s in query_log if "FROM user_equipment" in s]
+        assert len(ownership) == 1
+        shop = get_shop_space_by_id(shop_id)
+        assert [p['equipment_id'] for p in shop['equipment']] == ids[:2]
+        assert shop['equipment'][1]['rotation_deg'] == 90.0
+        assert get_shop_space_version(shop_id) == version + 1
+
+    def test_validation_checks_against_earlier_rows(self, owned_equipment):
+        """Test 5: With validate, a row colliding with an earlier row in the same upload is skipped"""
+        shop_id = owned_equipment['shop']['shop_id']
+        ids = [e['id'] for e in owned_equipment['equipment']]
+
+        result = bulk_place_equipment(shop_id, [
+            {"equipment_id": ids[0], "x_coordinate": 5, "y_coordinate": 5},
+            {"equipment_id": ids[1], "x_coordinate": 5.5, "y_coordinate": 5},
+        ], validate="collision")
+
+        assert result['placed'] == 1
+        assert result['errors'][0]['conflicts']['collisions'] == [ids[0]]
+
+
+class TestBulkRoutes:
+    """Test CSV and NDJSON uploads"""
+
+    def test_csv_upload(self, client, owned_equipment):
+        """Test 6: POST /api/equipment/user/<id>/bulk reads a CSV body row by row"""
+        user_id = owned_equipment['user']['id']
+        type_id = owned_equipment['equipment_type']['id']
+        body = "equipment_type_id,notes,purchase_date\n" + "".join(
+            f"{type_id},row {i},2024-01-0{i + 1}\n" for i in range(3)
+        )
+
+        response = client.post(f"/api/equipment/user/{user_id}/bulk", data=body, content_type="text/csv")
+
+        assert response.status_code == 201
+        assert response.get_json() == {"inserted": 3, "errors": []}
+        assert len(get_equipment_by_user(user_id)) == 6
+
+    def test_ndjson_placement_upload(self, client, owned_equipment):
+        """Test 7: POST /api/shops/<id>/equipment/bulk reads NDJSON"""
+        shop_id = owned_equipment['shop']['shop_id']
+        body = "".join(
+            json.dumps({"equipment_id": e['id'], "x_coordinate": 4 * i, "y_coordinate": 3}) + "\n"
+            for i, e in enumerate(owned_equipment['equipment'])
+        )
+
+        response = client.post(f"/api/shops/{shop_id}/equipment/bulk", data=body, content_type="application/x-ndjson")
+
+        assert response.get_json() == {"placed": 3, "errors": []}
+
+    def test_malformed_upload_rolls_back(self, client, owned_equipment):
+        """Test 8: A broken NDJSON line fails the request and inserts nothing"""
+        user_id = owned_equipment['user']['id']
+        type_id = owned_equipment['equipment_type']['id']
+        body = json.dumps({"equipment_type_id": type_id}) + "\n{not json\n"
+
+        response = client.post(f"/api/equipment/user/{user_id}/bulk", data=body, content_type="application/x-ndjson")
+
+        assert response.status_code == 400
+        assert len(get_equipment_by_user(user_id)) == 3
+
+    def test_non_object_rows_reported(self, client, owned_equipment):
+        """Test 9: Rows that are not JSON objects are reported per row, not a server error"""
+        user_id = owned_equipment['user']['id']
+        shop_id = owned_equipment['shop']['shop_id']
+        type_id = owned_equipment['equipment_type']['id']
+        equipment_id = owned_equipment['equipment'][0]['id']
+
+        equipment = client.post(f"/api/equipment/user/{user_id}/bulk", data="\n".join(
+            json.dumps(row) for row in [5, "x", [1, 2], {"equipment_type_id": type_id}]
+        ), content_type="application/x-ndjson")
+        placements = client.post(f"/api/shops/{shop_id}/equipment/bulk", json={"placements": [
+            [1, 2], {"equipment_id": equipment_id, "x_coordinate": 2, "y_coordinate": 2}, 7,
+        ]})
+
+        assert equipment.status_code == 201
+        assert equipment.get_json()['inserted'] == 1
+        assert [e['row'] for e in equipment.get_json()['errors']] == [1, 2, 3]
+        assert placements.get_json()['placed'] == 1
+        assert placements.get_json()['errors'] == [
+            {"row": 1, "equipment_id": None, "error": "Row must be an object, not list"},
+            {"row": 3, "equipment_id": None, "error": "Row must be an object, not int"},
+        ]
+
+    def test_non_string_purchase_date_reported(self, client, owned_equipment):
+        """Test 10: A purchase_date that is not an ISO date string is reported for its row"""
+        user_id = owned_equipment['user']['id']
+        type_id = owned_equipment['equipment_type']['id']
+
+        response = client.post(f"/api/equipment/user/{user_id}/bulk", json={"items": [
+            {"equipment_type_id": type_id, "purchase_date": 20240101},
+            {"equipment_type_id": type_id, "purchase_date": "2024-01-01"},
+        ]})
+
+        assert response.status_code == 201
+        assert response.get_json() == {
+            "inserted": 1,
+            "errors": [{"row": 1, "error": "Invalid purchase date 20240101"}],
+        }
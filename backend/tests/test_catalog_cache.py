@@ -0,0 +1,82 @@
+"""
+Tests for the in-memory equipment catalog cache
+"""
+import sqlite3
+
+from equipment_library_db import (
+    add_equipment_type,
+    add_equipment_to_user,
+    get_equipment_catalog,
+    get_equipment_type_by_id,
+    get_equipment_type_by_name,
+    catalog_cache_stats,
+)
+from catalog_cache import CatalogEntry
+
+
+def _loads():
+    return catalog_cache_stats()['loads']
+
+
+class TestCatalogCache:
+    """Test read-through caching and invalidation"""
+
+    def test_reads_are_served_from_memory(self, owned_equipment, query_log):
+        """Test 1: Repeated catalog and id lookups run no catalog queries"""
+        get_equipment_catalog()
+        query_log.clear()
+
+        for _ in range(5):
+            get_equipment_catalog()
+            get_equipment_type_by_id(owned_equipment['equipment_type']['id'])
+
+        assert not [s for s in query_log if "FROM equipment_types" in s]
+
+    def test_lookup_by_id_and_name(self, owned_equipment):
+        """Test 2: Entries are found by id (int or numeric string) and by name"""
+        saw = owned_equipment['equipment_type']
+
+        assert get_equipment_type_by_id(saw['id']) == saw
+        assert get_equipment_type_by_id(str(saw['id'])) == saw
+        assert get_equipment_type_by_name("fixture saw") == saw
+        assert get_equipment_type_by_id(9999) is None
+
+    def test_add_equipment_type_invalidates(self, temp_dbs):
+        """Test 3: A new type is visible immediately after add_equipment_type"""
+        assert get_equipment_catalog() == []
+
+        lathe = add_equipment_type("Lathe", "Wood lathe", 20, 40, 60, 90)
+
+        assert [item['equipment_name'] for item in get_equipment_catalog()] == ["Lathe"]
+        assert get_equipment_type_by_id(lathe['id'])['width'] == 20
+
+    def test_external_writes_seen_through_data_version(self, owned_equipment, temp_dbs):
+        """Test 4: A change committed by another connection reloads the cache"""
+        get_equipment_catalog()
+        before = _loads()
+
+        with sqlite3.connect(temp_dbs['equipment']) as other:
+            other.execute("UPDATE equipment_types SET width = 99 WHERE equipment_name = 'Fixture Saw'")
+
+        assert get_equipment_type_by_name("Fixture Saw")['width'] == 99
+        assert _loads() == before + 1
+
+    def test_unrelated_writes_do_not_reload(self, owned_equipment):
+        """Test 5: Writing user_equipment changes data_version but not the catalog"""
+        get_equipment_catalog()
+        before = _loads()
+
+        add_equipment_to_user(owned_equipment['user']['id'], owned_equipment['equipment_type']['id'])
+        get_equipment_catalog()
+
+        assert _loads() == before
+
+    def test_returned_dicts_are_copies(self, owned_equipment):
+        """Test 6: Mutating a result does not corrupt the cache"""
+        get_equipment_catalog()[0]['width'] = -1
+
+        assert get_equipment_catalog()[0]['width'] == 24
+
+    def test_entries_use_slots(self):
+        """Test 7: Cached records carry no per-instance __dict__"""
+        assert not hasattr(CatalogEntry.__new__(CatalogEntry), "__dict__")
@@ -0,0 +1,83 @@
+"""
+Tests for catalog search and filtering
+"""
+import sqlite3
+
+import pytest
+
+from equipment_library_db import add_equipment_type, search_equipment_catalog
+
+
+@pytest.fixture
+def catalog(temp_dbs):
+    """A small catalog spanning manufacturers and footprints"""
+    return {
+        "dw735": add_equipment_type("Thickness Planer", "13 inch portable planer", 22, 24, 33, 90,
+                                    manufacturer="DeWalt", model="DW735"),
+        "jwp": add_equipment_type("Benchtop Planer", "12 inch helical planer", 28, 20, 36, 90,
+                                  manufacturer="Jet", model="JWP-12"),
+        "saw": add_equipment_type("Cabinet Table Saw", "3HP cabinet saw", 40, 34, 60, 120,
+                                  manufacturer="Jet", model="JPS-10"),
+        "press": add_equipment_type("Drill Press", "Floor standing", 14, 66, 24, 180,
+                                    manufacturer="Delta", model="18-900L"),
+    }
+
+
+def _names(items):
+    return [item['equipment_name'] for item in items]
+
+
+class TestCatalogSearch:
+    """Test the search function"""
+
+    def test_text_search_matches_any_field_by_prefix(self, catalog):
+        """Test 1: Words match name, description, manufacturer or model by prefix"""
+        assert set(_names(search_equipment_catalog(q="plan"))) == {"Thickness Planer", "Benchtop Planer"}
+        assert _names(search_equipment_catalog(q="dw735")) == ["Thickness Planer"]
+        assert _names(search_equipment_catalog(q="jet saw")) == ["Cabinet Table Saw"]
+
+    def test_planer_that_fits_a_gap(self, catalog):
+        """Test 2: Text and footprint filters combine in one query"""
+        assert _names(search_equipment_catalog(q="planer", max_width=25)) == ["Thickness Planer"]
+        assert _names(search_equipment_catalog(max_width=30, max_depth=35)) == ["Drill Press", "Thickness Planer"]
+
+    def test_manufacturer_filter_and_limit(self, catalog):
+        """Test 3: Manufacturer matches case-insensitively and limit caps results"""
+        assert _names(search_equipment_catalog(manufacturer="jet")) == ["Benchtop Planer", "Cabinet Table Saw"]
+        assert len(search_equipment_catalog(limit=1)) == 1
+
+    def test_index_follows_updates(self, catalog, temp_dbs):
+        """Test 4: Triggers keep the search index in step with equipment_types"""
+        with sqlite3.connect(temp_dbs['equipment']) as conn:
+            conn.execute("UPDATE equipment_types SET model = 'DW734' WHERE model = 'DW735'")
+
+        assert search_equipment_catalog(q="dw735") == []
+        assert _names(search_equipment_catalog(q="dw734")) == ["Thickness Planer"]
+
+    def test_bad_filters_rejected(self, catalog):
+        """Test 5: Non-numeric dimensions raise ValueError"""
+        with pytest.raises(ValueError):
+            search_equipment_catalog(max_width="wide")
+
+    def test_footprint_filter_uses_index(self, catalog, temp_dbs, query_log):
+        """Test 6: A dimension-only search seeks a footprint index"""
+        search_equipment_catalog(max_width=30)
+
+        sql = [s for s in query_log if s.lstrip().startswith("SELECT et.*")][-1]
+        with sqlite3.connect(temp_dbs['equipment']) as conn:
+            plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "idx_equipment_types_" in plan
+
+
+class TestCatalogRoute:
+    """Test the catalog route's search parameters"""
+
+    def test_route_filters_and_etags(self, client, catalog):
+        """Test 7: Query parameters filter server-side and get their own ETag"""
+        full = client.get("/api/equipment/catalog")
+        filtered = client.get("/api/equipment/catalog?q=planer&max_width=25")
+
+        assert len(full.get_json()['equipment']) == 4
+        assert _names(filtered.get_json()['equipment']) == ["Thickness Planer"]
+        assert full.headers["ETag"] != filtered.headers["ETag"]
+        assert client.get("/api/equipment/catalog?max_depth=x").status_code == 400
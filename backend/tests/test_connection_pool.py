@@ -0,0 +1,63 @@
+"""
+Tests for the process-wide SQLite connection pool
+"""
+import threading
+
+from connection_pool import ConnectionPool
+
+
+class TestConnectionPool:
+    """Test per-thread connection reuse and configuration"""
+
+    def test_same_thread_reuses_connection(self, tmp_path):
+        """Test 1: Repeated connects on one thread return the same connection"""
+        pool = ConnectionPool()
+        db = tmp_path / "a.db"
+
+        assert pool.connect(db) is pool.connect(db)
+        stats = pool.stats()
+        assert stats["opened"] == 1
+        assert stats["reused"] == 1
+        pool.close_all()
+
+    def test_threads_get_separate_connections(self, tmp_path):
+        """Test 2: Each thread gets its own connection to the same file"""
+        pool = ConnectionPool()
+        db = tmp_path / "a.db"
+        main_conn = pool.connect(db)
+        seen = []
+
+        def worker():
+            seen.append(pool.connect(db))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen[0] is not main_conn
+        pool.close_all()
+
+    def test_pragmas_applied_once(self, tmp_path):
+        """Test 3: New connections are configured with the pool PRAGMAs"""
+        pool = ConnectionPool()
+        conn = pool.connect(tmp_path / "a.db")
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        pool.close_all()
+
+    def test_dead_thread_connections_are_closed(self, tmp_path):
+        """Test 4: Connections of exited threads are pruned on the next open"""
+        pool = ConnectionPool()
+        thread = threading.Thread(target=lambda: pool.connect(tmp_path / "a.db"))
+        thread.start()
+        thread.join()
+
+        pool.connect(tmp_path / "b.db")
+
+        stats = pool.stats()
+        assert stats["closed"] == 1
+        assert stats["open_connections"] == 1
+        pool.close_all()
@@ -0,0 +1,52 @@
+"""
+Tests for ETag / If-None-Match support on shop and catalog routes
+"""
+from models.placement import Position, EquipmentPlacement
+from shop_space_functions import add_equipment_to_shop_space, update_equipment_position
+from equipment_library_db import add_equipment_type
+
+
+class TestShopETags:
+    """Test conditional GETs for shops"""
+
+    def test_unchanged_shop_returns_304(self, client, owned_equipment):
+        """Test 1: Re-sending the ETag for an unchanged shop gets 304 with no body"""
+        shop_id = owned_equipment['shop']['shop_id']
+
+        first = client.get(f"/api/shops/{shop_id}")
+        etag = first.headers["ETag"]
+        second = client.get(f"/api/shops/{shop_id}", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.data == b""
+
+    def test_placement_change_changes_etag(self, client, owned_equipment):
+        """Test 2: Moving a tool invalidates both the shop and the user's shop list"""
+        shop = owned_equipment['shop']
+        eq_id = owned_equipment['equipment'][0]['id']
+        add_equipment_to_shop_space(shop['shop_id'], EquipmentPlacement(eq_id, Position(1.0, 1.0, 0.0)))
+
+        shop_etag = client.get(f"/api/shops/{shop['shop_id']}").headers["ETag"]
+        list_etag = client.get(f"/api/shops/user/{shop['username']}").headers["ETag"]
+
+        update_equipment_position(shop['shop_id'], eq_id, x=4.0)
+
+        shop_response = client.get(f"/api/shops/{shop['shop_id']}", headers={"If-None-Match": shop_etag})
+        list_response = client.get(f"/api/shops/user/{shop['username']}", headers={"If-None-Match": list_etag})
+        assert shop_response.status_code == 200
+        assert shop_response.get_json()["shop"]["equipment"][0]["x_coordinate"] == 4.0
+        assert list_response.status_code == 200
+
+
+class TestCatalogETags:
+    """Test conditional GETs for the equipment catalog"""
+
+    def test_catalog_etag_tracks_new_types(self, client):
+        """Test 3: Adding an equipment type changes the catalog ETag"""
+        etag = client.get("/api/equipment/catalog").headers["ETag"]
+        assert client.get("/api/equipment/catalog", headers={"If-None-Match": etag}).status_code == 304
+
+        add_equipment_type("Spindle Sander", "Oscillating", 20, 20, 20, 60)
+
+        assert client.get("/api/equipment/catalog", headers={"If-None-Match": etag}).status_code == 200
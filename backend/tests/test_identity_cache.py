@@ -0,0 +1,67 @@
+"""
+Tests for the user_id <-> username identity cache
+"""
+from identity_cache import IdentityCache, identity_cache
+from users_functions import add_user, delete_user, get_user_id_by_username, user_exists
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIdentityCache:
+    """Test LRU, TTL and invalidation behaviour"""
+
+    def test_lru_evicts_oldest(self):
+        """Test 1: The least recently used entry is evicted past max_size"""
+        cache = IdentityCache(max_size=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        cache.user_id_for("a")  # touch a so b is oldest
+        cache.put(3, "c")
+
+        assert cache.user_id_for("b") is None
+        assert cache.user_id_for("a") == 1
+        assert cache.username_for(3) == "c"
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        """Test 2: Entries older than the TTL are misses"""
+        clock = FakeClock()
+        cache = IdentityCache(ttl_seconds=10, clock=clock)
+        cache.put(1, "a")
+        clock.now = 11
+
+        assert cache.username_for(1) is None
+        assert cache.stats()["size"] == 0
+
+
+class TestCachedValidation:
+    """Test the cached lookups in users_functions"""
+
+    def test_steady_state_costs_no_queries(self, temp_dbs, query_log):
+        """Test 3: Repeat lookups are served without touching the database"""
+        user = add_user("cached", "Cached User", "cached@example.com", "password123")
+        get_user_id_by_username("cached")
+
+        query_log.clear()
+        for _ in range(5):
+            assert get_user_id_by_username("cached") == user['id']
+            assert user_exists(user['id'])
+
+        assert query_log == []
+        assert identity_cache.stats()["hits"] >= 10
+
+    def test_delete_user_invalidates(self, temp_dbs):
+        """Test 4: A deleted user is no longer reported as existing"""
+        user = add_user("shortlived", "Short Lived", "short@example.com", "password123")
+        assert user_exists(user['id'])
+
+        delete_user(user['id'])
+
+        assert not user_exists(user['id'])
+        assert get_user_id_by_username("shortlived") is None
@@ -0,0 +1,113 @@
+"""
+Tests for opt-in request profiling (Server-Timing and /api/debug/metrics)
+"""
+import pytest
+
+import query_metrics
+
+
+@pytest.fixture
+def profiled_client(temp_dbs):
+    """Test client for a fresh app with profiling turned on"""
+    from server import create_app
+
+    app = create_app(profiling=True)
+    with app.test_client() as test_client:
+        yield test_client
+    query_metrics.disable()
+
+
+def _timings(response):
+    """Server-Timing header as {name: {param: value}}"""
+    metrics = {}
+    for entry in response.headers["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class TestQueryCollection:
+    """Test per-request query collection"""
+
+    def test_collects_queries_for_the_current_context_only(self, owned_equipment):
+        """Test 1: Instrumented connections record while a collection is active"""
+        from shop_space_functions import get_shop_space_by_id
+
+        query_metrics.enable()
+        try:
+            get_shop_space_by_id(owned_equipment['shop']['shop_id'])  # not collected
+            stats = query_metrics.start()
+            shop = get_shop_space_by_id(owned_equipment['shop']['shop_id'])
+            assert query_metrics.stop() is stats
+        finally:
+            query_metrics.disable()
+
+        assert shop['shop_name'] == "FixtureShop"
+        assert stats.queries == 2  # shop row, then its placements
+        assert stats.rows == 1 and stats.db_seconds > 0
+        assert sum(entry[0] for entry in stats.statements.values()) == 2
+
+
+class TestProfiledRoutes:
+    """Test Server-Timing and the debug metrics endpoint"""
+
+    def test_server_timing_header(self, owned_equipment, profiled_client):
+        """Test 2: Responses carry app, db, rows and json timings"""
+        user_id = owned_equipment['user']['id']
+        profiled_client.get(f"/api/equipment/user/{user_id}")  # first use opens and configures the connection
+
+        response = profiled_client.get(f"/api/equipment/user/{user_id}")
+
+        assert response.status_code == 200
+        timings = _timings(response)
+        assert set(timings) == {"app", "db", "rows", "json"}
+        assert timings["db"]["desc"] == '"1 queries"'
+        assert timings["rows"]["desc"] == '"3"'
+        assert float(timings["app"]["dur"]) >= float(timings["db"]["dur"])
+
+    def test_metrics_endpoint_aggregates_per_route(self, owned_equipment, profiled_client):
+        """Test 3: /api/debug/metrics groups requests by route rule and lists statements"""
+        shop_id = owned_equipment['shop']['shop_id']
+        for _ in range(3):
+            profiled_client.get(f"/api/shops/{shop_id}")
+        profiled_client.get("/api/shops/no-such-shop")
+
+        metrics = profiled_client.get("/api/debug/metrics").get_json()
+
+        route = metrics["routes"]["GET /api/shops/<shop_id>"]
+        assert route["requests"] == 4
+        assert sum(route["histogram"].values()) == 4
+        assert route["avg_queries"] > 0
+        assert any("FROM shop_spaces" in s["sql"] for s in metrics["statements"])
+
+        assert profiled_client.delete("/api/debug/metrics").status_code == 200
+        assert profiled_client.get("/api/debug/metrics").get_json()["routes"] == {}
+
+    def test_profiling_is_off_by_default(self, client):
+        """Test 4: The default app has no debug endpoint or Server-Timing header"""
+        response = client.get("/api/health")
+
+        assert "Server-Timing" not in response.headers
+        assert client.get("/api/debug/metrics").status_code == 404
+
+    def test_queued_writes_are_counted(self, owned_equipment, profiled_client, monkeypatch):
+        """Test 5: With the write queue on, statements run on the writer thread still count for the request"""
+        import write_queue
+
+        shop_id = owned_equipment['shop']['shop_id']
+
+        def db_queries(length):
+            response = profiled_client.put(f"/api/shops/{shop_id}", json={"length": length})
+            assert response.status_code == 200
+            return _timings(response)["db"]["desc"]
+
+        db_queries(41)  # first use opens and configures the connection
+        direct = db_queries(42)
+        monkeypatch.setattr(write_queue, "_enabled", True)
+        try:
+            db_queries(43)
+            queued = db_queries(44)
+        finally:
+            write_queue.shutdown_all()
+
+        assert queued == direct != '"0 queries"'
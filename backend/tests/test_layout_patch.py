@@ -0,0 +1,171 @@
+"""
+Tests for PATCH /api/shops/<id>/layout (incremental placement operations)
+"""
+import pytest
+
+from shop_space_functions import (
+    apply_layout_patch,
+    get_shop_space_by_id,
+    ShopVersionConflictError,
+)
+from equipment_library_db import add_equipment_to_user
+
+
+@pytest.fixture
+def laid_out(owned_equipment, place):
+    """The fixture shop with its first two tools placed; the third is left unplaced"""
+    shop_id = owned_equipment['shop']['shop_id']
+    first, second, third = (e['id'] for e in owned_equipment['equipment'])
+    place(shop_id, first, 1.0)
+    shop = place(shop_id, second, 10.0)
+    return {"shop_id": shop_id, "version": shop['version'], "ids": (first, second, third), **owned_equipment}
+
+
+class TestApplyLayoutPatch:
+    """Test applying operations against a base version"""
+
+    def test_operations_apply_and_only_changes_come_back(self, laid_out, client):
+        """Test 1: move, rotate, add and remove in one patch bump the version once"""
+        shop_id = laid_out['shop_id']
+        first, second, third = laid_out['ids']
+
+        response = client.patch(f"/api/shops/{shop_id}/layout", json={
+            "base_version": laid_out['version'],
+            "operations": [
+                {"op": "move", "equipment_id": first, "x": 3.5},
+                {"op": "rotate", "equipment_id": first, "rotation_deg": 90},
+                {"op": "add", "equipment_id": third, "x": 20, "y": 8},
+                {"op": "remove", "equipment_id": second},
+            ],
+        })
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['version'] == laid_out['version'] + 1
+        assert response.headers['ETag']
+        assert body['removed'] == [second]
+        changed = {p['equipment_id']: p for p in body['placements']}
+        assert set(changed) == {first, third}
+        assert (changed[first]['x_coordinate'], changed[first]['y_coordinate'], changed[first]['rotation_deg']) == (3.5, 5.0, 90)
+        assert (changed[third]['x_coordinate'], changed[third]['z_coordinate']) == (20, 0)
+
+        shop = get_shop_space_by_id(shop_id)
+        assert shop['version'] == body['version']
+        assert sorted(p['equipment_id'] for p in shop['equipment']) == sorted([first, third])
+
+    def test_stale_base_version_is_a_conflict(self, laid_out, client):
+        """Test 2: A patch based on an old version gets 409 with the current version and changes nothing"""
+        shop_id = laid_out['shop_id']
+        first = laid_out['ids'][0]
+
+        response = client.patch(f"/api/shops/{shop_id}/layout", json={
+            "base_version": laid_out['version'] - 1,
+            "operations": [{"op": "move", "equipment_id": first, "x": 30}],
+        })
+
+        assert response.status_code == 409
+        assert response.get_json()['current_version'] == laid_out['version']
+        assert get_shop_space_by_id(shop_id)['equipment'][0]['x_coordinate'] == 1.0
+
+    def test_failing_operation_rolls_back_the_patch(self, laid_out):
+        """Test 3: If one operation fails, the ones before it are undone too"""
+        shop_id = laid_out['shop_id']
+        first, second, third = laid_out['ids']
+
+        with pytest.raises(ValueError, match="Operation 2: Equipment with ID .* not found in shop"):
+            apply_layout_patch(shop_id, [
+                {"op": "remove", "equipment_id": first},
+                {"op": "move", "equipment_id": third, "x": 4},
+            ], laid_out['version'])
+
+        shop = get_shop_space_by_id(shop_id)
+        assert shop['version'] == laid_out['version']
+        assert [p['equipment_id'] for p in shop['equipment']] == [first, second]
+
+
+class TestRejectedPatches:
+    """Test malformed, foreign and colliding patches"""
+
+    @pytest.mark.parametrize("operations, message", [
+        ([], "non-empty list"),
+        ([{"op": "teleport", "equipment_id": 1}], "op must be one of"),
+        ([{"op": "move", "equipment_id": 1}], "at least one of x, y, z"),
+        ([{"op": "add", "equipment_id": 1, "x": "left", "y": 2}], "x must be a number"),
+    ])
+    def test_malformed_patches_are_rejected(self, laid_out, client, operations, message):
+        """Test 4: Bad operations are a 400 naming the problem"""
+        response = client.patch(f"/api/shops/{laid_out['shop_id']}/layout",
+                                json={"base_version": laid_out['version'], "operations": operations})
+
+        assert response.status_code == 400
+        assert message in response.get_json()['error']
+
+    def test_base_version_is_required(self, laid_out, client):
+        """Test 5: A patch without base_version is refused"""
+        response = client.patch(f"/api/shops/{laid_out['shop_id']}/layout",
+                                json={"operations": [{"op": "remove", "equipment_id": laid_out['ids'][0]}]})
+
+        assert response.status_code == 400
+        assert "base_version" in response.get_json()['error']
+
+    def test_added_equipment_must_belong_to_owner(self, laid_out):
+        """Test 6: Adding someone else's equipment is refused"""
+        from users_functions import add_user
+
+        stranger = add_user("patch_stranger", "Stranger", "patch_stranger@example.com", "password123")
+        foreign = add_equipment_to_user(stranger['id'], laid_out['equipment_type']['id'])
+
+        with pytest.raises(ValueError, match="does not belong"):
+            apply_layout_patch(laid_out['shop_id'], [{"op": "add", "equipment_id": foreign['id'], "x": 20, "y": 8}],
+                               laid_out['version'])
+        with pytest.raises(ValueError, match="does not exist"):
+            apply_layout_patch("no_such_shop", [{"op": "add", "equipment_id": foreign['id'], "x": 20, "y": 8}], 1)
+
+    def test_validated_patch_rejects_collisions(self, laid_out, client):
+        """Test 7: With validate, a move onto another tool is a 409 listing the conflict"""
+        shop_id = laid_out['shop_id']
+        first, second, third = laid_out['ids']
+
+        response = client.patch(f"/api/shops/{shop_id}/layout?validate=collision", json={
+            "base_version": laid_out['version'],
+            "operations": [{"op": "move", "equipment_id": second, "x": 1.0}],
+        })
+
+        assert response.status_code == 409
+        assert response.get_json()['conflicts']['collisions'] == [first]
+        assert get_shop_space_by_id(shop_id)['version'] == laid_out['version']
+
+        with pytest.raises(ShopVersionConflictError):
+            apply_layout_patch(shop_id, [{"op": "remove", "equipment_id": first}], laid_out['version'] + 3,
+                               validate="collision")
+
+
+class TestPatchCost:
+    """Test that a patch costs the same in a small and a large shop"""
+
+    def test_patch_work_does_not_grow_with_the_shop(self, owned_equipment, query_log, place):
+        """Test 8: Nudging one tool costs the same statements and payload in a small and a large shop"""
+        from shop_space_functions import create_shop_space
+
+        user = owned_equipment['user']
+        type_id = owned_equipment['equipment_type']['id']
+
+        def shop_with(count):
+            shop = create_shop_space(user['username'], f"Shop{count}", 400.0, 300.0, 10.0)
+            for i in range(count):
+                item = add_equipment_to_user(user['id'], type_id)
+                shop = place(shop['shop_id'], item['id'], 3.0 * i)
+            return shop
+
+        def nudge(shop):
+            query_log.clear()
+            result = apply_layout_patch(shop['shop_id'], [
+                {"op": "move", "equipment_id": shop['equipment'][0]['equipment_id'], "x": 0.5},
+            ], shop['version'])
+            return result, [sql for sql in query_log if sql.lstrip().split()[0].upper() in ("SELECT", "UPDATE")]
+
+        small_result, small_statements = nudge(shop_with(2))
+        large_result, large_statements = nudge(shop_with(40))
+
+        assert len(small_result['placements']) == len(large_result['placements']) == 1
+        assert len(small_statements) == len(large_statements)
@@ -0,0 +1,106 @@
+"""
+Tests for the batched maintenance schedule
+The query-count test doubles as a benchmark: the schedule is one statement
+however many shops and tools the user has.
+"""
+from datetime import date, timedelta
+
+from users_functions import add_user
+from equipment_library_db import (
+    add_equipment_type,
+    add_equipment_to_user,
+    get_maintenance_schedule_with_shops,
+)
+from shop_space_functions import create_shop_space, add_equipment_to_shop_space
+from models.placement import Position, EquipmentPlacement
+
+
+def _build_user(username, shops, tools_per_shop, interval_days=30):
+    """Create a user with shops full of tools bought on staggered dates"""
+    user = add_user(username, username.title(), f"{username}@example.com", "password123")
+    tool_type = add_equipment_type(f"{username} Lathe", "Lathe", 20, 40, 30, interval_days)
+    today = date.today()
+    for s in range(shops):
+        shop = create_shop_space(username, f"Shop{s}", 40.0, 30.0, 10.0)
+        for t in range(tools_per_shop):
+            purchased = today - timedelta(days=(s * tools_per_shop + t) * 3)
+            eq = add_equipment_to_user(user['id'], tool_type['id'], purchase_date=purchased)
+            add_equipment_to_shop_space(shop['shop_id'], EquipmentPlacement(eq['id'], Position(t * 3.0, 1.0, 0.0)))
+    return user
+
+
+def _count_selects(statements):
+    return sum(1 for sql in statements if sql.lstrip().upper().startswith("SELECT"))
+
+
+class TestMaintenanceSchedule:
+    """Test get_maintenance_schedule_with_shops"""
+
+    def test_items_are_bucketed(self, temp_dbs):
+        """Test 1: Every placed tool lands in exactly one bucket"""
+        user = _build_user("bucketer", shops=2, tools_per_shop=6)
+
+        schedule = get_maintenance_schedule_with_shops(user['id'])
+
+        items = schedule['overdue'] + schedule['this_week'] + schedule['upcoming']
+        assert len(items) == 12
+        assert all(i['days_until'] < 0 for i in schedule['overdue'])
+        assert all(0 <= i['days_until'] <= 7 for i in schedule['this_week'])
+        assert all(i['days_until'] > 7 for i in schedule['upcoming'])
+        assert [i['days_until'] for i in schedule['overdue']] == sorted(i['days_until'] for i in schedule['overdue'])
+
+    def test_query_count_is_constant(self, temp_dbs, query_log):
+        """Test 2: A user with 10x the shops and tools costs the same number of queries"""
+        small = _build_user("smallshop", shops=1, tools_per_shop=2)
+        large = _build_user("bigshop", shops=10, tools_per_shop=10)
+        get_maintenance_schedule_with_shops(small['id'])  # warm up schema checks
+
+        query_log.clear()
+        get_maintenance_schedule_with_shops(small['id'])
+        small_queries = _count_selects(query_log)
+
+        query_log.clear()
+        schedule = get_maintenance_schedule_with_shops(large['id'])
+        large_queries = _count_selects(query_log)
+
+        assert sum(len(v) for v in schedule.values()) == 100
+        assert small_queries == large_queries
+        assert large_queries == 1
+
+
+class TestMaintenanceSummary:
+    """Test the aggregate maintenance summary queries"""
+
+    def test_summary_counts_match_detail_queries(self, temp_dbs):
+        """Test 3: Aggregate counts agree with the per-category lists"""
+        from equipment_library_db import (
+            get_maintenance_summary,
+            get_overdue_maintenance,
+            get_maintenance_due,
+            get_equipment_by_user,
+        )
+        user = _build_user("summarized", shops=1, tools_per_shop=15)
+
+        summary = get_maintenance_summary(user['id'])
+
+        assert summary == {
+            "user_id": user['id'],
+            "total_equipment": len(get_equipment_by_user(user['id'])),
+            "overdue_maintenance": len(get_overdue_maintenance(user['id'])),
+            "due_within_30_days": len(get_maintenance_due(user['id'], days_ahead=30)),
+        }
+
+    def test_summaries_for_many_users_in_one_query(self, temp_dbs, query_log):
+        """Test 4: get_maintenance_summaries covers every user with a single SELECT"""
+        from equipment_library_db import get_maintenance_summaries
+        first = _build_user("fleetone", shops=1, tools_per_shop=3)
+        second = _build_user("fleettwo", shops=1, tools_per_shop=5)
+
+        query_log.clear()
+        summaries = get_maintenance_summaries([second['id'], 424242, first['id']])
+
+        assert [s['total_equipment'] for s in summaries] == [5, 0, 3]
+        assert _count_selects(query_log) == 1
+        assert summaries[1] == {
+            "user_id": 424242, "total_equipment": 0, "overdue_maintenance": 0, "due_within_30_days": 0,
+        }
@@ -0,0 +1,90 @@
+"""
+Tests for the versioned migration runner and the indexes it creates
+Query plan checks run EXPLAIN QUERY PLAN on the exact SQL the repo
+functions send, so a query rewrite that stops using an index fails here.
+"""
+import sqlite3
+
+from migrations import run_migrations, get_schema_version, MIGRATIONS
+from equipment_library_db import (
+    get_equipment_by_user,
+    get_overdue_maintenance,
+    get_maintenance_summary,
+)
+from shop_space_functions import get_shop_spaces_by_username
+
+
+def _plan(db_path, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for sql"""
+    with sqlite3.connect(db_path) as conn:
+        return " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def _last_select(statements, table):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT") and table in s][-1]
+
+
+class TestMigrationRunner:
+    """Test schema_version bookkeeping"""
+
+    def test_fresh_database_gets_every_step_once(self, tmp_path):
+        """Test 1: All steps apply on the first run and none on the second"""
+        conn = sqlite3.connect(tmp_path / "equipment.db")
+        expected = [version for version, _, _ in MIGRATIONS["equipment"]]
+
+        assert run_migrations(conn, "equipment") == expected
+        assert run_migrations(conn, "equipment") == []
+        assert get_schema_version(conn) == expected[-1]
+        conn.close()
+
+    def test_legacy_equipment_database_is_upgraded(self, tmp_path):
+        """Test 2: A pre-runner database missing the newer columns is upgraded in place"""
+        conn = sqlite3.connect(tmp_path / "equipment.db")
+        conn.executescript("""
+            CREATE TABLE equipment_types (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                equipment_name TEXT NOT NULL UNIQUE,
+                description TEXT,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                maintenance_interval_days INTEGER NOT NULL
+            );
+            INSERT INTO equipment_types (equipment_name, width, height, depth, maintenance_interval_days)
+            VALUES ('Old Saw', 1, 2, 3, 30);
+        """)
+
+        run_migrations(conn, "equipment")
+
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(equipment_types)")]
+        assert {"color", "manufacturer", "model", "image_path"} <= set(columns)
+        assert conn.execute("SELECT equipment_name FROM equipment_types").fetchone()[0] == "Old Saw"
+        conn.close()
+
+
+class TestQueryPlans:
+    """Hot queries must be served by the migration indexes"""
+
+    def test_equipment_queries_use_indexes(self, owned_equipment, temp_dbs, query_log):
+        """Test 3: Per-user equipment, overdue and summary queries avoid table scans"""
+        user_id = owned_equipment['user']['id']
+        db = temp_dbs['equipment']
+
+        get_equipment_by_user(user_id)
+        assert "idx_user_equipment_user_purchased" in _plan(db, _last_select(query_log, "user_equipment"))
+
+        get_overdue_maintenance(user_id)
+        assert "idx_user_equipment_user_next_maintenance" in _plan(db, _last_select(query_log, "user_equipment"))
+
+        get_maintenance_summary(user_id)
+        plan = _plan(db, _last_select(query_log, "user_equipment"))
+        assert "COVERING INDEX idx_user_equipment_user_next_maintenance" in plan
+        assert "SCAN ue" not in plan
+
+    def test_shops_by_username_uses_index(self, owned_equipment, temp_dbs, query_log):
+        """Test 4: Listing a user's shops is an index search, not a scan"""
+        get_shop_spaces_by_username(owned_equipment['user']['username'])
+
+        plan = _plan(temp_dbs['shop_spaces'], _last_select(query_log, "FROM shop_spaces WHERE username"))
+        assert "idx_shop_spaces_username_created" in plan
+        assert "SCAN shop_spaces" not in plan
@@ -0,0 +1,215 @@
+"""
+Tests for compare-and-swap writes on shop_spaces.version
+"""
+import threading
+
+import pytest
+
+import shop_space_functions
+from shop_space_functions import (
+    get_shop_space_by_id,
+    update_equipment_position,
+    update_shop_space_dimensions,
+    remove_equipment_from_shop_space,
+    ShopVersionConflictError,
+)
+from equipment_library_db import add_equipment_to_user
+
+
+def _run_threads(count, target):
+    errors = []
+
+    def run(i):
+        try:
+            target(i)
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+class TestExpectedVersion:
+    """Test writes that pass expected_version"""
+
+    def test_stale_expected_version_is_rejected(self, owned_equipment, place):
+        """Test 1: A write based on an old version fails and changes nothing"""
+        shop = owned_equipment['shop']
+        first, second = (e['id'] for e in owned_equipment['equipment'][:2])
+        place(shop['shop_id'], first, 1.0)
+
+        with pytest.raises(ShopVersionConflictError) as excinfo:
+            place(shop['shop_id'], second, 10.0, expected_version=shop['version'])
+        with pytest.raises(ShopVersionConflictError):
+            update_shop_space_dimensions(shop['shop_id'], length=99, expected_version=shop['version'])
+
+        current = get_shop_space_by_id(shop['shop_id'])
+        assert excinfo.value.current_version == current['version'] == shop['version'] + 1
+        assert [p['equipment_id'] for p in current['equipment']] == [first]
+        assert current['length'] == shop['length']
+
+    def test_current_expected_version_is_accepted(self, owned_equipment, place):
+        """Test 2: A write based on the current version goes through and bumps it"""
+        shop = owned_equipment['shop']
+        equipment_id = owned_equipment['equipment'][0]['id']
+
+        placed = place(shop['shop_id'], equipment_id, 1.0, expected_version=shop['version'])
+        moved = update_equipment_position(shop['shop_id'], equipment_id, x=3.0, expected_version=placed['version'])
+        removed = remove_equipment_from_shop_space(shop['shop_id'], equipment_id, expected_version=moved['version'])
+
+        assert removed['version'] == shop['version'] + 3 and removed['equipment'] == []
+
+
+class TestValidatedRetries:
+    """Test validated writes that lose a race"""
+
+    def test_validated_write_retries_after_losing_the_race(self, owned_equipment, monkeypatch, place):
+        """Test 3: A validated write whose check went stale is re-checked instead of failing"""
+        shop_id = owned_equipment['shop']['shop_id']
+        mine, theirs = (e['id'] for e in owned_equipment['equipment'][:2])
+        real_get = shop_space_functions.get_shop_space_by_id
+        reads = []
+
+        def racing_get(requested_id):
+            shop = real_get(requested_id)
+            reads.append(shop['version'])
+            if len(reads) == 1:
+                place(shop_id, theirs, 1.0)  # another writer commits right after our read
+            return shop
+
+        monkeypatch.setattr(shop_space_functions, "get_shop_space_by_id", racing_get)
+
+        with pytest.raises(shop_space_functions.PlacementConflictError):
+            place(shop_id, mine, 1.5, validate="collision")
+
+        assert len(reads) == 2 and reads[1] == reads[0] + 1
+        assert [p['equipment_id'] for p in real_get(shop_id)['equipment']] == [theirs]
+
+    def test_retries_are_bounded(self, owned_equipment, monkeypatch, place):
+        """Test 4: A writer that keeps losing gives up with ShopVersionConflictError"""
+        shop_id = owned_equipment['shop']['shop_id']
+        equipment = [e['id'] for e in owned_equipment['equipment']]
+        place(shop_id, equipment[0], 1.0)
+        real_get = shop_space_functions.get_shop_space_by_id
+
+        def always_racing_get(requested_id):
+            shop = real_get(requested_id)
+            update_shop_space_dimensions(shop_id, height=shop['height'])  # bumps the version
+            return shop
+
+        monkeypatch.setattr(shop_space_functions, "get_shop_space_by_id", always_racing_get)
+        monkeypatch.setattr(shop_space_functions, "WRITE_ATTEMPTS", 3)
+        monkeypatch.setattr(shop_space_functions, "RETRY_BASE_DELAY", 0)
+
+        with pytest.raises(ShopVersionConflictError):
+            update_equipment_position(shop_id, equipment[0], x=20.0, validate="collision")
+        assert real_get(shop_id)['equipment'][0]['x_coordinate'] == 1.0
+
+
+class TestConflictRoutes:
+    """Test version conflicts through the routes"""
+
+    def test_routes_return_409_for_stale_versions(self, owned_equipment, client, place):
+        """Test 5: Routes turn version conflicts into 409 with the current version"""
+        shop = owned_equipment['shop']
+        first, second = (e['id'] for e in owned_equipment['equipment'][:2])
+        place(shop['shop_id'], first, 1.0)
+        stale = shop['version']
+
+        added = client.post(f"/api/shops/{shop['shop_id']}/equipment", json={
+            "equipment_id": second, "x_coordinate": 10, "y_coordinate": 5, "z_coordinate": 0, "version": stale
+        })
+        resized = client.put(f"/api/shops/{shop['shop_id']}", json={"length": 50, "version": stale})
+        removed = client.delete(f"/api/shops/{shop['shop_id']}/equipment/{first}?version={stale}")
+        fresh = client.put(f"/api/shops/{shop['shop_id']}", json={"length": 50, "version": stale + 1})
+
+        assert [r.status_code for r in (added, resized, removed)] == [409, 409, 409]
+        assert added.get_json()['current_version'] == stale + 1
+        assert fresh.status_code == 200 and fresh.get_json()['shop']['version'] == stale + 2
+
+    def test_resize_and_moves_commit_or_conflict_together(self, owned_equipment, client, place, monkeypatch):
+        """Test 6: A PUT that loses the race after its layout read saves neither the resize nor the moves"""
+        shop_id = owned_equipment['shop']['shop_id']
+        first = owned_equipment['equipment'][0]['id']
+        shop = place(shop_id, first, 1.0)
+        real_get = shop_space_functions.get_shop_space_by_id
+
+        def racing_get(requested_id):
+            current = real_get(requested_id)
+            update_equipment_position(shop_id, first, rotation_deg=90.0)  # another writer commits now
+            return current
+
+        monkeypatch.setattr(shop_space_functions, "get_shop_space_by_id", racing_get)
+        lost = client.put(f"/api/shops/{shop_id}", json={
+            "length": 50, "shop_name": "Renamed", "version": shop['version'], "validate": "collision",
+            "equipment_positions": [{"equipment_id": first, "x": 12.0, "y": 5.0}],
+        })
+        monkeypatch.setattr(shop_space_functions, "get_shop_space_by_id", real_get)
+
+        assert lost.status_code == 409 and lost.get_json()['current_version'] == shop['version'] + 1
+        current = real_get(shop_id)
+        assert (current['length'], current['shop_name']) == (shop['length'], shop['shop_name'])
+        assert current['equipment'][0]['x_coordinate'] == 1.0
+
+        saved = client.put(f"/api/shops/{shop_id}", json={
+            "length": 50, "version": current['version'],
+            "equipment_positions": [{"equipment_id": first, "x": 12.0, "y": 5.0}],
+        }).get_json()['shop']
+        assert saved['version'] == current['version'] + 1
+        assert (saved['length'], saved['equipment'][0]['x_coordinate']) == (50, 12.0)
+
+
+class TestConcurrentWriters:
+    """Test many threads writing one shop"""
+
+    def test_concurrent_read_modify_write_loses_no_updates(self, owned_equipment, place):
+        """Test 7: Threads incrementing one coordinate via CAS never overwrite each other"""
+        shop_id = owned_equipment['shop']['shop_id']
+        equipment_id = owned_equipment['equipment'][0]['id']
+        start = place(shop_id, equipment_id, 0.0)
+        threads, increments = 8, 15
+        conflicts = []
+
+        def increment(_):
+            for _ in range(increments):
+                while True:
+                    shop = get_shop_space_by_id(shop_id)
+                    x = shop['equipment'][0]['x_coordinate']
+                    try:
+                        update_equipment_position(shop_id, equipment_id, x=x + 1, expected_version=shop['version'])
+                        break
+                    except ShopVersionConflictError:
+                        conflicts.append(1)  # someone else won; re-read and reapply
+
+        _run_threads(threads, increment)
+
+        final = get_shop_space_by_id(shop_id)
+        assert final['equipment'][0]['x_coordinate'] == threads * increments
+        assert final['version'] == start['version'] + threads * increments
+
+    def test_concurrent_validated_placements_never_overlap(self, owned_equipment, place):
+        """Test 8: Threads racing for the same spot with validation leave exactly one winner"""
+        user_id = owned_equipment['user']['id']
+        shop_id = owned_equipment['shop']['shop_id']
+        saw = owned_equipment['equipment_type']
+        equipment = [e['id'] for e in owned_equipment['equipment']]
+        equipment += [add_equipment_to_user(user_id, saw['id'])['id'] for _ in range(5)]
+        outcomes = []
+
+        def race(i):
+            try:
+                place(shop_id, equipment[i], 10.0, 10.0, validate="collision")
+                outcomes.append("placed")
+            except shop_space_functions.PlacementConflictError:
+                outcomes.append("collision")
+            except ShopVersionConflictError:
+                outcomes.append("gave up")
+
+        _run_threads(len(equipment), race)
+
+        assert outcomes.count("placed") == 1
+        assert len(get_shop_space_by_id(shop_id)['equipment']) == 1
@@ -0,0 +1,143 @@
+"""
+Tests for keyset pagination of shop, equipment and user listings
+"""
+import sqlite3
+
+import pytest
+
+from pagination import encode_cursor, decode_cursor, clamp_limit, MAX_PAGE_SIZE
+from shop_space_functions import create_shop_space, get_shop_spaces_page, get_all_shop_spaces
+from equipment_library_db import add_equipment_to_user, get_user_equipment_page, get_equipment_by_user
+from users_functions import add_user, check_usernames_page
+
+
+def _all_pages(fetch, key, limit):
+    """Follow next_cursor until the last page, returning every item and the page sizes"""
+    items, sizes, cursor = [], [], None
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        items.extend(page[key])
+        sizes.append(len(page[key]))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, sizes
+
+
+class TestCursorHelpers:
+    """Test cursor encoding and limit handling"""
+
+    def test_cursor_round_trip(self):
+        """Test 1: A cursor decodes back to the key it was built from"""
+        assert decode_cursor(encode_cursor(["2024-01-01T00:00:00", "shop_1"]), 2) == ["2024-01-01T00:00:00", "shop_1"]
+        assert decode_cursor(None, 2) is None
+
+    def test_bad_cursor_and_limit_rejected(self):
+        """Test 2: Garbage cursors and limits raise ValueError; big limits are capped"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor!", 2)
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor([1]), 2)
+        with pytest.raises(ValueError):
+            clamp_limit("0")
+        assert clamp_limit(10 ** 6) == MAX_PAGE_SIZE
+
+
+class TestKeysetPages:
+    """Pages must cover every row exactly once, in order"""
+
+    def test_shop_pages_cover_all_shops(self, owned_equipment):
+        """Test 3: Paging through shops returns each shop once, newest first"""
+        username = owned_equipment['user']['username']
+        for i in range(6):
+            create_shop_space(username, f"Shop {i}", 20.0, 20.0, 10.0)
+
+        shops, sizes = _all_pages(get_shop_spaces_page, "shops", 3)
+
+        assert sizes == [3, 3, 1]
+        assert sorted(s['shop_id'] for s in shops) == sorted(s['shop_id'] for s in get_all_shop_spaces())
+        keys = [(s['creation_timestamp'], s['shop_id']) for s in shops]
+        assert keys == sorted(keys, reverse=True)
+
+        by_user = get_shop_spaces_page(username=username, limit=100)
+        assert len(by_user['shops']) == 7 and by_user['next_cursor'] is None
+
+    def test_equipment_pages_break_ties_by_id(self, owned_equipment):
+        """Test 4: Items bought the same day still page without gaps or repeats"""
+        user_id = owned_equipment['user']['id']
+        type_id = owned_equipment['equipment_type']['id']
+        for _ in range(4):
+            add_equipment_to_user(user_id, type_id)
+
+        items, sizes = _all_pages(
+            lambda **kw: get_user_equipment_page(user_id, **kw), "equipment", 2
+        )
+
+        assert sizes == [2, 2, 2, 1]
+        assert sorted(e['id'] for e in items) == sorted(e['id'] for e in get_equipment_by_user(user_id))
+        assert len({e['id'] for e in items}) == 7
+
+    def test_username_search_pages(self, temp_dbs):
+        """Test 5: Username search pages in username order"""
+        for name in ["carol", "alice", "bob", "dave"]:
+            add_user(name, name.title(), f"{name}@example.com", "pw")
+
+        users, sizes = _all_pages(lambda **kw: check_usernames_page("a", **kw), "users", 2)
+
+        assert [u['username'] for u in users] == ["alice", "carol", "dave"]
+        assert sizes == [2, 1]
+
+    def test_username_search_pages_use_the_trigram_index(self, temp_dbs, query_log):
+        """Test 6: Longer terms page through the FTS index and never read password hashes"""
+        for name in ["carol", "caroline", "oscar", "bob"]:
+            add_user(name, name.title(), f"{name}@example.com", "pw")
+        query_log.clear()
+
+        users, sizes = _all_pages(lambda **kw: check_usernames_page("car", **kw), "users", 2)
+
+        assert [u['username'] for u in users] == ["carol", "caroline", "oscar"]
+        assert sizes == [2, 1]
+        assert all("password" not in u for u in users)
+        searches = [s for s in query_log if "users_search MATCH" in s]
+        assert len(searches) == 2
+        assert all("SELECT *" not in s for s in searches)
+
+
+class TestPageQueryPlans:
+    """Each page must be an index seek with no sort step"""
+
+    def test_shop_page_uses_keyset_index(self, owned_equipment, temp_dbs, query_log):
+        """Test 7: A later page seeks the (creation_timestamp, shop_id) index"""
+        cursor = encode_cursor(["9999-01-01T00:00:00", "zzz"])
+        get_shop_spaces_page(limit=10, cursor=cursor)
+
+        sql = [s for s in query_log if s.lstrip().startswith("SELECT * FROM shop_spaces")][-1]
+        with sqlite3.connect(temp_dbs['shop_spaces']) as conn:
+            plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "idx_shop_spaces_created_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestPaginatedRoutes:
+    """Test limit/cursor query parameters on the routes"""
+
+    def test_shop_list_route_pages(self, client, owned_equipment):
+        """Test 8: GET /api/shops/ returns a page and rejects bad cursors"""
+        create_shop_space(owned_equipment['user']['username'], "Second", 20.0, 20.0, 10.0)
+
+        first = client.get("/api/shops/?limit=1").get_json()
+        second = client.get(f"/api/shops/?limit=1&cursor={first['next_cursor']}").get_json()
+
+        assert len(first['shops']) == 1 and len(second['shops']) == 1
+        assert first['shops'][0]['shop_id'] != second['shops'][0]['shop_id']
+        assert second['next_cursor'] is None
+        assert client.get("/api/shops/?cursor=bogus").status_code == 400
+
+    def test_shop_list_route_defaults_to_every_shop(self, client, owned_equipment):
+        """Test 9: GET /api/shops/ without limit or cursor returns the full list, unpaged"""
+        for i in range(3):
+            create_shop_space(owned_equipment['user']['username'], f"Extra{i}", 20.0, 20.0, 10.0)
+
+        body = client.get("/api/shops/").get_json()
+
+        assert len(body['shops']) == 4
+        assert "next_cursor" not in body
@@ -0,0 +1,142 @@
+"""
+Tests for salted password hashing, rehash-on-login and the bounded hashing pool
+"""
+import hashlib
+import sqlite3
+import threading
+
+import pytest
+
+import password_hashing
+from password_hashing import (
+    ScryptHasher,
+    Pbkdf2Hasher,
+    HashingPool,
+    HashingBusyError,
+    verify_password,
+    needs_rehash,
+)
+from users_functions import add_user, auth_user
+
+
+def _stored_password(db_path, username):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()[0]
+
+
+class TestHashers:
+    """Test the hasher implementations"""
+
+    @pytest.mark.parametrize("hasher", [ScryptHasher(n=1024), Pbkdf2Hasher(iterations=1000)])
+    def test_round_trip(self, hasher):
+        """Test 1: A hash verifies its own password only and is salted"""
+        encoded = hasher.hash("hunter2")
+
+        assert encoded.startswith(hasher.algorithm + "$")
+        assert hasher.verify(encoded, "hunter2")
+        assert not hasher.verify(encoded, "hunter3")
+        assert hasher.hash("hunter2") != encoded
+
+    def test_cost_change_needs_rehash(self):
+        """Test 2: Hashes made with other parameters are flagged for rehash"""
+        assert Pbkdf2Hasher(iterations=2000).needs_rehash(Pbkdf2Hasher(iterations=1000).hash("pw"))
+        assert not ScryptHasher(n=1024).needs_rehash(ScryptHasher(n=1024).hash("pw"))
+        assert ScryptHasher(n=1024).needs_rehash(Pbkdf2Hasher(iterations=1000).hash("pw"))
+
+    def test_legacy_sha256_still_verifies(self):
+        """Test 3: Old unsalted SHA-256 hashes verify and always need a rehash"""
+        legacy = hashlib.sha256(b"oldpass").hexdigest()
+
+        assert verify_password(legacy, "oldpass")
+        assert not verify_password(legacy, "newpass")
+        assert needs_rehash(legacy)
+
+
+class TestLogin:
+    """Test auth_user lookups and transparent upgrades"""
+
+    def test_legacy_hash_upgraded_on_login(self, temp_dbs):
+        """Test 4: Logging in with a legacy hash stores a salted hash of the current kind"""
+        add_user("legacy", "Legacy User", "legacy@example.com", "placeholder")
+        with sqlite3.connect(temp_dbs['users']) as conn:
+            conn.execute(
+                "UPDATE users SET password = ? WHERE username = 'legacy'",
+                (hashlib.sha256(b"oldpass").hexdigest(),)
+            )
+
+        assert auth_user("legacy@example.com", "oldpass")['username'] == "legacy"
+
+        stored = _stored_password(temp_dbs['users'], "legacy")
+        assert stored.startswith(password_hashing.get_hasher().algorithm + "$")
+        assert auth_user("legacy", "oldpass") is not None
+        assert auth_user("legacy", "wrong") is None
+
+    def test_login_queries_use_unique_indexes(self, temp_dbs, query_log):
+        """Test 5: Username and email lookups are separate index searches, not an OR scan"""
+        add_user("indexed", "Indexed User", "indexed@example.com", "pw")
+        query_log.clear()
+
+        auth_user("indexed@example.com", "pw")
+
+        selects = [s for s in query_log if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 2
+        with sqlite3.connect(temp_dbs['users']) as conn:
+            for sql in selects:
+                plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+                assert "USING INDEX" in plan and "SCAN" not in plan
+
+
+class TestHashingPool:
+    """Test the bounded hashing thread pool"""
+
+    def test_saturated_pool_rejects(self):
+        """Test 6: With every slot taken, new work fails fast with HashingBusyError"""
+        pool = HashingPool(workers=1, max_pending=0, wait_seconds=0.05)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        holder = threading.Thread(target=pool.run, args=(block,))
+        holder.start()
+        started.wait(5)
+        try:
+            with pytest.raises(HashingBusyError):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            holder.join(5)
+
+        assert pool.run(lambda: 42) == 42
+        assert pool.stats()['rejected'] == 1
+
+    def test_failed_work_is_not_counted_as_completed(self):
+        """Test 7: Work that raises counts as failed, and its slot is freed"""
+        pool = HashingPool(workers=1, max_pending=0, wait_seconds=0.05)
+
+        def fail():
+            raise ValueError("bad hash")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                pool.run(fail)
+        assert pool.run(lambda: 42) == 42
+
+        stats = pool.stats()
+        assert (stats['completed'], stats['failed'], stats['rejected']) == (1, 2, 0)
+
+    def test_login_route_returns_503_when_busy(self, client, temp_dbs, monkeypatch):
+        """Test 8: The login route answers 503 with Retry-After instead of queueing forever"""
+        add_user("busy", "Busy User", "busy@example.com", "pw")
+
+        class FullPool:
+            def run(self, func, *args):
+                raise HashingBusyError("Too many logins in progress, try again shortly")
+
+        monkeypatch.setattr(password_hashing, "hashing_pool", FullPool())
+        response = client.post("/api/auth/login", json={"identifier": "busy", "password": "pw"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,146 @@
+"""
+Tests for shop placements stored in the shop_placements table
+"""
+import json
+import sqlite3
+import pytest
+
+from shop_space_functions import (
+    remove_equipment_from_shop_space,
+    update_equipment_position,
+    update_equipment_positions,
+    get_shop_space_by_id,
+    get_shop_spaces_by_username,
+    delete_shop_space,
+    init_shop_spaces_db,
+)
+
+
+class TestPlacementRows:
+    """Test row-level placement writes"""
+
+    def test_add_returns_placement_in_equipment_list(self, owned_equipment, place):
+        """Test 1: Added equipment shows up with the usual dict shape"""
+        shop_id = owned_equipment['shop']['shop_id']
+        eq_id = owned_equipment['equipment'][0]['id']
+
+        shop = place(shop_id, eq_id, 5.0, 6.0)
+
+        assert len(shop['equipment']) == 1
+        placement = shop['equipment'][0]
+        assert set(placement) == {
+            'equipment_id', 'date_added', 'x_coordinate', 'y_coordinate', 'z_coordinate', 'rotation_deg'
+        }
+        assert placement['equipment_id'] == eq_id
+        assert placement['x_coordinate'] == 5.0
+
+    def test_placements_keep_insertion_order(self, owned_equipment, place):
+        """Test 2: Placements come back in the order they were added"""
+        shop_id = owned_equipment['shop']['shop_id']
+        ids = [eq['id'] for eq in owned_equipment['equipment']]
+        for i, eq_id in enumerate(reversed(ids)):
+            place(shop_id, eq_id, float(i), 0.0)
+
+        shop = get_shop_space_by_id(shop_id)
+        assert [p['equipment_id'] for p in shop['equipment']] == list(reversed(ids))
+
+    def test_duplicate_placement_rejected(self, owned_equipment, place):
+        """Test 3: The same equipment cannot be placed twice in one shop"""
+        shop_id = owned_equipment['shop']['shop_id']
+        eq_id = owned_equipment['equipment'][0]['id']
+        place(shop_id, eq_id, 1.0, 1.0)
+
+        with pytest.raises(ValueError):
+            place(shop_id, eq_id, 2.0, 2.0)
+
+    def test_update_changes_only_given_fields(self, owned_equipment, place):
+        """Test 4: update_equipment_position leaves omitted fields alone"""
+        shop_id = owned_equipment['shop']['shop_id']
+        eq_id = owned_equipment['equipment'][0]['id']
+        place(shop_id, eq_id, 1.0, 2.0)
+
+        shop = update_equipment_position(shop_id, eq_id, x=9.0, rotation_deg=90)
+
+        placement = shop['equipment'][0]
+        assert placement['x_coordinate'] == 9.0
+        assert placement['y_coordinate'] == 2.0
+        assert placement['rotation_deg'] == 90
+
+    def test_update_missing_equipment_raises(self, owned_equipment):
+        """Test 5: Updating equipment that is not in the shop raises ValueError"""
+        shop_id = owned_equipment['shop']['shop_id']
+        with pytest.raises(ValueError, match="not found in shop"):
+            update_equipment_position(shop_id, 9999, x=1.0)
+
+    def test_remove_and_cascade_delete(self, owned_equipment, temp_dbs, place):
+        """Test 6: Removing one placement and deleting the shop clean up rows"""
+        shop_id = owned_equipment['shop']['shop_id']
+        first, second = [eq['id'] for eq in owned_equipment['equipment'][:2]]
+        place(shop_id, first, 1.0, 1.0)
+        place(shop_id, second, 5.0, 5.0)
+
+        shop = remove_equipment_from_shop_space(shop_id, first)
+        assert [p['equipment_id'] for p in shop['equipment']] == [second]
+
+        assert delete_shop_space(shop_id) is True
+        with sqlite3.connect(temp_dbs['shop_spaces']) as conn:
+            remaining = conn.execute("SELECT COUNT(*) FROM shop_placements").fetchone()[0]
+        assert remaining == 0
+
+
+class TestBulkPositionUpdate:
+    """Test update_equipment_positions"""
+
+    def test_bulk_update_applies_all_and_reports_failures(self, owned_equipment, place):
+        """Test 7: Valid updates are applied and unknown IDs are reported"""
+        shop_id = owned_equipment['shop']['shop_id']
+        first, second = [eq['id'] for eq in owned_equipment['equipment'][:2]]
+        place(shop_id, first, 1.0, 1.0)
+        place(shop_id, second, 2.0, 2.0)
+
+        results = update_equipment_positions(shop_id, [
+            {"equipment_id": first, "x": 10.0, "y": 11.0},
+            {"equipment_id": 9999, "x": 0.0},
+            {"equipment_id": second, "rotation_deg": 180},
+        ])
+
+        assert [r['success'] for r in results] == [True, False, True]
+        assert "not found" in results[1]['error']
+        placements = {p['equipment_id']: p for p in get_shop_space_by_id(shop_id)['equipment']}
+        assert (placements[first]['x_coordinate'], placements[first]['y_coordinate']) == (10.0, 11.0)
+        assert placements[second]['x_coordinate'] == 2.0
+        assert placements[second]['rotation_deg'] == 180
+
+    def test_bulk_update_unknown_shop_raises(self, temp_dbs):
+        """Test 8: A missing shop raises ValueError"""
+        with pytest.raises(ValueError):
+            update_equipment_positions("no_such_shop", [{"equipment_id": 1, "x": 1.0}])
+
+
+class TestLegacyMigration:
+    """Test conversion of the old shop_spaces.equipment JSON column"""
+
+    def test_json_blob_is_moved_to_table(self, owned_equipment, temp_dbs):
+        """Test 9: Re-running init converts leftover JSON placements"""
+        shop = owned_equipment['shop']
+        legacy = [
+            {"equipment_id": 11, "date_added": "2025-01-01T00:00:00", "x_coordinate": 1.0,
+             "y_coordinate": 2.0, "z_coordinate": 0.0, "rotation_deg": 0.0},
+            {"equipment_id": 12, "date_added": "2025-01-02T00:00:00", "x_coordinate": 3.0,
+             "y_coordinate": 4.0, "z_coordinate": 0.0, "rotation_deg": 45.0},
+        ]
+        with sqlite3.connect(temp_dbs['shop_spaces']) as conn:
+            conn.execute(
+                "UPDATE shop_spaces SET equipment = ? WHERE shop_id = ?",
+                (json.dumps(legacy), shop['shop_id'])
+            )
+
+        init_shop_spaces_db(temp_dbs['shop_spaces'])
+
+        shops = get_shop_spaces_by_username(shop['username'])
+        assert shops[0]['equipment'] == legacy
+        with sqlite3.connect(temp_dbs['shop_spaces']) as conn:
+            blob = conn.execute(
+                "SELECT equipment FROM shop_spaces WHERE shop_id = ?", (shop['shop_id'],)
+            ).fetchone()[0]
+        assert blob == '[]'
@@ -0,0 +1,79 @@
+"""
+Tests for the server-side spatial index used for collision and clearance checks
+"""
+import pytest
+
+from models.spatial_index import Footprint, ShopSpatialIndex, SpatialGrid, rotated_bounding_box
+from models.placement import Position, EquipmentPlacement
+from shop_space_functions import (
+    add_equipment_to_shop_space,
+    update_equipment_position,
+    get_shop_conflicts,
+    PlacementConflictError,
+)
+
+
+class TestSpatialIndex:
+    """Test the grid and footprint geometry"""
+
+    def test_rotation_swaps_extents(self):
+        """Test 1: A 90 degree rotation swaps width and depth"""
+        left, top, right, bottom = rotated_bounding_box(10, 10, 4, 2, 90)
+        assert right - left == pytest.approx(2)
+        assert bottom - top == pytest.approx(4)
+
+    def test_touching_boxes_do_not_collide(self):
+        """Test 2: Tools that share an edge are not a collision"""
+        index = ShopSpatialIndex(50, 50, [Footprint(1, 5, 5, 2, 2)])
+        assert index.collisions_for(Footprint(2, 7, 5, 2, 2)) == []
+        assert index.collisions_for(Footprint(2, 6.5, 5, 2, 2)) == [1]
+
+    def test_grid_query_spans_cells(self):
+        """Test 3: Boxes covering several cells are found from any of them"""
+        grid = SpatialGrid(cell_size=1.0)
+        grid.insert("big", (0, 0, 10, 10))
+        assert grid.query((8.5, 8.5, 9, 9)) == ["big"]
+        grid.remove("big")
+        assert grid.query((8.5, 8.5, 9, 9)) == []
+
+    def test_clearance_against_wall(self):
+        """Test 4: A table saw's side clearance pushed past a wall is reported"""
+        saw = Footprint(1, 3, 10, 3, 2, name="Table Saw")
+        index = ShopSpatialIndex(40, 40)
+        assert index.check(saw, "clearance")["clearance"] == [1]
+        assert index.check(saw, "collision")["clearance"] == []
+
+
+class TestPlacementValidation:
+    """Test validated writes in shop_space_functions"""
+
+    def test_validated_add_rejects_overlap(self, owned_equipment):
+        """Test 5: Adding on top of another tool raises PlacementConflictError"""
+        shop_id = owned_equipment['shop']['shop_id']
+        first, second = [eq['id'] for eq in owned_equipment['equipment'][:2]]
+        add_equipment_to_shop_space(shop_id, EquipmentPlacement(first, Position(10.0, 10.0, 0.0)))
+
+        with pytest.raises(PlacementConflictError) as excinfo:
+            add_equipment_to_shop_space(
+                shop_id, EquipmentPlacement(second, Position(10.5, 10.5, 0.0)), validate="collision"
+            )
+        assert excinfo.value.conflicts["collisions"] == [first]
+
+    def test_unvalidated_add_still_allowed(self, owned_equipment):
+        """Test 6: Without a mode, overlapping placements are stored as before"""
+        shop_id = owned_equipment['shop']['shop_id']
+        first, second = [eq['id'] for eq in owned_equipment['equipment'][:2]]
+        add_equipment_to_shop_space(shop_id, EquipmentPlacement(first, Position(10.0, 10.0, 0.0)))
+        shop = add_equipment_to_shop_space(shop_id, EquipmentPlacement(second, Position(10.5, 10.5, 0.0)))
+
+        assert len(shop['equipment']) == 2
+        assert get_shop_conflicts(shop_id)["collisions"] == [sorted([first, second])]
+
+    def test_validated_move_ignores_self(self, owned_equipment):
+        """Test 7: Nudging a tool does not collide with its own old position"""
+        shop_id = owned_equipment['shop']['shop_id']
+        first = owned_equipment['equipment'][0]['id']
+        add_equipment_to_shop_space(shop_id, EquipmentPlacement(first, Position(10.0, 10.0, 0.0)))
+
+        shop = update_equipment_position(shop_id, first, x=10.5, validate="collision")
+        assert shop['equipment'][0]['x_coordinate'] == 10.5
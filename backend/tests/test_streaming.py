@@ -0,0 +1,59 @@
+"""
+Tests for lazily iterated listings and streamed JSON / NDJSON responses
+"""
+import json
+from itertools import islice
+
+from shop_space_functions import (
+    create_shop_space,
+    iter_all_shop_spaces,
+    get_shop_space_by_id,
+)
+from equipment_library_db import iter_all_user_equipment, get_equipment_by_user
+
+
+class TestIterators:
+    """Test the generator versions of the all-rows queries"""
+
+    def test_iter_shops_groups_placements(self, placed_equipment):
+        """Test 1: Each yielded shop carries exactly its own placements in insertion order"""
+        shop_id = placed_equipment['shop']['shop_id']
+        empty = create_shop_space(placed_equipment['user']['username'], "Empty", 10.0, 10.0, 8.0)
+
+        shops = {shop['shop_id']: shop for shop in iter_all_shop_spaces()}
+
+        assert shops[shop_id]['equipment'] == get_shop_space_by_id(shop_id)['equipment']
+        assert shops[empty['shop_id']]['equipment'] == []
+
+    def test_iterators_are_lazy(self, owned_equipment, query_log):
+        """Test 2: Taking one item runs a single query without reading the rest"""
+        first = list(islice(iter_all_user_equipment(), 1))
+
+        assert len(first) == 1
+        assert len([s for s in query_log if s.lstrip().upper().startswith("SELECT")]) == 1
+        assert len(list(iter_all_user_equipment())) == len(get_equipment_by_user(owned_equipment['user']['id']))
+
+
+class TestStreamedRoutes:
+    """Test streamed JSON and NDJSON responses"""
+
+    def test_shops_stream_as_json(self, client, placed_equipment):
+        """Test 3: ?stream=1 returns every shop as one JSON document, streamed"""
+        response = client.get("/api/shops/?stream=1")
+
+        assert response.is_streamed
+        body = json.loads(response.get_data(as_text=True))
+        assert [shop['shop_id'] for shop in body['shops']] == [placed_equipment['shop']['shop_id']]
+        assert len(body['shops'][0]['equipment']) == 3
+
+    def test_equipment_stream_as_ndjson(self, client, owned_equipment):
+        """Test 4: Accept: application/x-ndjson gets one JSON object per line"""
+        response = client.get("/api/equipment/user-equipment", headers={"Accept": "application/x-ndjson"})
+
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert sorted(json.loads(line)['id'] for line in lines) == sorted(e['id'] for e in owned_equipment['equipment'])
+
+    def test_empty_stream_is_valid_json(self, client, temp_dbs):
+        """Test 5: An empty table still produces a well-formed document"""
+        assert json.loads(client.get("/api/shops/?stream=1").get_data(as_text=True)) == {"shops": []}
@@ -0,0 +1,110 @@
+"""
+Tests for exporting and importing a user's shops and equipment
+"""
+import io
+
+import pytest
+
+import tenant_export
+from tenant_export import write_export, read_export, import_records, iter_export_records
+from shop_space_functions import get_shop_spaces_by_username
+from equipment_library_db import get_equipment_by_user, get_equipment_catalog
+from users_functions import add_user, get_user_id_by_username
+
+
+def get_equipment_by_user_name(username):
+    return get_equipment_by_user(get_user_id_by_username(username))
+
+
+def _layout(username):
+    """Comparable view of a user's shops: names, sizes and placements by equipment notes/type"""
+    equipment = {e['id']: (e['equipment_name'], e['date_purchased']) for e in get_equipment_by_user_name(username)}
+    return [
+        (shop['shop_name'], shop['length'], shop['width'],
+         [(equipment[p['equipment_id']], p['x_coordinate'], p['y_coordinate'], p['rotation_deg']) for p in shop['equipment']])
+        for shop in get_shop_spaces_by_username(username)
+    ]
+
+
+class TestRoundTrip:
+    """Test exporting one user and importing under another"""
+
+    @pytest.mark.parametrize("fmt", ["ndjson", "columnar"])
+    def test_round_trip_to_another_user(self, placed_equipment, fmt):
+        """Test 1: Exporting and importing recreates shops, equipment and placements under new IDs"""
+        add_user("target", "Target User", "target@example.com", "pw")
+        buffer = io.StringIO()
+
+        write_export("fixture_user", buffer, fmt)
+        buffer.seek(0)
+        result = import_records(read_export(buffer), "target")
+
+        assert result['user_equipment'] == 3 and result['shop_spaces'] == 1 and result['placements'] == 3
+        assert result['equipment_types'] == 0  # matched by name on the same catalog
+        assert _layout("target") == _layout("fixture_user")
+        new_ids = {e['id'] for e in get_equipment_by_user_name("target")}
+        assert new_ids.isdisjoint(e['id'] for e in placed_equipment['equipment'])
+
+    def test_columnar_chunks_pack_coordinates(self, placed_equipment, monkeypatch):
+        """Test 2: Columnar exports split placements into base64 column chunks"""
+        monkeypatch.setattr(tenant_export, "CHUNK_SIZE", 2)
+
+        chunks = [r for r in iter_export_records("fixture_user", "columnar") if r['type'] == "placement_columns"]
+
+        assert [c['count'] for c in chunks] == [2, 1]
+        assert list(tenant_export._expand_placements(chunks[0]))[1]['x_coordinate'] == 4.25
+
+
+class TestImportChecks:
+    """Test catalog matching and rejected streams"""
+
+    def test_missing_catalog_types_are_created(self, owned_equipment, temp_dbs):
+        """Test 3: Types unknown on the target are created from the export"""
+        records = list(iter_export_records("fixture_user"))
+        for record in records:
+            if record['type'] == "equipment_type":
+                record['equipment_name'] = "Imported Saw"
+        add_user("target", "Target User", "target@example.com", "pw")
+
+        result = import_records(records, "target")
+
+        assert result['equipment_types'] == 1
+        assert "Imported Saw" in [t['equipment_name'] for t in get_equipment_catalog()]
+
+    def test_bad_stream_rolls_back(self, placed_equipment):
+        """Test 4: A broken export imports nothing"""
+        add_user("target", "Target User", "target@example.com", "pw")
+        records = list(iter_export_records("fixture_user"))
+        records[-1] = {**records[-1], "equipment_id": 424242}
+
+        with pytest.raises(ValueError):
+            import_records(records, "target")
+
+        assert get_equipment_by_user_name("target") == []
+        assert get_shop_spaces_by_username("target") == []
+
+    def test_rejects_foreign_files(self, owned_equipment):
+        """Test 5: Streams without the export header are refused"""
+        with pytest.raises(ValueError):
+            import_records([{"type": "shop_space"}], "fixture_user")
+        with pytest.raises(ValueError):
+            list(iter_export_records("nobody"))
+
+
+class TestOrphanedPlacements:
+    """Test placements left behind by deleted equipment"""
+
+    def test_placements_of_deleted_equipment_are_left_out(self, placed_equipment):
+        """Test 6: Deleting placed equipment leaves its placement behind, and the export still imports"""
+        from equipment_library_db import delete_user_equipment
+
+        delete_user_equipment(placed_equipment['equipment'][1]['id'])
+        add_user("target", "Target User", "target@example.com", "pw")
+
+        records = list(iter_export_records("fixture_user"))
+        result = import_records(records, "target")
+
+        placed = [r['equipment_id'] for r in records if r['type'] == "placement"]
+        assert placed == [placed_equipment['equipment'][0]['id'], placed_equipment['equipment'][2]['id']]
+        assert result['user_equipment'] == 2 and result['placements'] == 2
+        assert len(get_shop_spaces_by_username("target")[0]['equipment']) == 2
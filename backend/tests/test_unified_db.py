@@ -0,0 +1,99 @@
+"""
+Tests for the unified connection that attaches all three databases
+"""
+import sqlite3
+
+import pytest
+
+from unified_db import unified_connection, run_unified_write
+from models.placement import Position, EquipmentPlacement
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestUnifiedConnection:
+
+    def test_attaches_every_database(self, temp_dbs):
+        """Test 1: One pooled connection sees the three files under their schema names, in WAL"""
+        conn = unified_connection()
+
+        attached = {row['name']: row['file'] for row in conn.execute("PRAGMA database_list")}
+        assert attached["users"] == str(temp_dbs["users"])
+        assert attached["equipment"] == str(temp_dbs["equipment"])
+        assert attached["shop_spaces"] == str(temp_dbs["shop_spaces"])
+        for schema in ("users", "equipment", "shop_spaces"):
+            assert conn.execute(f"PRAGMA {schema}.journal_mode").fetchone()[0] == "wal"
+        assert unified_connection() is conn
+
+    def test_write_spanning_files_rolls_back_together(self, owned_equipment, temp_dbs):
+        """Test 2: An error after writing to two files leaves both untouched"""
+        shop_id = owned_equipment['shop']['shop_id']
+        equipment_id = owned_equipment['equipment'][0]['id']
+
+        def work(conn):
+            conn.execute("DELETE FROM equipment.user_equipment WHERE id = ?", (equipment_id,))
+            conn.execute("UPDATE shop_spaces.shop_spaces SET version = version + 1 WHERE shop_id = ?", (shop_id,))
+            raise ValueError("abort")
+
+        with pytest.raises(ValueError):
+            run_unified_write(work)
+
+        assert _count(temp_dbs["equipment"], "user_equipment") == 3
+        from shop_space_functions import get_shop_space_by_id
+        assert get_shop_space_by_id(shop_id)['version'] == owned_equipment['shop']['version']
+
+    def test_write_spanning_files_commits_both(self, owned_equipment, temp_dbs):
+        """Test 3: One transaction changes two files"""
+        equipment_id = owned_equipment['equipment'][0]['id']
+        shop_id = owned_equipment['shop']['shop_id']
+
+        def work(conn):
+            conn.execute("DELETE FROM equipment.user_equipment WHERE id = ?", (equipment_id,))
+            return conn.execute(
+                "UPDATE shop_spaces.shop_spaces SET version = version + 1 WHERE shop_id = ? RETURNING version",
+                (shop_id,)
+            ).fetchone()['version']
+
+        assert run_unified_write(work) == owned_equipment['shop']['version'] + 1
+        assert _count(temp_dbs["equipment"], "user_equipment") == 2
+        from shop_space_functions import get_shop_space_by_id
+        assert get_shop_space_by_id(shop_id)['version'] == owned_equipment['shop']['version'] + 1
+
+
+class TestCrossDatabaseQueries:
+
+    def test_ownership_check_is_one_statement(self, owned_equipment, query_log):
+        """Test 4: Placing equipment checks ownership with one query joining users and equipment"""
+        from users_functions import add_user
+        from equipment_library_db import add_equipment_to_user
+        from shop_space_functions import add_equipment_to_shop_space
+
+        shop_id = owned_equipment['shop']['shop_id']
+        stranger = add_user("stranger", "Stranger", "stranger@example.com", "password123")
+        foreign = add_equipment_to_user(stranger['id'], owned_equipment['equipment_type']['id'])
+
+        with pytest.raises(ValueError, match="does not belong"):
+            add_equipment_to_shop_space(shop_id, EquipmentPlacement(foreign['id'], Position(1.0, 1.0, 0.0)))
+
+        query_log.clear()
+        add_equipment_to_shop_space(
+            shop_id, EquipmentPlacement(owned_equipment['equipment'][0]['id'], Position(1.0, 1.0, 0.0))
+        )
+        ownership = [sql for sql in query_log if "users.users" in sql]
+        assert len(ownership) == 1
+        assert "equipment.user_equipment" in ownership[0]
+
+    def test_schedule_for_user_without_placements(self, owned_equipment):
+        """Test 5: A user with no placed tools gets empty buckets; an unknown user is an error"""
+        from equipment_library_db import get_maintenance_schedule_with_shops
+
+        schedule = get_maintenance_schedule_with_shops(owned_equipment['user']['id'])
+        assert schedule == {"overdue": [], "this_week": [], "upcoming": []}
+        with pytest.raises(ValueError, match="does not exist"):
+            get_maintenance_schedule_with_shops(424242)
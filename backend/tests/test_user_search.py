@@ -0,0 +1,111 @@
+"""
+Tests for the trigram full-text user search
+"""
+import sqlite3
+
+import pytest
+
+from migrations import run_migrations
+from users_functions import add_user, delete_user, search_users, check_usernames, count_users, iter_users
+
+
+@pytest.fixture
+def people(temp_dbs):
+    """A handful of users with overlapping names"""
+    return [
+        add_user("jsmith", "John Smith", "john@example.com", "pw"),
+        add_user("smithy", "Alex Blacksmith", "alex@example.com", "pw"),
+        add_user("mjones", "Mary Jones", "mary@example.com", "pw"),
+        add_user("JSparrow", "Jack Sparrow", "jack@example.com", "pw"),
+    ]
+
+
+class TestContainsSearch:
+    """Test ranked substring search"""
+
+    def test_matches_username_and_name_case_insensitively(self, people):
+        """Test 1: A substring finds users by username or name, without passwords"""
+        found = search_users("SMITH")
+
+        assert {u['username'] for u in found} == {"jsmith", "smithy"}
+        assert all('password' not in u for u in found)
+
+    def test_index_follows_inserts_updates_and_deletes(self, people, temp_dbs):
+        """Test 2: Triggers keep the search index in step with the users table"""
+        with sqlite3.connect(temp_dbs['users']) as conn:
+            conn.execute("UPDATE users SET name = 'Pat Goldsmith' WHERE username = 'mjones'")
+        delete_user(people[0]['id'])
+
+        assert {u['username'] for u in search_users("smith")} == {"smithy", "mjones"}
+        assert search_users("Mary") == []
+
+    def test_short_terms_and_limits(self, people):
+        """Test 3: Terms too short for trigrams still match, and limit caps results"""
+        assert {u['username'] for u in search_users("js")} == {"jsmith", "JSparrow"}
+        assert len(search_users("a", limit=2)) == 2
+        assert len(check_usernames("smith", limit=1)) == 1
+
+    def test_fts_syntax_is_literal(self, people):
+        """Test 4: Quotes and operators in the term are searched for, not parsed"""
+        assert search_users('smith" OR "jones') == []
+        assert search_users("") == []
+
+    def test_search_uses_fts_index(self, people, temp_dbs, query_log):
+        """Test 5: Substring search reads the FTS index instead of scanning users"""
+        search_users("blacksmith")
+
+        sql = [s for s in query_log if s.lstrip().startswith("SELECT") and "users_search" in s][-1]
+        with sqlite3.connect(temp_dbs['users']) as conn:
+            plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        assert "VIRTUAL TABLE" in plan
+        assert "SEARCH u USING INTEGER PRIMARY KEY" in plan
+
+
+class TestPrefixSearch:
+    """Test username autocomplete"""
+
+    def test_prefix_is_case_insensitive_and_ordered(self, people):
+        """Test 6: Prefix mode matches the start of usernames only"""
+        assert [u['username'] for u in search_users("js", mode="prefix")] == ["jsmith", "JSparrow"]
+        assert search_users("mith", mode="prefix") == []
+
+    def test_route_prefix_mode(self, client, people):
+        """Test 7: /api/auth/search supports mode=prefix and rejects unknown modes"""
+        response = client.get("/api/auth/search?q=sm&mode=prefix")
+
+        assert [u['username'] for u in response.get_json()['users']] == ["smithy"]
+        assert client.get("/api/auth/search?q=sm&mode=fuzzy").status_code == 400
+
+
+class TestListingHelpers:
+    """Test the seed-script helpers that replaced check_usernames('')"""
+
+    def test_count_and_iterate(self, people):
+        """Test 8: count_users and iter_users cover everyone"""
+        assert count_users() == 4
+        assert [u['username'] for u in iter_users()] == ["jsmith", "smithy", "mjones", "JSparrow"]
+
+
+class TestSearchMigration:
+    """Test indexing of users created before the search index"""
+
+    def test_existing_users_are_indexed_by_migration(self, tmp_path):
+        """Test 9: Upgrading a database with users builds their search entries"""
+        conn = sqlite3.connect(tmp_path / "users.db")
+        conn.executescript("""
+            CREATE TABLE users (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              username TEXT NOT NULL UNIQUE,
+              name TEXT NOT NULL,
+              email TEXT NOT NULL UNIQUE,
+              password TEXT NOT NULL,
+              shop_spaces TEXT DEFAULT '[]'
+            );
+            INSERT INTO users (username, name, email, password) VALUES ('olduser', 'Old Timer', 'o@example.com', 'x');
+        """)
+
+        run_migrations(conn, "users")
+
+        rows = conn.execute("SELECT rowid FROM users_search WHERE users_search MATCH '\"timer\"'").fetchall()
+        assert rows == [(1,)]
+        conn.close()
@@ -0,0 +1,155 @@
+"""
+Tests for how many SQL statements each mutation endpoint runs
+
+Write paths build their responses from INSERT/UPDATE ... RETURNING rows
+on the same connection instead of re-reading them with a getter.
+"""
+from itertools import groupby
+
+import pytest
+
+
+def _data_statements(log):
+    """
+    Statements the code ran against table data
+
+    The trace callback repeats a statement once per trigger it fires and
+    also reports FTS5's own reads of its shadow tables ('main'.'..._config');
+    both are dropped, as are BEGIN/COMMIT and PRAGMAs.
+    """
+    statements = [
+        sql for sql in log
+        if sql.lstrip().split(None, 1)[0].upper() in ("SELECT", "INSERT", "UPDATE", "DELETE")
+        and "'main'." not in sql
+    ]
+    return [sql for sql, _ in groupby(statements)]
+
+
+@pytest.fixture
+def placed(owned_equipment):
+    """The fixture shop with its first piece of equipment placed"""
+    from models.placement import Position, EquipmentPlacement
+    from shop_space_functions import add_equipment_to_shop_space
+
+    equipment_id = owned_equipment['equipment'][0]['id']
+    add_equipment_to_shop_space(
+        owned_equipment['shop']['shop_id'], EquipmentPlacement(equipment_id, Position(1.0, 1.0, 0.0))
+    )
+    return {**owned_equipment, "placed_id": equipment_id}
+
+
+def _run(client, query_log, method, url, body=None):
+    query_log.clear()
+    response = client.open(url, method=method, json=body)
+    assert response.status_code < 300, response.get_json()
+    return response.get_json(), _data_statements(query_log)
+
+
+class TestInsertRoutes:
+    """Test routes that create rows"""
+
+    def test_register_is_one_insert(self, client, query_log):
+        """Test 1: Registering a user runs only the INSERT"""
+        body, statements = _run(client, query_log, "POST", "/api/auth/register", {
+            "username": "newbie", "name": "New User", "email": "new@example.com", "password": "pw"
+        })
+
+        assert body['user']['username'] == "newbie" and "password" not in body['user']
+        assert len(statements) == 1 and "RETURNING" in statements[0]
+
+    def test_create_shop_is_one_insert(self, owned_equipment, client, query_log):
+        """Test 2: Creating a shop runs only the INSERT"""
+        body, statements = _run(client, query_log, "POST", "/api/shops/", {
+            "username": "fixture_user", "shop_name": "Garage", "length": 20, "width": 10, "height": 8
+        })
+
+        assert body['shop']['shop_name'] == "Garage" and body['shop']['equipment'] == []
+        assert body['shop']['version'] == 1
+        assert len(statements) == 1
+
+    def test_add_catalog_type_is_one_insert(self, owned_equipment, client, query_log):
+        """Test 3: Adding a catalog type runs only the INSERT"""
+        body, statements = _run(client, query_log, "POST", "/api/equipment/catalog", {
+            "equipment_name": "Jointer", "description": "6in", "width": 12, "height": 40,
+            "depth": 48, "maintenance_interval_days": 90
+        })
+
+        assert body['equipment_type']['equipment_name'] == "Jointer"
+        assert body["equipment_type"]["color"] == "#aaa"
+        assert len(statements) == 1
+
+    def test_add_user_equipment_is_one_insert(self, owned_equipment, client, query_log):
+        """Test 4: Buying equipment runs only the INSERT; type details come from the catalog cache"""
+        user_id = owned_equipment['user']['id']
+        body, statements = _run(client, query_log, "POST", f"/api/equipment/user/{user_id}", {
+            "equipment_type_id": owned_equipment['equipment_type']['id'], "purchase_date": "2024-01-01"
+        })
+
+        assert body['equipment'] == {**owned_equipment['equipment'][0], **{
+            k: body['equipment'][k] for k in ("id", "date_purchased", "next_maintenance_date", "created_at")
+        }}
+        assert body['equipment']['next_maintenance_date'] == "2024-01-31"
+        assert len(statements) == 1
+
+
+class TestUpdateRoutes:
+    """Test routes that change existing rows"""
+
+    def test_maintenance_is_one_update(self, owned_equipment, client, query_log):
+        """Test 5: Recording maintenance computes the next date inside a single UPDATE"""
+        from equipment_library_db import get_user_equipment_by_id
+
+        equipment_id = owned_equipment['equipment'][0]['id']
+        body, statements = _run(client, query_log, "POST", f"/api/equipment/{equipment_id}/maintenance", {
+            "maintenance_date": "2024-03-01"
+        })
+
+        assert body['equipment']['last_maintenance_date'] == "2024-03-01"
+        assert body['equipment']['next_maintenance_date'] == "2024-03-31"
+        assert body['equipment'] == get_user_equipment_by_id(equipment_id)
+        assert len(statements) == 1
+
+    def test_place_equipment_reads_shop_once(self, owned_equipment, client, query_log):
+        """Test 6: Placing equipment: owner lookup, ownership check, INSERT, version bump, placements"""
+        from shop_space_functions import get_shop_space_by_id
+
+        shop_id = owned_equipment['shop']['shop_id']
+        body, statements = _run(client, query_log, "POST", f"/api/shops/{shop_id}/equipment", {
+            "equipment_id": owned_equipment['equipment'][1]['id'],
+            "x_coordinate": 2.0, "y_coordinate": 3.0, "z_coordinate": 0.0
+        })
+
+        assert body['shop'] == get_shop_space_by_id(shop_id)
+        assert len(statements) == 5
+
+    def test_update_dimensions_is_update_plus_placements(self, placed, client, query_log):
+        """Test 7: Resizing a shop runs one UPDATE and one placements read"""
+        from shop_space_functions import get_shop_space_by_id
+
+        shop_id = placed['shop']['shop_id']
+        body, statements = _run(client, query_log, "PUT", f"/api/shops/{shop_id}", {"length": 50})
+
+        assert body['shop']['length'] == 50 and body['shop']['width'] == 30.0
+        assert body['shop'] == get_shop_space_by_id(shop_id)
+        assert len(statements) == 2
+
+    def test_remove_placement(self, placed, client, query_log):
+        """Test 8: Removing a placement runs DELETE, version bump and one placements read"""
+        shop_id = placed['shop']['shop_id']
+        body, statements = _run(client, query_log, "DELETE", f"/api/shops/{shop_id}/equipment/{placed['placed_id']}")
+
+        assert body['shop']['equipment'] == []
+        assert len(statements) == 3
+
+
+class TestMissingRows:
+    """Test that missing rows are still reported"""
+
+    def test_missing_shop_still_rejected(self, temp_dbs):
+        """Test 9: RETURNING no row is reported as a missing shop"""
+        from shop_space_functions import update_shop_space_dimensions, remove_equipment_from_shop_space
+
+        with pytest.raises(ValueError):
+            update_shop_space_dimensions("nope", length=1)
+        with pytest.raises(ValueError):
+            remove_equipment_from_shop_space("nope", 1)
@@ -0,0 +1,190 @@
+"""
+Tests for group commit through the write queue
+"""
+import sqlite3
+import threading
+
+import pytest
+
+import write_queue
+from write_queue import WriteQueue, run_write
+
+
+@pytest.fixture
+def table(tmp_path):
+    """A scratch database with one table"""
+    path = tmp_path / "queue.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _names(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(row[0] for row in conn.execute("SELECT name FROM items"))
+    finally:
+        conn.close()
+
+
+def _insert(name):
+    def work(conn):
+        return conn.execute("INSERT INTO items (name) VALUES (?) RETURNING id", (name,)).fetchone()[0]
+    return work
+
+
+@pytest.fixture
+def queued_writes(temp_dbs, monkeypatch):
+    """Route repo writes through writer threads with a window wide enough to batch"""
+    monkeypatch.setitem(write_queue._settings, "window", 0.05)
+    monkeypatch.setattr(write_queue, "_enabled", True)
+    yield
+    write_queue.shutdown_all()
+
+
+class TestWriteQueue:
+
+    def test_concurrent_writes_share_one_commit(self, table):
+        """Test 1: Writes queued together commit in one transaction"""
+        queue = WriteQueue(table, window=0.2, max_batch=64)
+        try:
+            futures = [queue.submit(_insert(f"item{i}")) for i in range(20)]
+            ids = [future.result(timeout=5) for future in futures]
+        finally:
+            queue.shutdown()
+
+        assert sorted(ids) == list(range(1, 21))
+        assert _names(table) == sorted(f"item{i}" for i in range(20))
+        assert queue.stats()["batches"] == 1
+        assert queue.stats()["largest_batch"] == 20
+
+    def test_max_batch_splits_transactions(self, table):
+        """Test 2: A batch never holds more than max_batch writes"""
+        queue = WriteQueue(table, window=0.2, max_batch=5)
+        try:
+            futures = [queue.submit(_insert(f"item{i}")) for i in range(12)]
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            queue.shutdown()
+
+        assert queue.stats()["batches"] == 3
+        assert queue.stats()["largest_batch"] == 5
+
+    def test_failed_write_rolls_back_alone(self, table):
+        """Test 3: A write that raises is undone; the rest of its batch commits"""
+        def half_done(conn):
+            conn.execute("INSERT INTO items (name) VALUES ('partial')")
+            raise ValueError("changed my mind")
+
+        queue = WriteQueue(table, window=0.2)
+        try:
+            before = queue.submit(_insert("before"))
+            failed = queue.submit(half_done)
+            duplicate = queue.submit(_insert("before"))
+            after = queue.submit(_insert("after"))
+
+            before.result(timeout=5)
+            after.result(timeout=5)
+            with pytest.raises(ValueError, match="changed my mind"):
+                failed.result(timeout=5)
+            with pytest.raises(sqlite3.IntegrityError):
+                duplicate.result(timeout=5)
+        finally:
+            queue.shutdown()
+
+        assert _names(table) == ["after", "before"]
+        assert queue.stats()["batches"] == 1
+        assert queue.stats()["failed"] == 2
+
+    def test_results_wait_for_commit(self, table):
+        """Test 4: No caller is answered before its whole batch has committed"""
+        queue = WriteQueue(table, window=0.2)
+        try:
+            first = queue.submit(_insert("first"))
+            seen = {}
+
+            def check(conn):
+                seen["first_done"] = first.done()
+                seen["visible_outside"] = _names(table)
+                return True
+
+            second = queue.submit(check)
+            assert second.result(timeout=5) is True
+            assert first.done()
+        finally:
+            queue.shutdown()
+
+        assert seen == {"first_done": False, "visible_outside": []}
+        assert _names(table) == ["first"]
+
+    def test_shutdown_commits_queued_writes(self, table):
+        """Test 5: Shutting down drains the queue; later submits are refused"""
+        queue = WriteQueue(table, window=0.2)
+        futures = [queue.submit(_insert(f"item{i}")) for i in range(3)]
+        queue.shutdown()
+
+        assert all(future.done() for future in futures)
+        assert len(_names(table)) == 3
+        with pytest.raises(RuntimeError):
+            queue.submit(_insert("late"))
+
+    def test_run_write_commits_on_calling_thread_when_disabled(self, table, monkeypatch):
+        """Test 6: With the queue off, run_write commits on the caller's connection"""
+        monkeypatch.setattr(write_queue, "_enabled", False)
+        assert run_write(table, _insert("direct")) == 1
+        assert _names(table) == ["direct"]
+        assert str(table) not in write_queue._queues
+
+
+class TestQueuedRepoWrites:
+
+    def test_concurrent_placements_are_batched(self, owned_equipment, queued_writes):
+        """Test 7: Repo writes from many threads commit in fewer transactions and all land"""
+        from equipment_library_db import add_equipment_to_user
+        from shop_space_functions import add_equipment_to_shop_space, get_shop_space_by_id
+        from models.placement import EquipmentPlacement, Position
+
+        user_id = owned_equipment['user']['id']
+        type_id = owned_equipment['equipment_type']['id']
+        shop_id = owned_equipment['shop']['shop_id']
+        equipment = [add_equipment_to_user(user_id, type_id) for _ in range(12)]
+        before = write_queue.write_queue_stats()["queues"].get("shop_spaces", {"writes": 0, "batches": 0})
+
+        barrier = threading.Barrier(len(equipment))
+        errors = []
+
+        def place(i, item):
+            barrier.wait()
+            try:
+                add_equipment_to_shop_space(shop_id, EquipmentPlacement(item['id'], Position(i * 3.0, 1.0, 0.0)))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=place, args=(i, item)) for i, item in enumerate(equipment)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        shop = get_shop_space_by_id(shop_id)
+        assert len(shop['equipment']) == 12
+        assert shop['version'] == owned_equipment['shop']['version'] + 12
+        stats = write_queue.write_queue_stats()["queues"]["shop_spaces"]
+        assert stats["writes"] - before["writes"] == 12
+        assert stats["batches"] - before["batches"] < 12
+
+    def test_errors_reach_the_caller(self, owned_equipment, queued_writes):
+        """Test 8: Validation errors raised on the writer thread surface unchanged"""
+        from shop_space_functions import remove_equipment_from_shop_space, ShopVersionConflictError
+        from equipment_library_db import perform_maintenance
+
+        shop = owned_equipment['shop']
+        with pytest.raises(ShopVersionConflictError) as raised:
+            remove_equipment_from_shop_space(shop['shop_id'], 1, expected_version=shop['version'] + 5)
+        assert raised.value.current_version == shop['version']
+        with pytest.raises(ValueError, match="not found"):
+            perform_maintenance(9999)
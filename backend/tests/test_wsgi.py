@@ -0,0 +1,47 @@
+"""
+Tests for the production entry points (app factory, wsgi module, gunicorn config)
+"""
+import runpy
+from pathlib import Path
+
+BACKEND = Path(__file__).parent.parent
+
+
+class TestAppFactory:
+    """Test create_app and the wsgi module"""
+
+    def test_create_app_builds_independent_apps(self, temp_dbs):
+        """Test 1: Each create_app call returns a fully routed app"""
+        from server import create_app
+
+        first, second = create_app(profiling=False), create_app(profiling=False)
+
+        assert first is not second
+        assert first.test_client().get("/api/health").status_code == 200
+        assert "/api/shops/<shop_id>" in {rule.rule for rule in second.url_map.iter_rules()}
+
+    def test_wsgi_module_exposes_app(self, temp_dbs):
+        """Test 2: wsgi:app and asgi:app serve the one app server.py builds, without the debugger"""
+        import asgi
+        import server
+        import wsgi
+
+        assert wsgi.app is server.app and asgi.app.wsgi_app is server.app
+        assert wsgi.app.debug is False
+        assert wsgi.app.test_client().get("/api/health").get_json()["status"] == "ok"
+
+
+class TestGunicornConfig:
+    """Test gunicorn.conf.py"""
+
+    def test_gunicorn_config(self, monkeypatch):
+        """Test 3: The gunicorn config uses threaded workers and honours overrides"""
+        monkeypatch.setenv("GUNICORN_WORKERS", "3")
+        monkeypatch.setenv("GUNICORN_THREADS", "12")
+
+        config = runpy.run_path(str(BACKEND / "gunicorn.conf.py"))
+
+        assert config["worker_class"] == "gthread"
+        assert (config["workers"], config["threads"]) == (3, 12)
+        assert config["preload_app"] is False
+        assert config["timeout"] > 5  # longer than the SQLite busy_timeout
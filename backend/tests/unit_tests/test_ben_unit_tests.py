@@ -42,12 +42,14 @@ class TestPasswordHashing:
         result = _hash_password("testpassword123")
         assert isinstance(result, str)
 
-    def test_hash_password_is_deterministic(self):
-        """Test 2: Same password produces same hash"""
+    def test_hash_password_is_salted(self):
+        """Test 2: Same password produces different salted hashes that both verify"""
         password = "mySecurePass123"
         hash1 = _hash_password(password)
         hash2 = _hash_password(password)
-        assert hash1 == hash2
+        assert hash1 != hash2
+        assert _verify_password(hash1, password) is True
+        assert _verify_password(hash2, password) is True
 
     def test_verify_password_correct(self):
         """Test 3: Verify password returns True for correct password"""
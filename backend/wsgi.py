@@ -0,0 +1,10 @@
+"""
+Production WSGI entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Run from backend/. The dev server (python server.py) is single-process and
+runs the debugger; use this instead anywhere other than a laptop.
+"""
+# server.py builds the app at import; reuse it rather than building a second one
+from server import app
@@ -0,0 +1,50 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add repo directory to path to import the function modules
+sys.path.insert(0, str(Path(__file__).parent / "repo"))
+
+from tenant_export import write_export, read_export, import_records
+
+
+def main():
+    """Export a user's shops and equipment to a file, or import such a file under a user"""
+    parser = argparse.ArgumentParser(description="Move a user's shops and equipment between instances")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="write a user's data to an NDJSON export file")
+    export_cmd.add_argument("username")
+    export_cmd.add_argument("path", help="output file, or - for stdout")
+    export_cmd.add_argument("--columnar", action="store_true", help="store placements as packed columns")
+
+    import_cmd = commands.add_parser("import", help="load an export file under an existing user")
+    import_cmd.add_argument("username")
+    import_cmd.add_argument("path", help="export file, or - for stdin")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        fmt = "columnar" if args.columnar else "ndjson"
+        if args.path == "-":
+            count = write_export(args.username, sys.stdout, fmt)
+        else:
+            with open(args.path, "w", encoding="utf-8") as fp:
+                count = write_export(args.username, fp, fmt)
+        print(f"Exported {count} records for {args.username}", file=sys.stderr)
+    else:
+        if args.path == "-":
+            result = import_records(read_export(sys.stdin), args.username)
+        else:
+            with open(args.path, encoding="utf-8") as fp:
+                result = import_records(read_export(fp), args.username)
+        print(
+            f"Imported {result['user_equipment']} equipment, {result['shop_spaces']} shops and "
+            f"{result['placements']} placements for {args.username} "
+            f"({result['equipment_types']} new catalog types)",
+            file=sys.stderr
+        )
+
+
+if __name__ == "__main__":
+    main()
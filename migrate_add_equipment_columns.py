@@ -1,56 +1,45 @@
 #!/usr/bin/env python3
 """
-Migration script to add missing columns to equipment_types table
-Run this if your equipment_types table is missing color, manufacturer, or model columns
+Bring all three databases up to the latest schema version
+Kept under its old name for existing docs; the column fixes it used to do
+by hand are now migration steps in repo/migrations.py
 """
 
-import sqlite3
+import sys
 from pathlib import Path
 
-DB_PATH = Path(__file__).parent / "db" / "equipment.db"
+sys.path.insert(0, str(Path(__file__).parent / "repo"))
 
-def column_exists(cursor, table_name, column_name):
-    """Check if a column exists in a table"""
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    columns = [row[1] for row in cursor.fetchall()]
-    return column_name in columns
+from connection_pool import get_connection
+from migrations import run_migrations, get_schema_version
+from shop_space_functions import init_shop_spaces_db
 
-def migrate():
-    """Add missing columns to equipment_types table"""
-    if not DB_PATH.exists():
-        print(f"Database not found at {DB_PATH}")
-        print("Run ./init-database.sh first")
-        return
-
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-
-        # Check and add color column
-        if not column_exists(cursor, 'equipment_types', 'color'):
-            print("Adding 'color' column to equipment_types...")
-            cursor.execute("ALTER TABLE equipment_types ADD COLUMN color TEXT DEFAULT '#aaa'")
-            print("  ✓ Added 'color' column")
-        else:
-            print("  ✓ 'color' column already exists")
+DB_DIR = Path(__file__).parent / "db"
 
-        # Check and add manufacturer column
-        if not column_exists(cursor, 'equipment_types', 'manufacturer'):
-            print("Adding 'manufacturer' column to equipment_types...")
-            cursor.execute("ALTER TABLE equipment_types ADD COLUMN manufacturer TEXT")
-            print("  ✓ Added 'manufacturer' column")
+def migrate():
+    """Apply pending migrations to users, equipment and shop spaces databases"""
+    for database in ("users", "equipment", "shop_spaces"):
+        db_path = DB_DIR / f"{database}.db"
+        if not db_path.exists():
+            print(f"Database not found at {db_path}")
+            print("Run ./init-database.sh first")
+            continue
+
+        conn = get_connection(db_path)
+        before = get_schema_version(conn)
+        if database == "shop_spaces":
+            # Also converts any legacy JSON placements
+            init_shop_spaces_db(db_path)
         else:
-            print("  ✓ 'manufacturer' column already exists")
+            run_migrations(conn, database)
+        after = get_schema_version(conn)
 
-        # Check and add model column
-        if not column_exists(cursor, 'equipment_types', 'model'):
-            print("Adding 'model' column to equipment_types...")
-            cursor.execute("ALTER TABLE equipment_types ADD COLUMN model TEXT")
-            print("  ✓ Added 'model' column")
+        if after > before:
+            print(f"  ✓ {database}: upgraded from version {before} to {after}")
         else:
-            print("  ✓ 'model' column already exists")
+            print(f"  ✓ {database}: up to date at version {after}")
 
-        conn.commit()
-        print("\nMigration completed successfully!")
+    print("\nMigration completed successfully!")
 
 if __name__ == "__main__":
     migrate()
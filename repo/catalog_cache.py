@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+from operator import attrgetter
+
+# Process-local cache of the equipment catalog
+#
+# equipment_types is read on nearly every request and written almost never,
+# so the whole table is held in memory as __slots__ records with id and
+# name lookups. Staleness is detected two ways:
+#   - add_equipment_type calls invalidate() after committing, so this
+#     process sees its own writes immediately;
+#   - every read asks a dedicated watcher connection for PRAGMA data_version,
+#     which changes whenever any other connection (including other processes)
+#     commits to the database file. Only then is the catalog_version row
+#     (kept by triggers on equipment_types) compared, so writes to
+#     user_equipment do not force a reload.
+
+
+class CatalogEntry:
+    """One equipment_types row; __slots__ keeps thousands of them small"""
+
+    __slots__ = (
+        "id", "equipment_name", "description", "width", "height", "depth",
+        "maintenance_interval_days", "created_at", "color", "manufacturer", "model", "image_path",
+    )
+
+    def __init__(self, row):
+        columns = row.keys()
+        for name in self.__slots__:
+            setattr(self, name, row[name] if name in columns else None)
+
+    def to_dict(self):
+        """Fresh dict in the shape get_equipment_type_by_id has always returned"""
+        return dict(zip(self.__slots__, _entry_values(self)))
+
+
+_entry_values = attrgetter(*CatalogEntry.__slots__)
+
+
+class _Snapshot:
+    """Immutable view of the catalog at one catalog_version"""
+
+    __slots__ = ("catalog_version", "entries", "by_id", "by_name", "_dicts")
+
+    def __init__(self, catalog_version, entries):
+        self.catalog_version = catalog_version
+        self.entries = entries
+        self._dicts = None
+        self.by_id = {entry.id: entry for entry in entries}
+        self.by_name = {entry.equipment_name.lower(): entry for entry in entries}
+
+    def as_dicts(self):
+        """Every entry as a fresh dict, in name order (copying a template dict is cheaper than rebuilding it)"""
+        if self._dicts is None:
+            self._dicts = [entry.to_dict() for entry in self.entries]
+        return [dict(template) for template in self._dicts]
+
+
+class CatalogCache:
+    """
+    Read-through cache of equipment_types for one database file at a time
+
+    Args:
+        loader (callable): loader(db_path) -> (catalog_version, rows ordered by name)
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._db_path = None
+        self._watcher = None
+        self._data_version = None
+        self._snapshot = None
+        self._hits = 0
+        self._loads = 0
+        self._invalidations = 0
+
+    def _open_watcher(self, db_path):
+        """Connection used only for PRAGMA data_version and catalog_version (caller holds the lock)"""
+        if self._watcher is not None:
+            self._watcher.close()
+        self._watcher = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db_path = str(db_path)
+        self._data_version = None
+        self._snapshot = None
+
+    def _is_current(self):
+        """True if the snapshot still matches the database (caller holds the lock)"""
+        data_version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return True
+        self._data_version = data_version
+        row = self._watcher.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+        return row is not None and row[0] == self._snapshot.catalog_version
+
+    def snapshot(self, db_path):
+        """Current catalog snapshot for db_path, reloading it if the catalog changed"""
+        with self._lock:
+            if self._db_path != str(db_path):
+                self._open_watcher(db_path)
+            if self._snapshot is not None and self._is_current():
+                self._hits += 1
+                return self._snapshot
+            # Read data_version before loading so a write racing the load triggers another check
+            self._data_version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+            catalog_version, rows = self._loader(db_path)
+            self._snapshot = _Snapshot(catalog_version, [CatalogEntry(row) for row in rows])
+            self._loads += 1
+            return self._snapshot
+
+    def invalidate(self):
+        """Drop the cached catalog; the next read reloads it"""
+        with self._lock:
+            self._snapshot = None
+            self._invalidations += 1
+
+    def close(self):
+        """Close the watcher connection and forget everything"""
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.close()
+            self._watcher = None
+            self._db_path = None
+            self._snapshot = None
+
+    def stats(self):
+        """
+        Get cache counters for monitoring
+
+        Returns:
+            dict: hits, loads, invalidations and the number of cached types
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "loads": self._loads,
+                "invalidations": self._invalidations,
+                "size": len(self._snapshot.entries) if self._snapshot else 0,
+            }
@@ -0,0 +1,186 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+# PRAGMAs applied once when a connection is opened
+# cache_size is negative so it is read as KiB (16 MB page cache per connection)
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("foreign_keys", "ON"),
+    ("busy_timeout", 5000),
+    ("cache_size", -16000),
+    ("mmap_size", 268435456),
+)
+
+# PRAGMAs that apply to one database of a connection; they are repeated
+# for every attached database
+SCHEMA_PRAGMAS = frozenset({"journal_mode", "synchronous", "cache_size", "mmap_size"})
+
+
+class ConnectionPool:
+    """
+    Hands out one reusable SQLite connection per (thread, database file)
+
+    SQLite connections are cheap to keep open but comparatively expensive to
+    open and configure, so each thread keeps its own connection to every
+    database it touches. Connections owned by threads that have exited are
+    closed the next time a connection is opened.
+    """
+
+    def __init__(self, pragmas=PRAGMAS, factory=None):
+        self._pragmas = pragmas
+        self._factory = factory or sqlite3.Connection
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open_connections = []  # (owning thread, db key, connection)
+        self._connect_hooks = []
+        self._opened = 0
+        self._reused = 0
+        self._closed = 0
+
+    def connect(self, db_path, attach=()):
+        """
+        Get this thread's connection to db_path, opening it on first use
+
+        Args:
+            db_path (Path | str): Database file (':memory:' for a connection that only holds attachments)
+            attach (tuple): (schema name, database file) pairs to ATTACH when the connection is opened;
+                            a different set of attachments is a different pooled connection
+
+        Returns:
+            sqlite3.Connection: Connection with row_factory set to sqlite3.Row
+        """
+        key = str(db_path) + "".join(f"|{name}={path}" for name, path in attach)
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn = connections.get(key)
+        if conn is not None:
+            with self._lock:
+                self._reused += 1
+            return conn
+
+        conn = self._open(key, str(db_path), attach)
+        connections[key] = conn
+        return conn
+
+    def _open(self, key, db_path, attach=()):
+        """Open and configure a new connection, pruning connections of dead threads"""
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # check_same_thread is off so close_all() can run from any thread;
+        # each connection is still only used by the thread that opened it
+        conn = sqlite3.connect(db_path, check_same_thread=False, factory=self._factory)
+        for schema, path in attach:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+        for name, value in self._pragmas:
+            conn.execute(f"PRAGMA {name} = {value};")
+            if name in SCHEMA_PRAGMAS:
+                for schema, path in attach:
+                    conn.execute(f"PRAGMA {schema}.{name} = {value};")
+        conn.row_factory = sqlite3.Row
+
+        with self._lock:
+            hooks = list(self._connect_hooks)
+            self._prune_dead_threads()
+            self._open_connections.append((threading.current_thread(), key, conn))
+            self._opened += 1
+
+        for hook in hooks:
+            hook(conn, key)
+        return conn
+
+    def _prune_dead_threads(self):
+        """Close connections whose owning thread has exited (caller holds the lock)"""
+        alive = []
+        for thread, key, conn in self._open_connections:
+            if thread.is_alive():
+                alive.append((thread, key, conn))
+            else:
+                conn.close()
+                self._closed += 1
+        self._open_connections = alive
+
+    def set_factory(self, factory):
+        """Use factory (a sqlite3.Connection subclass, or None for the default) for connections opened from now on"""
+        with self._lock:
+            self._factory = factory or sqlite3.Connection
+
+    def add_connect_hook(self, hook):
+        """Register hook(conn, db_key) to run on every newly opened connection"""
+        with self._lock:
+            self._connect_hooks.append(hook)
+
+    def remove_connect_hook(self, hook):
+        """Unregister a hook added with add_connect_hook"""
+        with self._lock:
+            if hook in self._connect_hooks:
+                self._connect_hooks.remove(hook)
+
+    def close_all(self):
+        """Close every pooled connection; threads reopen lazily on next use"""
+        with self._lock:
+            for thread, key, conn in self._open_connections:
+                conn.close()
+                self._closed += 1
+            self._open_connections = []
+        # Other threads notice their closed connections through a fresh local
+        self._local = threading.local()
+
+    def stats(self):
+        """
+        Get pool counters for monitoring
+
+        Returns:
+            dict: opened/reused/closed totals plus currently open connections per database
+        """
+        with self._lock:
+            per_database = {}
+            for thread, key, conn in self._open_connections:
+                per_database[key] = per_database.get(key, 0) + 1
+            return {
+                "opened": self._opened,
+                "reused": self._reused,
+                "closed": self._closed,
+                "open_connections": len(self._open_connections),
+                "threads": len({thread.ident for thread, key, conn in self._open_connections}),
+                "per_database": per_database,
+            }
+
+
+# Process-wide pool shared by all repo modules
+_pool = ConnectionPool()
+
+
+def get_connection(db_path, attach=()):
+    """Get the calling thread's pooled connection to db_path, with attach = ((schema, file), ...) attached"""
+    return _pool.connect(db_path, attach)
+
+
+def pool_stats():
+    """Get counters for the process-wide pool"""
+    return _pool.stats()
+
+
+def close_all_connections():
+    """Close every connection in the process-wide pool"""
+    _pool.close_all()
+
+
+def set_connection_factory(factory):
+    """Switch the process-wide pool's connection class and reopen connections with it"""
+    _pool.set_factory(factory)
+    _pool.close_all()
+
+
+def add_connect_hook(hook):
+    """Register hook(conn, db_key) on the process-wide pool"""
+    _pool.add_connect_hook(hook)
+
+
+def remove_connect_hook(hook):
+    """Unregister a hook from the process-wide pool"""
+    _pool.remove_connect_hook(hook)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Dedicated threads for running repo calls off an event loop
+#
+# Each database file gets exactly one writer thread, so writes to a file
+# run one after another without ever waiting on SQLite's write lock or
+# burning busy_timeout retries; reads go to a shared pool of reader threads,
+# which WAL lets run alongside the writer. Every thread keeps its own pooled
+# connections (connection_pool is per thread), so no connection is ever
+# shared. The number of calls queued or running is capped; past the cap,
+# callers get ExecutorBusyError straight away instead of an ever-growing
+# queue.
+#
+# Configuration (environment, read once at import):
+#   DB_READER_THREADS   reader pool size (default 8)
+#   DB_MAX_PENDING      calls allowed to be queued or running at once (default 512)
+
+DATABASES = ("users", "equipment", "shop_spaces")
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when too many database calls are already queued"""
+
+
+class DatabaseExecutor:
+    """
+    One writer thread per database file plus a pool of reader threads
+
+    Args:
+        databases (iterable): Names of the database files that get a writer thread
+        readers (int): Reader threads
+        max_pending (int): Calls allowed to be queued or running across all threads
+    """
+
+    def __init__(self, databases=DATABASES, readers=8, max_pending=512):
+        self.readers = readers
+        self.max_pending = max_pending
+        self._writers = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-writer-{name}")
+            for name in databases
+        }
+        self._reader_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._per_writer = dict.fromkeys(self._writers, 0)
+
+    def submit(self, func, *args, database=None):
+        """
+        Queue func(*args) on the writer thread for database, or on a reader if database is None
+
+        Returns:
+            concurrent.futures.Future: Result of the call
+        """
+        if database is not None and database not in self._writers:
+            raise ValueError(f"No writer thread for database '{database}'")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise ExecutorBusyError("Too many database calls in progress, try again shortly")
+            self._pending += 1
+            if database is not None:
+                self._per_writer[database] += 1
+        executor = self._writers[database] if database is not None else self._reader_pool
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    async def run(self, func, *args, database=None):
+        """Await func(*args) on the writer thread for database, or on a reader if database is None"""
+        return await asyncio.wrap_future(self.submit(func, *args, database=database))
+
+    def shutdown(self, wait=True):
+        """Stop every thread once its queued calls have run"""
+        for executor in self._writers.values():
+            executor.shutdown(wait=wait)
+        self._reader_pool.shutdown(wait=wait)
+
+    def stats(self):
+        """
+        Get executor counters for monitoring
+
+        Returns:
+            dict: reader and queue limits, calls pending now, completed and rejected totals
+                  and calls sent to each writer
+        """
+        with self._lock:
+            return {
+                "readers": self.readers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "writes": dict(self._per_writer),
+            }
+
+
+# Process-wide executor used by the ASGI app
+db_executor = DatabaseExecutor(
+    readers=int(os.environ.get("DB_READER_THREADS", 8)),
+    max_pending=int(os.environ.get("DB_MAX_PENDING", 512)),
+)
+
+
+def db_executor_stats():
+    """Get counters for the process-wide database executor"""
+    return db_executor.stats()
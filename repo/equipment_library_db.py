@@ -1,47 +1,50 @@
 import sqlite3  # import sqlite
+import json
+import re
 from datetime import date, timedelta
 from pathlib import Path
+from connection_pool import get_connection
+from migrations import run_migrations
+from users_functions import user_exists
+from pagination import clamp_limit, decode_cursor, page_result
+from catalog_cache import CatalogCache, CatalogEntry
+from write_queue import run_write
+from unified_db import unified_connection
 
 # Match user format; have equipment go in database
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DB_PATH = PROJECT_ROOT / "db" / "equipment.db" #so server can open DB reliably(fixes "unable to open database file" when working directory varies)
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)  # Ensure folder exists
-USERS_DB_PATH = Path(__file__).parent.parent / "db" / "users.db"
+# Schema is defined by the versioned steps in migrations.py
+
+# Database files whose schema has been checked by this process
+_initialized_paths = set()
+
+def init_equipment_db(db_path: Path = DB_PATH):
+    """Create or upgrade the equipment database schema"""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    run_migrations(get_connection(db_path), "equipment")
+    _initialized_paths.add(str(db_path))
 
 # Basic database connection functions
 def _connect():
-    """Create connection to equipment database"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.row_factory = sqlite3.Row
-    return conn
-
- #Create connection to users database for validation
-def _connect_users():
-    conn = sqlite3.connect(USERS_DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get this thread's pooled connection to equipment database (schema is ensured once per process)"""
+    if str(DB_PATH) not in _initialized_paths:
+        init_equipment_db(DB_PATH)
+    return get_connection(DB_PATH)
+
+def _write(work):
+    """Run work(conn) as one committed write to the equipment database (see write_queue.py)"""
+    _connect()  # ensure the schema before any thread writes to the file
+    return run_write(DB_PATH, work)
 
 def _row_to_dict(row):
     """Convert SQLite row to dictionary"""
     return dict(row) if row else None
 
-#Check if user exists using get_user_by_id function
+#Check if user exists (served from the identity cache once the user has been seen)
 def _validate_user_exists(user_id):
-    try:
-        # Import get user id function
-        import sys
-        sys.path.append(str(Path(__file__).parent))
-        from users_functions import get_user_by_id
-        
-        user = get_user_by_id(user_id)
-        return user is not None
-    except ImportError:
-        # Fallback: check users database directly
-        with _connect_users() as conn:
-            cursor = conn.execute("SELECT id FROM users WHERE id = ?", (user_id,))
-            return cursor.fetchone() is not None
+    return user_exists(user_id)
 
 def _calculate_next_maintenance_date(purchase_date, maintenance_interval_days):
     """Calculate when next maintenance is due"""
@@ -51,31 +54,140 @@ def _calculate_next_maintenance_date(purchase_date, maintenance_interval_days):
 
 # EQUIPMENT CATALOG FUNCTIONS (browse available equipment types)
 
+def get_catalog_version():
+    """Get the catalog version, bumped by triggers on every equipment_types change"""
+    with _connect() as conn:
+        cursor = conn.execute("SELECT version FROM catalog_version WHERE id = 1")
+        row = cursor.fetchone()
+        return row['version'] if row else 0
+
+def _load_catalog(db_path):
+    """Read catalog_version and every equipment type in one snapshot (loader for the catalog cache)"""
+    conn = _connect()
+    # Read both in one snapshot, unless this thread is already inside a transaction
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        version = conn.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+        rows = conn.execute("SELECT * FROM equipment_types ORDER BY equipment_name").fetchall()
+    finally:
+        if own_transaction:
+            conn.rollback()
+    return (version['version'] if version else 0), rows
+
+# Process-wide catalog cache; see catalog_cache.py for how it stays coherent
+_catalog_cache = CatalogCache(_load_catalog)
+
+def catalog_cache_stats():
+    """Get counters for the catalog cache"""
+    return _catalog_cache.stats()
+
 def get_equipment_catalog():
-    """Get all available equipment types"""
+    """Get all available equipment types (served from the catalog cache)"""
+    return _catalog_cache.snapshot(DB_PATH).as_dicts()
+
+def _fts_prefix_query(text):
+    """Turn free text into an FTS5 query where every word must match as a prefix"""
+    words = re.findall(r"\w+", text)
+    return " AND ".join(f'"{word}"*' for word in words)
+
+def _parse_dimension(value, name):
+    """Parse an optional dimension filter in inches"""
+    if value is None or value == "":
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return value
+
+def search_equipment_catalog(q=None, manufacturer=None, max_width=None, max_depth=None, limit=None):
+    """
+    Search and filter the catalog in one indexed query
+
+    Words in q match name, description, manufacturer or model by prefix through
+    the equipment_types_search FTS index, best matches first. The manufacturer
+    and footprint filters are served by indexes on equipment_types, so
+    "a planer no wider than 30 inches" is q='planer', max_width=30.
+
+    Args:
+        q (str): Free-text search; None or '' lists by name
+        manufacturer (str): Exact manufacturer, case-insensitive
+        max_width (float): Largest width in inches
+        max_depth (float): Largest depth in inches
+        limit (int): Maximum results (default and maximum come from pagination.py)
+
+    Returns:
+        list: Matching equipment types
+    """
+    limit = clamp_limit(limit)
+    max_width = _parse_dimension(max_width, "max_width")
+    max_depth = _parse_dimension(max_depth, "max_depth")
+    match = _fts_prefix_query(q or "")
+
+    conditions, params = [], []
+    if match:
+        conditions.append("equipment_types_search MATCH ?")
+        params.append(match)
+    if manufacturer:
+        conditions.append("et.manufacturer = ? COLLATE NOCASE")
+        params.append(manufacturer)
+    if max_width is not None:
+        conditions.append("et.width <= ?")
+        params.append(max_width)
+    if max_depth is not None:
+        conditions.append("et.depth <= ?")
+        params.append(max_depth)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if match:
+        sql = f"""SELECT et.* FROM equipment_types_search
+                  JOIN equipment_types et ON et.id = equipment_types_search.rowid
+                  {where}
+                  ORDER BY bm25(equipment_types_search, 4.0, 1.0, 2.0, 2.0), et.equipment_name
+                  LIMIT ?"""
+    else:
+        # With a footprint filter, sort the filtered rows rather than letting the
+        # planner walk the name index past every tool that is too big ('+' hides it)
+        order = "+et.equipment_name" if max_width is not None or max_depth is not None else "et.equipment_name"
+        sql = f"""SELECT et.* FROM equipment_types et
+                  {where}
+                  ORDER BY {order}
+                  LIMIT ?"""
     with _connect() as conn:
-        cursor = conn.execute("SELECT * FROM equipment_types ORDER BY equipment_name")
-        equipment = cursor.fetchall()
-        return [_row_to_dict(item) for item in equipment]
+        cursor = conn.execute(sql, (*params, limit))
+        return [_row_to_dict(item) for item in cursor]
 
- #Get specific equipment type from catalog
+ #Get specific equipment type from catalog (served from the catalog cache)
 def get_equipment_type_by_id(equipment_type_id):
-    with _connect() as conn:
-        cursor = conn.execute("SELECT * FROM equipment_types WHERE id = ?", (equipment_type_id,))
-        equipment = cursor.fetchone()
-        return _row_to_dict(equipment)
+    try:
+        equipment_type_id = int(equipment_type_id) # JSON bodies may send "3"; SQLite used to coerce it
+    except (TypeError, ValueError):
+        return None
+    entry = _catalog_cache.snapshot(DB_PATH).by_id.get(equipment_type_id)
+    return entry.to_dict() if entry else None
+
+def get_equipment_type_by_name(equipment_name):
+    """Get an equipment type by name, case-insensitively (served from the catalog cache)"""
+    entry = _catalog_cache.snapshot(DB_PATH).by_name.get((equipment_name or "").lower())
+    return entry.to_dict() if entry else None
 
 def add_equipment_type(equipment_name, description, width, height, depth, maintenance_interval_days, color='#aaa', manufacturer=None, model=None, image_path=None):
     """Add new equipment type to catalog (for admin use)"""
-    with _connect() as conn:
-        cursor = conn.execute(
+    def write(conn):
+        return conn.execute(
             """INSERT INTO equipment_types (equipment_name, description, width, height, depth, maintenance_interval_days, color, manufacturer, model, image_path)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               RETURNING *""",
             (equipment_name, description, width, height, depth, maintenance_interval_days, color, manufacturer, model, image_path)
-        )
-        conn.commit()
-        equipment_type_id = cursor.lastrowid
-        return get_equipment_type_by_id(equipment_type_id)
+        ).fetchone()
+
+    row = _write(write)
+    _catalog_cache.invalidate()
+    return CatalogEntry(row).to_dict() # same shape as the cache serves, without reloading it
 
 # USER EQUIPMENT FUNCTIONS (equipment instances that users own)
 
@@ -101,15 +213,92 @@ def add_equipment_to_user(user_id, equipment_type_id, notes=None, purchase_date=
         equipment_type['maintenance_interval_days']
     )
     
-    with _connect() as conn:
-        cursor = conn.execute(
+    def write(conn):
+        return conn.execute(
             """INSERT INTO user_equipment (equipment_type_id, user_id, date_purchased, next_maintenance_date, notes) 
+               VALUES (?, ?, ?, ?, ?)
+               RETURNING *""",
+            (equipment_type['id'], user_id, purchase_date, next_maintenance_date, notes)
+        ).fetchone()
+
+    return _with_type_details(_write(write), equipment_type)
+
+def bulk_add_equipment_to_user(user_id, items):
+    """
+    Add many equipment instances for one user in a single transaction
+
+    The user is checked once and equipment types are checked against the
+    catalog cache, then every valid item goes through one executemany and
+    one commit; nothing is re-read. items may be a lazy iterator (an upload
+    read row by row); it is parsed and validated in full before the write
+    transaction starts, so a slow upload never holds the write lock.
+
+    Args:
+        user_id (int): Owner of the new equipment
+        items (iterable): Dicts with 'equipment_type_id' and optional 'notes' and 'purchase_date'
+
+    Returns:
+        dict: 'inserted' count and 'errors', a list of {'row', 'error'} for skipped items (rows count from 1)
+    """
+    if not _validate_user_exists(user_id):
+        raise ValueError(f"User with ID {user_id} does not exist")
+
+    catalog = _catalog_cache.snapshot(DB_PATH).by_id
+    errors = []
+
+    def rows():
+        for row_number, item in enumerate(items, start=1):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError(f"Row must be an object, not {type(item).__name__}")
+                raw_type_id = item.get('equipment_type_id')
+                try:
+                    equipment_type_id = int(raw_type_id)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid equipment type ID {raw_type_id!r}")
+                equipment_type = catalog.get(equipment_type_id)
+                if equipment_type is None:
+                    raise ValueError(f"Equipment type with ID {equipment_type_id} does not exist")
+                purchase_date = item.get('purchase_date') or date.today()
+                if isinstance(purchase_date, str):
+                    purchase_date = date.fromisoformat(purchase_date)
+                elif not isinstance(purchase_date, date):
+                    raise ValueError(f"Invalid purchase date {purchase_date!r}")
+            except ValueError as e:
+                errors.append({"row": row_number, "error": str(e)})
+                continue
+            next_maintenance_date = _calculate_next_maintenance_date(
+                purchase_date, equipment_type.maintenance_interval_days
+            )
+            yield (equipment_type_id, user_id, purchase_date, next_maintenance_date, item.get('notes') or None)
+
+    # Read the whole upload before taking the write lock (and before handing
+    # the write to a queue's writer thread, which cannot read the request body)
+    values = list(rows())
+
+    def write(conn):
+        cursor = conn.executemany(
+            """INSERT INTO user_equipment (equipment_type_id, user_id, date_purchased, next_maintenance_date, notes)
                VALUES (?, ?, ?, ?, ?)""",
-            (equipment_type_id, user_id, purchase_date, next_maintenance_date, notes)
+            values
         )
-        conn.commit()
-        user_equipment_id = cursor.lastrowid
-        return get_user_equipment_by_id(user_equipment_id)
+        return max(cursor.rowcount, 0)
+
+    inserted = _write(write)
+    return {"inserted": inserted, "errors": errors}
+
+# Equipment type columns joined onto user_equipment rows by the getters below
+TYPE_DETAIL_COLUMNS = (
+    "equipment_name", "description", "width", "height", "depth",
+    "maintenance_interval_days", "color", "manufacturer", "model",
+)
+
+def _with_type_details(row, equipment_type):
+    """Shape a user_equipment row like get_user_equipment_by_id, using an already loaded type"""
+    result = dict(row)
+    for name in TYPE_DETAIL_COLUMNS:
+        result[name] = equipment_type[name]
+    return result
 
 #identify equipment instance with type details
 def get_user_equipment_by_id(user_equipment_id):
@@ -147,39 +336,41 @@ def perform_maintenance(user_equipment_id, maintenance_date=None):
     elif isinstance(maintenance_date, str):
         maintenance_date = date.fromisoformat(maintenance_date)
     
-    # Get equipment details to calculate next maintenance
-    equipment = get_user_equipment_by_id(user_equipment_id)
-    if not equipment:
+    # One statement: the interval is read from the equipment type inside the UPDATE
+    # and RETURNING gives back the updated row, so nothing is read before or after
+    def write(conn):
+        return conn.execute(
+            """UPDATE user_equipment
+               SET last_maintenance_date = ?,
+                   next_maintenance_date = date(?, '+' || (
+                       SELECT maintenance_interval_days FROM equipment_types
+                       WHERE id = user_equipment.equipment_type_id
+                   ) || ' days')
+               WHERE id = ?
+               RETURNING *""",
+            (maintenance_date, maintenance_date.isoformat(), user_equipment_id)
+        ).fetchone()
+
+    row = _write(write)
+    if row is None:
         raise ValueError(f"Equipment with ID {user_equipment_id} not found")
-    
-    # Calculate next maintenance date
-    next_maintenance_date = _calculate_next_maintenance_date(
-        maintenance_date, 
-        equipment['maintenance_interval_days']
-    )
-    
-    with _connect() as conn:
-        cursor = conn.execute(
-            """UPDATE user_equipment 
-               SET last_maintenance_date = ?, next_maintenance_date = ?
-               WHERE id = ?""",
-            (maintenance_date, next_maintenance_date, user_equipment_id)
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return get_user_equipment_by_id(user_equipment_id)
-        return None
+    return _with_type_details(row, get_equipment_type_by_id(row['equipment_type_id']))
 
 #Delete user's equipment instance
 def delete_user_equipment(user_equipment_id):
-    with _connect() as conn:
+    def write(conn):
         cursor = conn.execute("DELETE FROM user_equipment WHERE id = ?", (user_equipment_id,))
-        conn.commit()
         return cursor.rowcount > 0
 
+    return _write(write)
+
 
 def get_all_user_equipment():
     """Get all equipment owned by all users"""
+    return list(iter_all_user_equipment())
+
+def iter_all_user_equipment():
+    """Yield all equipment owned by all users, reading rows lazily from the cursor"""
     with _connect() as conn:
         cursor = conn.execute(
             """SELECT ue.*, et.equipment_name, et.description, et.width, et.height, et.depth, et.maintenance_interval_days
@@ -187,8 +378,51 @@ def get_all_user_equipment():
                JOIN equipment_types et ON ue.equipment_type_id = et.id
                ORDER BY ue.user_id, ue.date_purchased DESC"""
         )
-        equipment = cursor.fetchall()
-        return [_row_to_dict(item) for item in equipment]
+        for item in cursor:
+            yield _row_to_dict(item)
+
+def get_user_equipment_page(user_id=None, limit=None, cursor=None):
+    """
+    Get one page of user equipment, newest purchase first, with keyset pagination
+
+    Pages are ordered by (date_purchased, id) descending and the cursor is
+    the key of the last item returned, so each page is an index seek.
+
+    Args:
+        user_id (int): Only list this user's equipment; None lists everyone's
+        limit (int): Page size (default and maximum come from pagination.py)
+        cursor (str): next_cursor from the previous page, or None for the first page
+
+    Returns:
+        dict: 'equipment' list and 'next_cursor' (None on the last page)
+    """
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor, 2)
+
+    conditions, params = [], []
+    if user_id is not None:
+        conditions.append("ue.user_id = ?")
+        params.append(user_id)
+    if after is not None:
+        conditions.append("(ue.date_purchased, ue.id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with _connect() as conn:
+        cursor = conn.execute(
+            f"""SELECT ue.*, et.equipment_name, et.description, et.width, et.height, et.depth,
+                       et.maintenance_interval_days, et.color, et.manufacturer, et.model
+                FROM user_equipment ue
+                JOIN equipment_types et ON ue.equipment_type_id = et.id
+                {where}
+                ORDER BY ue.date_purchased DESC, ue.id DESC
+                LIMIT ?""",
+            (*params, limit + 1)
+        )
+        rows, next_cursor = page_result(
+            cursor.fetchall(), limit, lambda row: (row['date_purchased'], row['id'])
+        )
+        return {"equipment": [_row_to_dict(row) for row in rows], "next_cursor": next_cursor}
 
 def get_overdue_maintenance(user_id):
     """Get all equipment with overdue maintenance for a user"""
@@ -225,71 +459,112 @@ def get_maintenance_due(user_id, days_ahead=30):
         equipment = cursor.fetchall()
         return [_row_to_dict(item) for item in equipment]
 
+def get_maintenance_summaries(user_ids):
+    """
+    Get maintenance summaries for many users with one aggregate query
+
+    Args:
+        user_ids (iterable): User IDs to summarize
+
+    Returns:
+        list: One summary dict per user ID, in the order given (zeros if a user has no equipment)
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    today = date.today()
+    future_date = today + timedelta(days=30)
+    with _connect() as conn:
+        cursor = conn.execute(
+            """SELECT ue.user_id,
+                      COUNT(*) AS total_equipment,
+                      SUM(CASE WHEN ue.next_maintenance_date < ? THEN 1 ELSE 0 END) AS overdue_maintenance,
+                      SUM(CASE WHEN ue.next_maintenance_date >= ? AND ue.next_maintenance_date <= ?
+                               THEN 1 ELSE 0 END) AS due_soon
+               FROM user_equipment ue
+               JOIN equipment_types et ON ue.equipment_type_id = et.id
+               WHERE ue.user_id IN (SELECT value FROM json_each(?))
+               GROUP BY ue.user_id""",
+            (today.isoformat(), today.isoformat(), future_date.isoformat(), json.dumps(user_ids))
+        )
+        counts = {row['user_id']: row for row in cursor}
+
+    summaries = []
+    for user_id in user_ids:
+        row = counts.get(user_id)
+        summaries.append({
+            "user_id": user_id,
+            "total_equipment": row['total_equipment'] if row else 0,
+            "overdue_maintenance": row['overdue_maintenance'] if row else 0,
+            "due_within_30_days": row['due_soon'] if row else 0
+        })
+    return summaries
+
 def get_maintenance_summary(user_id):
     """Get maintenance summary for a user"""
-    overdue = len(get_overdue_maintenance(user_id))
-    due_soon = len(get_maintenance_due(user_id, days_ahead=30))
-    total_equipment = len(get_equipment_by_user(user_id))
-
-    return {
-        "user_id": user_id,
-        "total_equipment": total_equipment,
-        "overdue_maintenance": overdue,
-        "due_within_30_days": due_soon
-    }
+    return get_maintenance_summaries([user_id])[0]
 
 def get_maintenance_schedule_with_shops(user_id):
     """
     Get maintenance schedule for ALL equipment in user's shops
     Shows which shop each equipment is in
-    """
-    from shop_space_functions import get_shop_spaces_by_username
 
-    # Get user's username
-    import sys
-    sys.path.append(str(Path(__file__).parent))
-    from users_functions import get_user_by_id
-    user = get_user_by_id(user_id)
-    username = user['username']
-
-    # Get all user's shop spaces
-    shops = get_shop_spaces_by_username(username)
+    One statement on the unified connection (see unified_db.py) joins the
+    user, their shops' placements and the placed equipment, however many
+    shops and tools the user has. The user row is outer-joined, so a user
+    without placements still returns one row and a missing user returns none.
+    """
+    rows = unified_connection().execute(
+        """SELECT p.equipment_id, s.shop_id, s.shop_name, ue.next_maintenance_date, ue.notes,
+                  et.equipment_name, et.maintenance_interval_days
+           FROM users.users u
+           LEFT JOIN shop_spaces.shop_spaces s ON s.username = u.username
+           LEFT JOIN shop_spaces.shop_placements p ON p.shop_id = s.shop_id
+           LEFT JOIN equipment.user_equipment ue ON ue.id = p.equipment_id
+           LEFT JOIN equipment.equipment_types et ON et.id = ue.equipment_type_id
+           WHERE u.id = ?
+           ORDER BY s.creation_timestamp DESC, p.rowid""",
+        (user_id,)
+    ).fetchall()
+    if not rows:
+        raise ValueError(f"User with ID {user_id} does not exist")
 
-    # Collect all equipment from all shops
-    maintenance_items = []
+    # Build items and bucket them in one pass
+    overdue, this_week, upcoming = [], [], []
     today = date.today()
 
-    for shop in shops:
-        for placement in shop['equipment']:
-            eq_id = placement['equipment_id']
-
-            # Get equipment details from equipment database using equipment_id
-            eq_data = get_user_equipment_by_id(eq_id)
-
-            if not eq_data or not eq_data.get('next_maintenance_date'):
-                continue
-
-            next_date = date.fromisoformat(eq_data['next_maintenance_date'])
-            days_until = (next_date - today).days
-
-            maintenance_items.append({
-                'equipment_id': eq_id,
-                'equipment_name': eq_data['equipment_name'],
-                'shop_name': shop['shop_name'],  # Which shop it's in
-                'shop_id': shop['shop_id'],
-                'next_maintenance_date': next_date.isoformat(),
-                'next_maintenance_date_formatted': next_date.strftime('%b %d, %Y'),
-                'maintenance_interval_days': eq_data.get('maintenance_interval_days'),
-                'days_until': days_until,
-                'notes': eq_data.get('notes', ''),
-                'is_overdue': days_until < 0,
-                'is_due_soon': 0 <= days_until <= 7
-            })
-
-    # Sort and categorize
-    overdue = [m for m in maintenance_items if m['is_overdue']]
-    this_week = [m for m in maintenance_items if m['is_due_soon']]
-    upcoming = [m for m in maintenance_items if not m['is_overdue'] and not m['is_due_soon']]
+    for eq_data in rows:
+        eq_id = eq_data['equipment_id']
+
+        # No placements, or a placement whose equipment is gone
+        if eq_id is None or not eq_data['next_maintenance_date']:
+            continue
+
+        next_date = date.fromisoformat(eq_data['next_maintenance_date'])
+        days_until = (next_date - today).days
+        is_overdue = days_until < 0
+        is_due_soon = 0 <= days_until <= 7
+
+        item = {
+            'equipment_id': eq_id,
+            'equipment_name': eq_data['equipment_name'],
+            'shop_name': eq_data['shop_name'],  # Which shop it's in
+            'shop_id': eq_data['shop_id'],
+            'next_maintenance_date': next_date.isoformat(),
+            'next_maintenance_date_formatted': next_date.strftime('%b %d, %Y'),
+            'maintenance_interval_days': eq_data['maintenance_interval_days'],
+            'days_until': days_until,
+            'notes': eq_data['notes'],
+            'is_overdue': is_overdue,
+            'is_due_soon': is_due_soon
+        }
+
+        if is_overdue:
+            overdue.append(item)
+        elif is_due_soon:
+            this_week.append(item)
+        else:
+            upcoming.append(item)
 
     return {
         "overdue": sorted(overdue, key=lambda x: x['days_until']),
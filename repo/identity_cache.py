@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class IdentityCache:
+    """
+    Bounded LRU cache of user_id <-> username pairs with a TTL
+
+    Usernames and IDs never change for a user, so entries only go stale when
+    a user is deleted (or re-created under the same name). add_user and
+    delete_user invalidate explicitly; the TTL bounds staleness for changes
+    made by other processes. Only existing users are cached.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._by_username = OrderedDict()  # username -> (user_id, expires_at)
+        self._by_id = OrderedDict()        # user_id -> (username, expires_at)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _get(self, table, key):
+        """Look up key in one direction, counting the hit or miss (caller holds the lock)"""
+        entry = table.get(key)
+        if entry is not None and entry[1] > self._clock():
+            table.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+        if entry is not None:
+            self._drop(table, key)
+        self._misses += 1
+        return None
+
+    def _drop(self, table, key):
+        """Remove key and its reverse entry (caller holds the lock)"""
+        entry = table.pop(key, None)
+        if entry is None:
+            return
+        other = self._by_id if table is self._by_username else self._by_username
+        other.pop(entry[0], None)
+
+    def user_id_for(self, username):
+        """Cached user ID for a username, or None on a miss"""
+        with self._lock:
+            return self._get(self._by_username, username)
+
+    def username_for(self, user_id):
+        """Cached username for a user ID, or None on a miss"""
+        with self._lock:
+            return self._get(self._by_id, user_id)
+
+    def put(self, user_id, username):
+        """Remember that user_id and username belong to the same user"""
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._drop(self._by_username, username)
+            self._drop(self._by_id, user_id)
+            self._by_username[username] = (user_id, expires_at)
+            self._by_id[user_id] = (username, expires_at)
+            while len(self._by_username) > self.max_size:
+                oldest = next(iter(self._by_username))
+                self._drop(self._by_username, oldest)
+                self._evictions += 1
+
+    def invalidate(self, user_id=None, username=None):
+        """Forget a user by ID and/or username"""
+        with self._lock:
+            if user_id is not None:
+                self._drop(self._by_id, user_id)
+            if username is not None:
+                self._drop(self._by_username, username)
+            self._invalidations += 1
+
+    def clear(self):
+        """Forget every user"""
+        with self._lock:
+            self._by_username.clear()
+            self._by_id.clear()
+
+    def stats(self):
+        """
+        Get cache counters for monitoring
+
+        Returns:
+            dict: hits, misses, evictions, invalidations, current size and limits
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._by_username),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# Process-wide cache shared by all repo modules
+identity_cache = IdentityCache()
+
+
+def identity_cache_stats():
+    """Get counters for the process-wide identity cache"""
+    return identity_cache.stats()
@@ -0,0 +1,314 @@
+import sqlite3
+from datetime import datetime
+
+# Versioned schema migrations for the three SQLite databases
+#
+# Each database has an ordered list of (version, description, action) steps.
+# An action is either a SQL script or a callable taking the connection.
+# Applied versions are recorded in that database's schema_version table, so
+# every step runs exactly once per database file. Never edit a step that has
+# shipped; append a new one instead.
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+  version INTEGER PRIMARY KEY,
+  description TEXT NOT NULL,
+  applied_at TEXT NOT NULL
+);
+"""
+
+
+def _column_exists(conn, table_name, column_name):
+    """Check if a column exists in a table"""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+    return column_name in columns
+
+
+def _add_column_if_missing(conn, table_name, column_name, definition):
+    """ALTER TABLE ADD COLUMN unless the column is already there"""
+    if not _column_exists(conn, table_name, column_name):
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}")
+
+
+# USERS DATABASE
+
+USERS_MIGRATIONS = [
+    (1, "create users table", """
+CREATE TABLE IF NOT EXISTS users (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username TEXT NOT NULL UNIQUE,
+  name TEXT NOT NULL,
+  email TEXT NOT NULL UNIQUE,
+  password TEXT NOT NULL,
+  shop_spaces TEXT DEFAULT '[]'
+);
+"""),
+    (2, "add trigram full-text index over username and name", """
+CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5(
+  username, name,
+  content='users', content_rowid='id',
+  tokenize='trigram'
+);
+INSERT INTO users_search (users_search) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS trg_users_search_insert
+AFTER INSERT ON users
+BEGIN
+  INSERT INTO users_search (rowid, username, name) VALUES (new.id, new.username, new.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_search_delete
+AFTER DELETE ON users
+BEGIN
+  INSERT INTO users_search (users_search, rowid, username, name) VALUES ('delete', old.id, old.username, old.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_search_update
+AFTER UPDATE OF username, name ON users
+BEGIN
+  INSERT INTO users_search (users_search, rowid, username, name) VALUES ('delete', old.id, old.username, old.name);
+  INSERT INTO users_search (rowid, username, name) VALUES (new.id, new.username, new.name);
+END;
+
+CREATE INDEX IF NOT EXISTS idx_users_username_nocase
+  ON users (username COLLATE NOCASE);
+"""),
+]
+
+
+# EQUIPMENT DATABASE
+
+def _add_equipment_type_columns(conn):
+    """Columns added to equipment_types after the first release"""
+    _add_column_if_missing(conn, "equipment_types", "color", "TEXT DEFAULT '#aaa'")
+    _add_column_if_missing(conn, "equipment_types", "manufacturer", "TEXT")
+    _add_column_if_missing(conn, "equipment_types", "model", "TEXT")
+    _add_column_if_missing(conn, "equipment_types", "image_path", "TEXT")
+
+
+EQUIPMENT_MIGRATIONS = [
+    (1, "create equipment_types and user_equipment tables", """
+CREATE TABLE IF NOT EXISTS equipment_types (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    equipment_name TEXT NOT NULL UNIQUE,
+    description TEXT,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    maintenance_interval_days INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_equipment (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    equipment_type_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    date_purchased TEXT NOT NULL,
+    last_maintenance_date TEXT,
+    next_maintenance_date TEXT,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (equipment_type_id) REFERENCES equipment_types(id) ON DELETE CASCADE
+);
+"""),
+    (2, "add color, manufacturer, model and image_path to equipment_types", _add_equipment_type_columns),
+    (3, "index user_equipment by owner, maintenance date and type", """
+CREATE INDEX IF NOT EXISTS idx_user_equipment_user_purchased
+  ON user_equipment (user_id, date_purchased);
+CREATE INDEX IF NOT EXISTS idx_user_equipment_user_next_maintenance
+  ON user_equipment (user_id, next_maintenance_date, equipment_type_id);
+CREATE INDEX IF NOT EXISTS idx_user_equipment_type
+  ON user_equipment (equipment_type_id);
+"""),
+    (4, "track a catalog version bumped on every equipment_types change", """
+CREATE TABLE IF NOT EXISTS catalog_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 1);
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_types_insert_version
+AFTER INSERT ON equipment_types
+BEGIN
+  UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_types_update_version
+AFTER UPDATE ON equipment_types
+BEGIN
+  UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_types_delete_version
+AFTER DELETE ON equipment_types
+BEGIN
+  UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+END;
+"""),
+    (5, "index user_equipment by (date_purchased, id) for keyset pagination", """
+CREATE INDEX IF NOT EXISTS idx_user_equipment_purchased
+  ON user_equipment (date_purchased);
+"""),
+    (6, "add full-text and footprint indexes for catalog search", """
+CREATE VIRTUAL TABLE IF NOT EXISTS equipment_types_search USING fts5(
+  equipment_name, description, manufacturer, model,
+  content='equipment_types', content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2',
+  prefix='2 3'
+);
+INSERT INTO equipment_types_search (equipment_types_search) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_types_search_insert
+AFTER INSERT ON equipment_types
+BEGIN
+  INSERT INTO equipment_types_search (rowid, equipment_name, description, manufacturer, model)
+  VALUES (new.id, new.equipment_name, new.description, new.manufacturer, new.model);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_types_search_delete
+AFTER DELETE ON equipment_types
+BEGIN
+  INSERT INTO equipment_types_search (equipment_types_search, rowid, equipment_name, description, manufacturer, model)
+  VALUES ('delete', old.id, old.equipment_name, old.description, old.manufacturer, old.model);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_equipment_types_search_update
+AFTER UPDATE OF equipment_name, description, manufacturer, model ON equipment_types
+BEGIN
+  INSERT INTO equipment_types_search (equipment_types_search, rowid, equipment_name, description, manufacturer, model)
+  VALUES ('delete', old.id, old.equipment_name, old.description, old.manufacturer, old.model);
+  INSERT INTO equipment_types_search (rowid, equipment_name, description, manufacturer, model)
+  VALUES (new.id, new.equipment_name, new.description, new.manufacturer, new.model);
+END;
+
+CREATE INDEX IF NOT EXISTS idx_equipment_types_width_depth
+  ON equipment_types (width, depth);
+CREATE INDEX IF NOT EXISTS idx_equipment_types_depth_width
+  ON equipment_types (depth, width);
+CREATE INDEX IF NOT EXISTS idx_equipment_types_manufacturer
+  ON equipment_types (manufacturer COLLATE NOCASE, width, depth);
+"""),
+]
+
+
+# SHOP SPACES DATABASE
+
+def _add_shop_version_column(conn):
+    """Version counter bumped by shop_space_functions on every shop change"""
+    _add_column_if_missing(conn, "shop_spaces", "version", "INTEGER NOT NULL DEFAULT 1")
+
+
+SHOP_SPACES_MIGRATIONS = [
+    (1, "create shop_spaces table", """
+CREATE TABLE IF NOT EXISTS shop_spaces (
+  shop_id TEXT PRIMARY KEY,
+  username TEXT NOT NULL,
+  shop_name TEXT NOT NULL,
+  creation_timestamp TEXT NOT NULL,
+  length REAL NOT NULL,
+  width REAL NOT NULL,
+  height REAL NOT NULL,
+  equipment TEXT DEFAULT '[]'
+);
+"""),
+    (2, "create shop_placements table", """
+CREATE TABLE IF NOT EXISTS shop_placements (
+  shop_id TEXT NOT NULL,
+  equipment_id INTEGER NOT NULL,
+  date_added TEXT,
+  x_coordinate REAL,
+  y_coordinate REAL,
+  z_coordinate REAL,
+  rotation_deg REAL DEFAULT 0,
+  PRIMARY KEY (shop_id, equipment_id),
+  FOREIGN KEY (shop_id) REFERENCES shop_spaces(shop_id) ON DELETE CASCADE
+);
+"""),
+    (3, "index shop_spaces by owner and creation time", """
+CREATE INDEX IF NOT EXISTS idx_shop_spaces_username_created
+  ON shop_spaces (username, creation_timestamp);
+"""),
+    (4, "add version counter to shop_spaces", _add_shop_version_column),
+    (5, "index shop_spaces by (creation_timestamp, shop_id) for keyset pagination", """
+CREATE INDEX IF NOT EXISTS idx_shop_spaces_created_id
+  ON shop_spaces (creation_timestamp, shop_id);
+CREATE INDEX IF NOT EXISTS idx_shop_spaces_username_created_id
+  ON shop_spaces (username, creation_timestamp, shop_id);
+DROP INDEX IF EXISTS idx_shop_spaces_username_created;
+"""),
+]
+
+
+MIGRATIONS = {
+    "users": USERS_MIGRATIONS,
+    "equipment": EQUIPMENT_MIGRATIONS,
+    "shop_spaces": SHOP_SPACES_MIGRATIONS,
+}
+
+
+def _split_sql(script):
+    """Split a SQL script into complete statements (trigger bodies stay whole)"""
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def get_schema_version(conn):
+    """Highest applied migration version, or 0 for a fresh database"""
+    conn.executescript(SCHEMA_VERSION_DDL)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn, database):
+    """
+    Apply every pending migration step for a database
+
+    Each step runs in its own IMMEDIATE transaction together with its
+    schema_version row, so a failed step leaves no partial changes and two
+    processes starting at once do not apply the same step twice.
+
+    Args:
+        conn: Open connection to the database file
+        database (str): 'users', 'equipment' or 'shop_spaces'
+
+    Returns:
+        list: Versions applied by this call
+    """
+    if database not in MIGRATIONS:
+        raise ValueError(f"Unknown database '{database}'")
+
+    applied = []
+    current = get_schema_version(conn)
+    for version, description, action in MIGRATIONS[database]:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            already = conn.execute(
+                "SELECT 1 FROM schema_version WHERE version = ?", (version,)
+            ).fetchone()
+            if not already:
+                if callable(action):
+                    action(conn)
+                else:
+                    for statement in _split_sql(action):
+                        conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().isoformat())
+                )
+                applied.append(version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
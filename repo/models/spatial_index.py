@@ -0,0 +1,249 @@
+import math
+from dataclasses import dataclass
+
+# Extra clearance (feet) around a tool's body: (left, right, top, bottom)
+# Mirrors getEquipmentUseAreaRect in frontend/src/utils/equipmentPictograms.js.
+# A rule matches if every word of one name group is in the name, or a model term is in the model.
+CLEARANCE_RULES = [
+    ((("table saw",),), ("pcs31230",), (8, 8, 0, 0)),
+    ((("planer",),), ("dw735",), (0, 0, 6, 6)),
+    ((("drill press",),), ("18-900l",), (0, 0, 0, 2)),
+    ((("jointer",),), ("jwj-8cs",), (2, 0, 6, 6)),
+    ((("belt/disc",), ("belt", "sander")), ("31-735",), (2, 0, 0, 2)),
+    ((("band saw",), ("bandsaw",)), ("pm1500",), (0, 0, 4, 4)),
+    ((("cnc",),), ("c-103",), (2, 2, 2, 2)),
+]
+
+
+def _clearance_extras(name, model):
+    """Find the clearance extras for a tool by name or model, or None"""
+    name = (name or "").lower()
+    model = (model or "").lower()
+    for name_groups, model_terms, extras in CLEARANCE_RULES:
+        if any(all(term in name for term in group) for group in name_groups):
+            return extras
+        if any(term in model for term in model_terms):
+            return extras
+    return None
+
+
+def rotated_bounding_box(cx, cy, width, depth, rotation_deg):
+    """
+    Axis-aligned box (left, top, right, bottom) containing a rotated rectangle
+
+    Same math as getEquipmentBoundingBox in collisionUtils.js.
+    """
+    theta = math.radians(rotation_deg or 0)
+    cos_t = abs(math.cos(theta))
+    sin_t = abs(math.sin(theta))
+    hw = width / 2
+    hh = depth / 2
+    ex = cos_t * hw + sin_t * hh
+    ey = sin_t * hw + cos_t * hh
+    return (cx - ex, cy - ey, cx + ex, cy + ey)
+
+
+def boxes_overlap(a, b):
+    """Strict overlap test; boxes that only touch do not overlap"""
+    return not (a[2] <= b[0] or a[0] >= b[2] or a[3] <= b[1] or a[1] >= b[3])
+
+
+@dataclass
+class Footprint:
+    """Floor footprint of one placed tool, in feet"""
+    equipment_id: int
+    x: float
+    y: float
+    width: float
+    depth: float
+    rotation_deg: float = 0.0
+    name: str = None
+    model: str = None
+
+    @classmethod
+    def from_inches(cls, equipment_id, x, y, width_in, depth_in, rotation_deg=0.0, name=None, model=None):
+        """Build a footprint from catalog dimensions, which are stored in inches"""
+        return cls(equipment_id, x, y, width_in / 12, depth_in / 12, rotation_deg or 0.0, name, model)
+
+    def body_box(self):
+        """Bounding box of the tool itself"""
+        return rotated_bounding_box(self.x, self.y, self.width, self.depth, self.rotation_deg)
+
+    def clearance_box(self):
+        """Bounding box of the tool's working clearance, or None if it has none"""
+        extras = _clearance_extras(self.name, self.model)
+        if extras is None:
+            return None
+        left, right, top, bottom = extras
+        area_w = self.width + left + right
+        area_h = self.depth + top + bottom
+        # Center of the clearance rect in the tool's local coordinates
+        cx_local = -self.width / 2 - left + area_w / 2
+        cy_local = -self.depth / 2 - top + area_h / 2
+        theta = math.radians(self.rotation_deg or 0)
+        cx = self.x + cx_local * math.cos(theta) - cy_local * math.sin(theta)
+        cy = self.y + cx_local * math.sin(theta) + cy_local * math.cos(theta)
+        return rotated_bounding_box(cx, cy, area_w, area_h, self.rotation_deg)
+
+
+class SpatialGrid:
+    """
+    Uniform grid of boxes keyed by an id
+
+    Each box is registered in every cell it covers, so a query only looks at
+    boxes in the cells its own box covers. With cells about the size of a
+    tool, that is a handful of candidates regardless of how many tools the
+    shop holds.
+    """
+
+    def __init__(self, cell_size=4.0):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._boxes = {}
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        x0, y0 = math.floor(box[0] / size), math.floor(box[1] / size)
+        x1, y1 = math.floor(box[2] / size), math.floor(box[3] / size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+    def insert(self, key, box):
+        """Add or replace the box stored under key"""
+        self.remove(key)
+        self._boxes[key] = box
+        for cell in self._cell_range(box):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        """Remove the box stored under key, if any"""
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cell_range(box):
+            bucket = self._cells.get(cell)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def query(self, box, ignore=None):
+        """Keys whose boxes overlap box, excluding ignore"""
+        candidates = set()
+        for cell in self._cell_range(box):
+            candidates.update(self._cells.get(cell, ()))
+        candidates.discard(ignore)
+        return sorted(k for k in candidates if boxes_overlap(box, self._boxes[k]))
+
+    def __len__(self):
+        return len(self._boxes)
+
+
+class ShopSpatialIndex:
+    """
+    Collision and clearance checks for the tools placed in one shop
+
+    Shop width runs along x and shop length along y, matching the canvas.
+    """
+
+    def __init__(self, shop_width, shop_length, footprints=(), cell_size=4.0):
+        self.shop_width = shop_width
+        self.shop_length = shop_length
+        self._footprints = {}
+        self._bodies = SpatialGrid(cell_size)
+        self._clearances = SpatialGrid(cell_size)
+        for footprint in footprints:
+            self.insert(footprint)
+
+    def insert(self, footprint):
+        """Add or move a tool"""
+        key = footprint.equipment_id
+        self._footprints[key] = footprint
+        self._bodies.insert(key, footprint.body_box())
+        clearance = footprint.clearance_box()
+        if clearance is None:
+            self._clearances.remove(key)
+        else:
+            self._clearances.insert(key, clearance)
+
+    def remove(self, equipment_id):
+        """Remove a tool"""
+        self._footprints.pop(equipment_id, None)
+        self._bodies.remove(equipment_id)
+        self._clearances.remove(equipment_id)
+
+    def get(self, equipment_id):
+        """Footprint stored for a tool, or None"""
+        return self._footprints.get(equipment_id)
+
+    def collisions_for(self, footprint):
+        """IDs of other tools whose bodies overlap this tool's body"""
+        return self._bodies.query(footprint.body_box(), ignore=footprint.equipment_id)
+
+    def clearance_conflicts_for(self, footprint):
+        """
+        IDs of tools involved in a clearance problem with this tool
+
+        Covers this tool's clearance hitting a wall or another body, and other
+        tools' clearance zones covering this tool's body.
+        """
+        key = footprint.equipment_id
+        conflicts = set(self._clearances.query(footprint.body_box(), ignore=key))
+        clearance = footprint.clearance_box()
+        if clearance is not None:
+            conflicts.update(self._bodies.query(clearance, ignore=key))
+            if self._outside_walls(clearance):
+                conflicts.add(key)
+        return sorted(conflicts)
+
+    def _outside_walls(self, box):
+        return box[0] < 0 or box[1] < 0 or box[2] > self.shop_width or box[3] > self.shop_length
+
+    def check(self, footprint, mode):
+        """
+        Conflicts a tool would have at the given footprint
+
+        Args:
+            footprint (Footprint): Candidate position
+            mode (str): 'collision' checks bodies only, 'clearance' adds clearance zones
+
+        Returns:
+            dict: 'collisions' and 'clearance' lists of equipment IDs
+        """
+        if mode not in ("collision", "clearance"):
+            raise ValueError(f"Unknown validation mode '{mode}'")
+        result = {"collisions": self.collisions_for(footprint), "clearance": []}
+        if mode == "clearance":
+            result["clearance"] = self.clearance_conflicts_for(footprint)
+        return result
+
+    def conflicts(self):
+        """
+        Every conflict in the shop
+
+        Returns:
+            dict: 'collisions' as sorted [id, other_id] pairs and
+                  'clearance_issue_ids' like computeClearanceIssueIds
+        """
+        pairs = set()
+        issue_ids = set()
+        for key, footprint in self._footprints.items():
+            for other in self.collisions_for(footprint):
+                pairs.add((min(key, other), max(key, other)))
+            clearance = footprint.clearance_box()
+            if clearance is None:
+                continue
+            if self._outside_walls(clearance):
+                issue_ids.add(key)
+            others = self._bodies.query(clearance, ignore=key)
+            if others:
+                issue_ids.add(key)
+                issue_ids.update(others)
+        return {
+            "collisions": [list(pair) for pair in sorted(pairs)],
+            "clearance_issue_ids": sorted(issue_ids),
+        }
+
+    def __len__(self):
+        return len(self._footprints)
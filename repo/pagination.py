@@ -0,0 +1,88 @@
+import base64
+import json
+
+# Keyset pagination helpers
+#
+# A cursor is the sort key of the last row on a page, serialized as URL-safe
+# base64 JSON. The next page is "rows strictly after that key", which an index
+# on the sort columns answers with a seek instead of an OFFSET scan, so every
+# page costs the same no matter how deep into the table it is.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    """
+    Serialize a row's sort key into an opaque cursor string
+
+    Args:
+        values (list | tuple): Sort key columns of the last row on a page
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """
+    Parse a cursor produced by encode_cursor
+
+    Args:
+        cursor (str): Cursor from a previous page, or None/'' for the first page
+        size (int): Number of sort key columns the caller expects
+
+    Returns:
+        list: Sort key values, or None for the first page
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def clamp_limit(limit):
+    """
+    Normalize a requested page size
+
+    Args:
+        limit (int | str | None): Requested size; None means the default
+
+    Returns:
+        int: Page size between 1 and MAX_PAGE_SIZE
+    """
+    if limit is None or limit == "":
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def page_result(rows, limit, key):
+    """
+    Split a LIMIT limit+1 result into a page and the cursor for the next one
+
+    Args:
+        rows (list): Up to limit + 1 rows in sort order
+        limit (int): Page size
+        key (callable): Returns the sort key values of a row
+
+    Returns:
+        tuple: (rows on this page, next cursor or None when this is the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,257 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Password hashing with a tunable key-derivation function
+#
+# Hashes are stored self-describing, e.g. "scrypt$16384$8$1$<salt>$<hash>",
+# so the cost can be raised later: verify_password still accepts the old
+# parameters and needs_rehash tells the caller to store a fresh hash after a
+# successful login. Bare 64-character hex strings are the legacy unsalted
+# SHA-256 hashes and always need a rehash.
+#
+# Configuration (environment, read once at import):
+#   PASSWORD_HASHER             scrypt (default) or pbkdf2_sha256
+#   PASSWORD_SCRYPT_N           scrypt CPU/memory cost, power of two (default 16384)
+#   PASSWORD_PBKDF2_ITERATIONS  PBKDF2 iterations (default 600000)
+#   PASSWORD_HASH_WORKERS       threads hashing at once (default min(4, CPUs))
+#   PASSWORD_HASH_QUEUE         hashes allowed to wait for a thread (default 8 per worker)
+#   PASSWORD_HASH_WAIT_SECONDS  how long a caller waits for a queue slot (default 2)
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when too many passwords are already waiting to be hashed"""
+
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class ScryptHasher:
+    """scrypt from hashlib; memory-hard, so GPUs gain little over the server"""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n=16384, r=8, p=1, salt_bytes=16, key_bytes=32):
+        if n < 2 or n & (n - 1):
+            raise ValueError("scrypt n must be a power of two greater than 1")
+        self.n, self.r, self.p = n, r, p
+        self.salt_bytes = salt_bytes
+        self.key_bytes = key_bytes
+
+    def _derive(self, password, salt, n, r, p, key_bytes):
+        # maxmem must cover 128 * r * n bytes plus headroom or OpenSSL refuses
+        return hashlib.scrypt(
+            password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+            maxmem=256 * r * n + 1024 * 1024, dklen=key_bytes
+        )
+
+    def hash(self, password):
+        salt = secrets.token_bytes(self.salt_bytes)
+        key = self._derive(password, salt, self.n, self.r, self.p, self.key_bytes)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, encoded, password):
+        _, n, r, p, salt, key = encoded.split("$")
+        expected = _b64decode(key)
+        derived = self._derive(password, _b64decode(salt), int(n), int(r), int(p), len(expected))
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, encoded):
+        parts = encoded.split("$")
+        return parts[0] != self.algorithm or parts[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256 from hashlib; cheaper on memory than scrypt"""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600000, salt_bytes=16, key_bytes=32):
+        if iterations < 1:
+            raise ValueError("PBKDF2 iterations must be at least 1")
+        self.iterations = iterations
+        self.salt_bytes = salt_bytes
+        self.key_bytes = key_bytes
+
+    def hash(self, password):
+        salt = secrets.token_bytes(self.salt_bytes)
+        key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.iterations, self.key_bytes)
+        return f"{self.algorithm}${self.iterations}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, encoded, password):
+        _, iterations, salt, key = encoded.split("$")
+        expected = _b64decode(key)
+        derived = hashlib.pbkdf2_hmac(
+            "sha256", password.encode("utf-8"), _b64decode(salt), int(iterations), len(expected)
+        )
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, encoded):
+        parts = encoded.split("$")
+        return parts[0] != self.algorithm or parts[1] != str(self.iterations)
+
+
+def _is_legacy_sha256(encoded):
+    return len(encoded) == 64 and all(c in "0123456789abcdef" for c in encoded)
+
+
+def _verify_legacy_sha256(encoded, password):
+    return hmac.compare_digest(encoded, hashlib.sha256(password.encode("utf-8")).hexdigest())
+
+
+HASHERS = {
+    ScryptHasher.algorithm: ScryptHasher,
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher,
+}
+
+
+def _hasher_from_env():
+    name = os.environ.get("PASSWORD_HASHER", ScryptHasher.algorithm)
+    if name == ScryptHasher.algorithm:
+        return ScryptHasher(n=int(os.environ.get("PASSWORD_SCRYPT_N", 16384)))
+    if name == Pbkdf2Hasher.algorithm:
+        return Pbkdf2Hasher(iterations=int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", 600000)))
+    raise ValueError(f"Unknown PASSWORD_HASHER '{name}'")
+
+
+_hasher = _hasher_from_env()
+
+
+def get_hasher():
+    """Hasher used for new passwords"""
+    return _hasher
+
+
+def set_hasher(hasher):
+    """Replace the hasher used for new passwords (existing hashes still verify)"""
+    global _hasher
+    _hasher = hasher
+
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing
+
+    hashlib's scrypt and PBKDF2 release the GIL, so hashing on a few
+    dedicated threads runs in parallel without blocking request threads
+    for longer than one hash. Waiting hashes are capped; once the queue is
+    full, callers wait up to wait_seconds for a slot and then get
+    HashingBusyError instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers=None, max_pending=None, wait_seconds=2.0):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending if max_pending is not None else self.workers * 8
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def run(self, func, *args):
+        """Run func(*args) on a hashing thread and return its result"""
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusyError("Too many logins in progress, try again shortly")
+        try:
+            result = self._executor.submit(func, *args).result()
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def stats(self):
+        """
+        Get pool counters for monitoring
+
+        Returns:
+            dict: worker and queue limits plus completed, failed and rejected totals
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+
+# Process-wide pool shared by users_functions
+hashing_pool = HashingPool(
+    workers=int(os.environ.get("PASSWORD_HASH_WORKERS", 0)) or None,
+    max_pending=int(os.environ["PASSWORD_HASH_QUEUE"]) if "PASSWORD_HASH_QUEUE" in os.environ else None,
+    wait_seconds=float(os.environ.get("PASSWORD_HASH_WAIT_SECONDS", 2.0)),
+)
+
+
+def _hasher_for(encoded):
+    """Hasher able to verify an encoded hash, using the stored parameters"""
+    algorithm = encoded.split("$", 1)[0]
+    if algorithm == _hasher.algorithm:
+        return _hasher
+    if algorithm in HASHERS:
+        return HASHERS[algorithm]()
+    raise ValueError("Unrecognized password hash format")
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured hasher on the hashing pool
+
+    Args:
+        password (str): Plaintext password
+
+    Returns:
+        str: Self-describing encoded hash
+    """
+    return hashing_pool.run(_hasher.hash, password)
+
+
+def verify_password(encoded, password):
+    """
+    Check a password against a stored hash (current, older-cost or legacy SHA-256)
+
+    Args:
+        encoded (str): Stored hash
+        password (str): Plaintext password to check
+
+    Returns:
+        bool: True if the password matches
+    """
+    if not encoded:
+        return False
+    if _is_legacy_sha256(encoded):
+        return _verify_legacy_sha256(encoded, password)
+    try:
+        hasher = _hasher_for(encoded)
+    except ValueError:
+        return False
+    return hashing_pool.run(hasher.verify, encoded, password)
+
+
+def needs_rehash(encoded):
+    """True if a stored hash is legacy or uses other parameters than the configured hasher"""
+    return _is_legacy_sha256(encoded) or _hasher.needs_rehash(encoded)
+
+
+def hashing_stats():
+    """Get counters for the process-wide hashing pool"""
+    return hashing_pool.stats()
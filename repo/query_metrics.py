@@ -0,0 +1,172 @@
+import sqlite3
+import time
+from contextvars import ContextVar
+
+from connection_pool import set_connection_factory
+
+# Optional accounting of the SQLite work done for one unit of work (a request)
+#
+# enable() makes the connection pool open InstrumentedConnection objects.
+# While a QueryStats collection is active in the current context (see
+# start/stop), every execute/executemany, fetch and commit on those
+# connections is timed and added to it, along with the rows fetched and a
+# per-statement breakdown keyed by the SQL text (parameters excluded, so
+# equal statements aggregate). Outside a collection each call only pays for
+# one ContextVar lookup.
+
+_current = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """SQLite work recorded for one collection"""
+
+    __slots__ = ("queries", "db_seconds", "rows", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.statements = {}  # sql -> [executions, seconds, rows]
+
+    def _statement(self, sql):
+        entry = self.statements.get(sql)
+        if entry is None:
+            entry = self.statements[sql] = [0, 0.0, 0]
+        return entry
+
+    def record_execute(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        entry = self._statement(sql)
+        entry[0] += 1
+        entry[1] += seconds
+
+    def record_fetch(self, sql, seconds, rows):
+        self.db_seconds += seconds
+        self.rows += rows
+        entry = self._statement(sql)
+        entry[1] += seconds
+        entry[2] += rows
+
+    def record_commit(self, seconds):
+        self.db_seconds += seconds
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports its statements and fetched rows to the active QueryStats"""
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        stats = _current.get()
+        if stats is None:
+            return super().execute(sql, parameters)
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.record_execute(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        stats = _current.get()
+        if stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.record_execute(sql, time.perf_counter() - started)
+
+    def _timed_fetch(self, fetch, *args):
+        stats = _current.get()
+        if stats is None or self._sql is None:
+            return fetch(*args)
+        started = time.perf_counter()
+        result = fetch(*args)
+        if isinstance(result, list):
+            rows = len(result)
+        else:
+            rows = 0 if result is None else 1
+        stats.record_fetch(self._sql, time.perf_counter() - started, rows)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def __next__(self):
+        stats = _current.get()
+        if stats is None or self._sql is None:
+            return super().__next__()
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            stats.record_fetch(self._sql, time.perf_counter() - started, 0)
+            raise
+        stats.record_fetch(self._sql, time.perf_counter() - started, 1)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose shortcut methods go through InstrumentedCursor"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        stats = _current.get()
+        if stats is None:
+            return super().commit()
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            stats.record_commit(time.perf_counter() - started)
+
+
+def enable():
+    """Open pooled connections as InstrumentedConnection from now on"""
+    set_connection_factory(InstrumentedConnection)
+
+
+def disable():
+    """Go back to plain connections"""
+    set_connection_factory(None)
+
+
+def start():
+    """
+    Begin collecting SQLite work done in the current context
+
+    Returns:
+        QueryStats: The collection, filled in as queries run
+    """
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def stop():
+    """
+    Stop collecting in the current context
+
+    Returns:
+        QueryStats: The finished collection, or None if none was active
+    """
+    stats = _current.get()
+    _current.set(None)
+    return stats
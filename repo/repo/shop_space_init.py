@@ -1,31 +1,18 @@
-import sqlite3
+import sys
 from pathlib import Path
 
 # Match the pattern from shop_space_functions.py
 # This file is in repo/repo/, so parent.parent.parent gets to project root
 DB_PATH = Path(__file__).parent.parent.parent / "db" / "shop_spaces.db"
 
-#SQL to create shop space
-DDL = """
-CREATE TABLE IF NOT EXISTS shop_spaces (
-  shop_id TEXT PRIMARY KEY,
-  username TEXT NOT NULL,
-  shop_name TEXT NOT NULL,
-  creation_timestamp TEXT NOT NULL,
-  length REAL NOT NULL,
-  width REAL NOT NULL,
-  height REAL NOT NULL,
-  equipment TEXT DEFAULT '[]'
-);
-"""
+# Schema lives in repo/migrations.py; reuse the module's initializer
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shop_space_functions import init_shop_spaces_db as _init_shop_spaces_db
 
 def init_shop_spaces_db(db_path: Path = DB_PATH):
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.execute("PRAGMA journal_mode = WAL;")
-        conn.executescript(DDL)
-        print(f"Initialized shop spaces database at {db_path}")
+    _init_shop_spaces_db(db_path)
+    print(f"Initialized shop spaces database at {db_path}")
 
 if __name__ == "__main__":
     init_shop_spaces_db()
@@ -1,60 +1,192 @@
 import sqlite3
 import json
+import hashlib
+import random
+import time
+from itertools import groupby
 from datetime import datetime
 from pathlib import Path
-from models.placement import Position, EquipmentPlacement 
+from models.placement import Position, EquipmentPlacement
+from models.spatial_index import Footprint, ShopSpatialIndex
+from connection_pool import get_connection
+from migrations import run_migrations
+from users_functions import get_user_id_by_username
+from pagination import clamp_limit, decode_cursor, page_result
+from write_queue import run_write
+from unified_db import unified_connection
 
 # Database paths - following existing project structure
 DB_PATH = Path(__file__).parent.parent / "db" / "shop_spaces.db"
-USERS_DB_PATH = Path(__file__).parent.parent / "db" / "users.db"
 EQUIPMENT_DB_PATH = Path(__file__).parent.parent / "db" / "equipment.db"
+# Schema is defined by the versioned steps in migrations.py
 
-# Database schema for shop spaces
-DDL = """
-CREATE TABLE IF NOT EXISTS shop_spaces (
-  shop_id TEXT PRIMARY KEY,
-  username TEXT NOT NULL,
-  shop_name TEXT NOT NULL,
-  creation_timestamp TEXT NOT NULL,
-  length REAL NOT NULL,
-  width REAL NOT NULL,
-  height REAL NOT NULL,
-  equipment TEXT DEFAULT '[]'
-);
-"""
+# Columns returned for each placement, in the order the old JSON blob used
+PLACEMENT_COLUMNS = "equipment_id, date_added, x_coordinate, y_coordinate, z_coordinate, rotation_deg"
+
+# Database files whose schema has been checked by this process
+_initialized_paths = set()
+
+# Writes that were checked against one shop version are retried this many
+# times when another writer gets there first, sleeping RETRY_BASE_DELAY
+# seconds (doubled each attempt, with jitter) in between
+WRITE_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.002
+
+class PlacementConflictError(ValueError):
+    """Raised when a validated placement overlaps other equipment or its clearance"""
+
+    def __init__(self, message, conflicts):
+        super().__init__(message)
+        self.conflicts = conflicts
+
+class ShopVersionConflictError(ValueError):
+    """Raised when a shop changed after the version a write was based on"""
+
+    def __init__(self, message, current_version):
+        super().__init__(message)
+        self.current_version = current_version
+
+class _VersionMoved(Exception):
+    """Internal signal that a compare-and-swap on shop_spaces.version lost"""
+
+    def __init__(self, current_version):
+        super().__init__(current_version)
+        self.current_version = current_version
 
 # Basic database connection functions
 def _connect(db_path):
-    """Create a database connection"""
-    conn = sqlite3.connect(db_path)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get this thread's pooled database connection"""
+    return get_connection(db_path)
 
 def _connect_shop_spaces():
-    """Create connection to shop spaces database"""
+    """Create connection to shop spaces database (schema is ensured once per process)"""
+    if str(DB_PATH) not in _initialized_paths:
+        init_shop_spaces_db(DB_PATH)
     return _connect(DB_PATH)
 
-def _connect_users():
-    """Create connection to users database for validation"""
-    return _connect(USERS_DB_PATH)
+def _write(work):
+    """Run work(conn) as one committed write to the shop spaces database (see write_queue.py)"""
+    _connect_shop_spaces()  # ensure the schema before any thread writes to the file
+    return run_write(DB_PATH, work)
 
 def _connect_equipment():
     """Create connection to equipment database for validation"""
     return _connect(EQUIPMENT_DB_PATH)
 
-def _row_to_dict(row):
-    """Convert SQLite row to dictionary with equipment parsing"""
+def _row_to_dict(row, placements=None):
+    """Convert SQLite row to dictionary, attaching its placements as 'equipment'"""
     if row is None:
         return None
     result = dict(row)
-    # Parse equipment JSON string back to list
-    if 'equipment' in result and result['equipment']:
-        result['equipment'] = json.loads(result['equipment'])
-    else:
-        result['equipment'] = []
+    result['equipment'] = placements if placements is not None else []
     return result
 
+def _placement_to_dict(row):
+    """Convert a shop_placements row to the placement dict shape"""
+    placement = dict(row)
+    placement.pop('shop_id', None)
+    return placement
+
+def _load_placements(conn, where="", params=()):
+    """
+    Load placements grouped by shop_id, in the order they were added
+
+    Args:
+        conn: Open shop spaces connection
+        where (str): Optional SQL condition on shop_placements (aliased p)
+        params (tuple): Parameters for the condition
+
+    Returns:
+        dict: shop_id -> list of placement dicts
+    """
+    sql = "SELECT p.* FROM shop_placements p"
+    if where:
+        sql += f" WHERE {where}"
+    sql += " ORDER BY p.rowid"
+    grouped = {}
+    for row in conn.execute(sql, params):
+        grouped.setdefault(row['shop_id'], []).append(_placement_to_dict(row))
+    return grouped
+
+def _shop_exists(conn, shop_id):
+    """Check if a shop space row exists"""
+    cursor = conn.execute("SELECT 1 FROM shop_spaces WHERE shop_id = ?", (shop_id,))
+    return cursor.fetchone() is not None
+
+def _bump_version(conn, shop_id):
+    """
+    Increment a shop's version; call inside the transaction that changes the shop
+
+    Returns:
+        sqlite3.Row: The updated shop_spaces row, or None if the shop does not exist
+    """
+    return conn.execute(
+        "UPDATE shop_spaces SET version = version + 1 WHERE shop_id = ? RETURNING *", (shop_id,)
+    ).fetchone()
+
+def _missing_or_moved(conn, shop_id):
+    """Raise the right error after a versioned UPDATE matched no shop row"""
+    current = conn.execute("SELECT version FROM shop_spaces WHERE shop_id = ?", (shop_id,)).fetchone()
+    if current is None:
+        raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+    raise _VersionMoved(current['version'])
+
+def _compare_and_bump(conn, shop_id, based_on):
+    """
+    Increment a shop's version only if it is still based_on (any version if None)
+
+    Call inside the write transaction, so a lost race rolls back the writes
+    made alongside it.
+
+    Returns:
+        sqlite3.Row: The updated shop_spaces row
+    """
+    if based_on is None:
+        row = _bump_version(conn, shop_id)
+    else:
+        row = conn.execute(
+            "UPDATE shop_spaces SET version = version + 1 WHERE shop_id = ? AND version = ? RETURNING *",
+            (shop_id, based_on)
+        ).fetchone()
+    if row is None:
+        _missing_or_moved(conn, shop_id)
+    return row
+
+def _based_on(read_version, expected_version):
+    """Version a write checked against read_version must swap from; fails fast on a stale caller"""
+    if expected_version is not None and read_version != expected_version:
+        raise _VersionMoved(read_version)
+    return read_version
+
+def _retry_versioned_write(shop_id, attempt, expected_version=None):
+    """
+    Run attempt() until its compare-and-swap on the shop version succeeds
+
+    attempt() re-reads whatever it checks, then writes and swaps the
+    version it read; it raises _VersionMoved if another writer committed in
+    between. That is retried up to WRITE_ATTEMPTS times with jittered
+    exponential backoff. When the caller pinned expected_version its own
+    view is stale, so the conflict is reported straight away.
+
+    Returns:
+        Whatever attempt() returns
+    """
+    for attempt_number in range(1, WRITE_ATTEMPTS + 1):
+        try:
+            return attempt()
+        except _VersionMoved as moved:
+            if expected_version is not None or attempt_number == WRITE_ATTEMPTS:
+                raise ShopVersionConflictError(
+                    f"Shop space '{shop_id}' was changed by another request (now at version {moved.current_version})",
+                    moved.current_version
+                )
+        time.sleep(RETRY_BASE_DELAY * 2 ** (attempt_number - 1) * random.uniform(0.5, 1.5))
+
+def _shop_with_placements(conn, shop_row):
+    """Build the shop dict from a row already in hand, reading its placements on the same connection"""
+    placements = _load_placements(conn, "p.shop_id = ?", (shop_row['shop_id'],))
+    return _row_to_dict(shop_row, placements.get(shop_row['shop_id'], []))
+
 def _generate_shop_id(username, shop_name):
     """Generate unique shop ID: username_shopname_timestamp"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -62,11 +194,9 @@ def _generate_shop_id(username, shop_name):
     return shop_id
 
 def _validate_username_exists(username):
-    """Check if username exists in users database"""
+    """Check if username exists in users database (cached)"""
     try:
-        with _connect_users() as conn:
-            cursor = conn.execute("SELECT username FROM users WHERE username = ?", (username,))
-            return cursor.fetchone() is not None
+        return get_user_id_by_username(username) is not None
     except Exception:
         return False
 
@@ -80,33 +210,123 @@ def _validate_equipment_exists(equipment_id):
         return False
 
 def _validate_equipment_belongs_to_user(equipment_id, username):
-    """Check if equipment exists and belongs to the user who owns the shop"""
+    """Check if equipment exists and belongs to the user who owns the shop (one query across users and equipment)"""
     try:
-        # First get user_id from username
-        with _connect_users() as conn:
-            cursor = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
-            user_row = cursor.fetchone()
-            if not user_row:
-                return False
-            user_id = user_row['id']
-
-        # Then check if equipment belongs to that user
-        with _connect_equipment() as conn:
-            cursor = conn.execute(
-                "SELECT id FROM user_equipment WHERE id = ? AND user_id = ?",
-                (equipment_id, user_id)
-            )
-            return cursor.fetchone() is not None
+        cursor = unified_connection().execute(
+            """SELECT 1 FROM equipment.user_equipment ue
+               JOIN users.users u ON u.id = ue.user_id
+               WHERE ue.id = ? AND u.username = ?""",
+            (equipment_id, username)
+        )
+        return cursor.fetchone() is not None
     except Exception:
         return False
 
+def _load_footprint_specs(equipment_ids):
+    """Get catalog width/depth/name/model for user equipment IDs in one query, keyed by ID"""
+    ids = list(equipment_ids)
+    if not ids:
+        return {}
+    with _connect_equipment() as conn:
+        cursor = conn.execute(
+            """SELECT ue.id, et.width, et.depth, et.equipment_name, et.model
+               FROM user_equipment ue
+               JOIN equipment_types et ON ue.equipment_type_id = et.id
+               WHERE ue.id IN (SELECT value FROM json_each(?))""",
+            (json.dumps(ids),)
+        )
+        return {row['id']: row for row in cursor}
+
+def _footprint(equipment_id, x, y, rotation_deg, spec):
+    """Build a Footprint from a position and its catalog spec row"""
+    return Footprint.from_inches(
+        equipment_id, x, y, spec['width'], spec['depth'],
+        rotation_deg, spec['equipment_name'], spec['model']
+    )
+
+def _build_spatial_index(shop, extra_ids=()):
+    """
+    Build a spatial index over a shop's placed equipment
+
+    Args:
+        shop (dict): Shop space data as returned by get_shop_space_by_id
+        extra_ids (iterable): Equipment IDs to also load specs for (e.g. one being added)
+
+    Returns:
+        tuple: (ShopSpatialIndex, dict of specs keyed by equipment ID)
+    """
+    placements = shop['equipment']
+    specs = _load_footprint_specs([p['equipment_id'] for p in placements] + list(extra_ids))
+    footprints = [
+        _footprint(p['equipment_id'], p['x_coordinate'], p['y_coordinate'], p['rotation_deg'], specs[p['equipment_id']])
+        for p in placements
+        if p['equipment_id'] in specs and p['x_coordinate'] is not None and p['y_coordinate'] is not None
+    ]
+    return ShopSpatialIndex(shop['width'], shop['length'], footprints), specs
+
+def _check_placement(index, footprint, validate):
+    """Raise PlacementConflictError if footprint conflicts with the indexed equipment"""
+    conflicts = index.check(footprint, validate)
+    if conflicts['collisions'] or conflicts['clearance']:
+        raise PlacementConflictError(
+            f"Equipment with ID {footprint.equipment_id} conflicts with other equipment in shop",
+            conflicts
+        )
+
+def _migrate_equipment_json(conn):
+    """
+    Move placements still stored in the legacy shop_spaces.equipment JSON
+    column into shop_placements.
+
+    Each shop is converted in its own short transaction so the migration can
+    run against a live database. The blob is only cleared if it has not been
+    changed since it was read. Duplicate equipment IDs keep the first entry,
+    which is the one the old update/remove code acted on.
+
+    Returns:
+        int: Number of shops converted
+    """
+    legacy_rows = conn.execute(
+        "SELECT shop_id, equipment FROM shop_spaces "
+        "WHERE equipment IS NOT NULL AND equipment NOT IN ('', '[]')"
+    ).fetchall()
+
+    converted = 0
+    for shop_id, equipment_json in legacy_rows:
+        try:
+            placements = json.loads(equipment_json)
+        except ValueError:
+            continue
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO shop_placements (shop_id, {PLACEMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        shop_id,
+                        eq['equipment_id'],
+                        eq.get('date_added'),
+                        eq.get('x_coordinate'),
+                        eq.get('y_coordinate'),
+                        eq.get('z_coordinate'),
+                        eq.get('rotation_deg', 0.0),
+                    )
+                    for eq in placements
+                ]
+            )
+            conn.execute(
+                "UPDATE shop_spaces SET equipment = '[]' WHERE shop_id = ? AND equipment = ?",
+                (shop_id, equipment_json)
+            )
+        converted += 1
+    return converted
+
 def init_shop_spaces_db(db_path: Path = DB_PATH):
-    """Initialize the shop spaces database with required tables"""
+    """Initialize the shop spaces database with required tables and migrate legacy placements"""
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.execute("PRAGMA journal_mode = WAL;")
-        conn.executescript(DDL)
+    conn = _connect(db_path)
+    run_migrations(conn, "shop_spaces")
+    _migrate_equipment_json(conn)
+    _initialized_paths.add(str(db_path))
 
 # SHOP SPACE CRUD FUNCTIONS
 
@@ -132,19 +352,17 @@ def create_shop_space(username, shop_name, length, width, height):
     shop_id = _generate_shop_id(username, shop_name)
     creation_timestamp = datetime.now().isoformat()
     
-    # Initialize database if it doesn't exist
-    init_shop_spaces_db()
-    
+    def write(conn):
+        return conn.execute(
+            """INSERT INTO shop_spaces 
+               (shop_id, username, shop_name, creation_timestamp, length, width, height, equipment) 
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               RETURNING *""",
+            (shop_id, username, shop_name, creation_timestamp, length, width, height, "[]")
+        ).fetchone()
+
     try:
-        with _connect_shop_spaces() as conn:
-            cursor = conn.execute(
-                """INSERT INTO shop_spaces 
-                   (shop_id, username, shop_name, creation_timestamp, length, width, height, equipment) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (shop_id, username, shop_name, creation_timestamp, length, width, height, "[]")
-            )
-            conn.commit()
-            return get_shop_space_by_id(shop_id)
+        return _row_to_dict(_write(write), []) # a new shop has no placements yet
     except sqlite3.IntegrityError as e:
         raise ValueError(f"Error creating shop space: {e}")
 
@@ -161,7 +379,10 @@ def get_shop_space_by_id(shop_id):
     with _connect_shop_spaces() as conn:
         cursor = conn.execute("SELECT * FROM shop_spaces WHERE shop_id = ?", (shop_id,))
         shop_space = cursor.fetchone()
-        return _row_to_dict(shop_space)
+        if shop_space is None:
+            return None
+        placements = _load_placements(conn, "p.shop_id = ?", (shop_id,))
+        return _row_to_dict(shop_space, placements.get(shop_id, []))
 
 def get_shop_spaces_by_username(username):
     """
@@ -179,77 +400,323 @@ def get_shop_spaces_by_username(username):
             (username,)
         )
         shop_spaces = cursor.fetchall()
-        return [_row_to_dict(space) for space in shop_spaces]
+        placements = _load_placements(
+            conn,
+            "p.shop_id IN (SELECT shop_id FROM shop_spaces WHERE username = ?)",
+            (username,)
+        )
+        return [_row_to_dict(space, placements.get(space['shop_id'], [])) for space in shop_spaces]
+
+def get_shop_spaces_page(username=None, limit=None, cursor=None):
+    """
+    Get one page of shop spaces, newest first, with keyset pagination
+
+    Pages are ordered by (creation_timestamp, shop_id) descending and the
+    cursor is the key of the last shop returned, so each page is an index
+    seek no matter how many shops come before it. Placements are loaded
+    for the shops on this page only.
+
+    Args:
+        username (str): Only list this user's shops; None lists every shop
+        limit (int): Page size (default and maximum come from pagination.py)
+        cursor (str): next_cursor from the previous page, or None for the first page
+
+    Returns:
+        dict: 'shops' list and 'next_cursor' (None on the last page)
+    """
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor, 2)
+
+    conditions, params = [], []
+    if username is not None:
+        conditions.append("username = ?")
+        params.append(username)
+    if after is not None:
+        conditions.append("(creation_timestamp, shop_id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with _connect_shop_spaces() as conn:
+        cursor = conn.execute(
+            f"""SELECT * FROM shop_spaces {where}
+                ORDER BY creation_timestamp DESC, shop_id DESC
+                LIMIT ?""",
+            (*params, limit + 1)
+        )
+        rows, next_cursor = page_result(
+            cursor.fetchall(), limit, lambda row: (row['creation_timestamp'], row['shop_id'])
+        )
+        placements = _load_placements(
+            conn,
+            "p.shop_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([row['shop_id'] for row in rows]),)
+        ) if rows else {}
+        shops = [_row_to_dict(row, placements.get(row['shop_id'], [])) for row in rows]
+    return {"shops": shops, "next_cursor": next_cursor}
+
+def get_shop_space_version(shop_id):
+    """
+    Get a shop's version counter without loading its placements
+
+    Args:
+        shop_id (str): Shop space identifier
+
+    Returns:
+        int: Version, bumped on every change to the shop or its placements; None if not found
+    """
+    with _connect_shop_spaces() as conn:
+        cursor = conn.execute("SELECT version FROM shop_spaces WHERE shop_id = ?", (shop_id,))
+        row = cursor.fetchone()
+        return row['version'] if row else None
+
+def get_shop_spaces_fingerprint(username):
+    """
+    Get a digest of which shops a user has and their versions
+
+    Changes whenever one of the user's shops is created, deleted or modified,
+    without reading any placements.
 
-def add_equipment_to_shop_space(shop_id, placement):
+    Args:
+        username (str): Shop owner
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha1(username.encode("utf-8"))
+    with _connect_shop_spaces() as conn:
+        cursor = conn.execute(
+            "SELECT shop_id, version FROM shop_spaces WHERE username = ? ORDER BY creation_timestamp DESC",
+            (username,)
+        )
+        for row in cursor:
+            digest.update(f"\0{row['shop_id']}:{row['version']}".encode("utf-8"))
+    return digest.hexdigest()
+
+def add_equipment_to_shop_space(shop_id, placement, validate=None, expected_version=None):
     """
     Add equipment to a shop space with placement coordinates
 
+    A validated placement is checked against the shop as read and only
+    written if the shop version has not moved since; otherwise the check is
+    redone (see _retry_versioned_write).
+
+    Args:
+        shop_id (str): Shop space identifier
+        placement (EquipmentPlacement): Equipment and where it goes
+        validate (str, optional): 'collision' or 'clearance' to reject conflicting placements
+        expected_version (int, optional): Shop version the caller's edit is based on;
+                                          ShopVersionConflictError if the shop has moved on
+
     Returns:
         dict: Updated shop space data or None if failed
     """
     # Validate shop space exists
-    shop_space = get_shop_space_by_id(shop_id)
-    if not shop_space:
+    with _connect_shop_spaces() as conn:
+        cursor = conn.execute("SELECT username FROM shop_spaces WHERE shop_id = ?", (shop_id,))
+        shop_row = cursor.fetchone()
+    if not shop_row:
         raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
 
     # Validate equipment exists and belongs to the shop owner
-    if not _validate_equipment_belongs_to_user(placement.equipment_id, shop_space['username']):
+    if not _validate_equipment_belongs_to_user(placement.equipment_id, shop_row['username']):
         raise ValueError(f"Equipment with ID {placement.equipment_id} does not exist or does not belong to user")
 
-    # Add to existing equipment list
-    current_equipment = shop_space['equipment']
-    current_equipment.append(placement.to_dict())
+    data = placement.to_dict()
+
+    def attempt():
+        based_on = expected_version
+        if validate:
+            shop = get_shop_space_by_id(shop_id)
+            based_on = _based_on(shop['version'], expected_version)
+            index, specs = _build_spatial_index(shop, [placement.equipment_id])
+            candidate = _footprint(
+                placement.equipment_id, placement.position.x, placement.position.y,
+                placement.rotation_deg, specs[placement.equipment_id]
+            )
+            _check_placement(index, candidate, validate)
+
+        def write(conn):
+            shop_row = _compare_and_bump(conn, shop_id, based_on)
+            conn.execute(
+                f"INSERT INTO shop_placements (shop_id, {PLACEMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    shop_id,
+                    data['equipment_id'],
+                    data['date_added'],
+                    data['x_coordinate'],
+                    data['y_coordinate'],
+                    data['z_coordinate'],
+                    data['rotation_deg'],
+                )
+            )
+            return _shop_with_placements(conn, shop_row)
+
+        return _write(write)
+
+    try:
+        return _retry_versioned_write(shop_id, attempt, expected_version)
+    except sqlite3.IntegrityError:
+        raise ValueError(f"Equipment with ID {placement.equipment_id} is already placed in shop")
+
+def _parse_bulk_placement(item):
+    """Coerce one uploaded placement (JSON or CSV strings) into typed values"""
+    if not isinstance(item, dict):
+        raise ValueError(f"Row must be an object, not {type(item).__name__}")
+
+    def number(name, default=None):
+        value = item.get(name)
+        if value is None or value == "":
+            if default is None:
+                raise ValueError(f"{name} is required")
+            return default
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number")
+
+    try:
+        equipment_id = int(item.get('equipment_id'))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid equipment ID {item.get('equipment_id')!r}")
+    return (
+        equipment_id,
+        number('x_coordinate'),
+        number('y_coordinate'),
+        number('z_coordinate', 0.0),
+        number('rotation_deg', 0.0),
+    )
+
+def bulk_place_equipment(shop_id, placements, validate=None):
+    """
+    Place many pieces of equipment in a shop in one transaction
 
-    # Update database with new equipment list
-    equipment_json = json.dumps(current_equipment)
+    Ownership of every piece is checked with a single set-based query
+    against the equipment database; valid rows go in with one executemany
+    and one commit, and the shop version is bumped once. With validate, the
+    batch is only written if the shop version has not moved since the
+    layout was read; otherwise it is checked again.
 
+    Args:
+        shop_id (str): Shop space identifier
+        placements (iterable): Dicts with 'equipment_id', 'x_coordinate', 'y_coordinate'
+                               and optional 'z_coordinate' and 'rotation_deg'
+        validate (str, optional): 'collision' or 'clearance' to skip rows that would conflict
+
+    Returns:
+        dict: 'placed' count and 'errors', a list of {'row', 'equipment_id', 'error'[, 'conflicts']}
+              for skipped rows (rows count from 1)
+    """
     with _connect_shop_spaces() as conn:
-        cursor = conn.execute(
-            "UPDATE shop_spaces SET equipment = ? WHERE shop_id = ?",
-            (equipment_json, shop_id)
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return get_shop_space_by_id(shop_id)
-        return None
+        cursor = conn.execute("SELECT username FROM shop_spaces WHERE shop_id = ?", (shop_id,))
+        shop_row = cursor.fetchone()
+    if not shop_row:
+        raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+
+    errors = []
+    parsed = []
+    for row_number, item in enumerate(placements, start=1):
+        try:
+            parsed.append((row_number, *_parse_bulk_placement(item)))
+        except ValueError as e:
+            equipment_id = item.get('equipment_id') if isinstance(item, dict) else None
+            errors.append({"row": row_number, "equipment_id": equipment_id, "error": str(e)})
+
+    # One query for ownership of every ID in the upload
+    owned = set()
+    user_id = get_user_id_by_username(shop_row['username'])
+    if parsed and user_id is not None:
+        with _connect_equipment() as conn:
+            cursor = conn.execute(
+                """SELECT id FROM user_equipment
+                   WHERE user_id = ? AND id IN (SELECT value FROM json_each(?))""",
+                (user_id, json.dumps([row[1] for row in parsed]))
+            )
+            owned = {row['id'] for row in cursor}
+
+    date_added = datetime.now().isoformat()
+
+    def attempt():
+        based_on = index = specs = None
+        if validate:
+            shop = get_shop_space_by_id(shop_id)
+            based_on = shop['version']
+            index, specs = _build_spatial_index(shop, owned)
+
+        attempt_errors = list(errors)
+        rows = []
+
+        def write(conn):
+            cursor = conn.execute("SELECT equipment_id FROM shop_placements WHERE shop_id = ?", (shop_id,))
+            placed_ids = {row['equipment_id'] for row in cursor}
+
+            for row_number, equipment_id, x, y, z, rotation_deg in parsed:
+                error = {"row": row_number, "equipment_id": equipment_id}
+                if equipment_id not in owned:
+                    attempt_errors.append({**error, "error": f"Equipment with ID {equipment_id} does not exist or does not belong to user"})
+                    continue
+                if equipment_id in placed_ids:
+                    attempt_errors.append({**error, "error": f"Equipment with ID {equipment_id} is already placed in shop"})
+                    continue
+                if index is not None:
+                    candidate = _footprint(equipment_id, x, y, rotation_deg, specs[equipment_id])
+                    try:
+                        _check_placement(index, candidate, validate)
+                    except PlacementConflictError as e:
+                        attempt_errors.append({**error, "error": str(e), "conflicts": e.conflicts})
+                        continue
+                    index.insert(candidate)
+                placed_ids.add(equipment_id)
+                rows.append((shop_id, equipment_id, date_added, x, y, z, rotation_deg))
 
-def remove_equipment_from_shop_space(shop_id, equipment_id):
+            if rows:
+                conn.executemany(
+                    f"INSERT INTO shop_placements (shop_id, {PLACEMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                _compare_and_bump(conn, shop_id, based_on)
+
+        _write(write)
+        attempt_errors.sort(key=lambda e: e['row'])
+        return {"placed": len(rows), "errors": attempt_errors}
+
+    return _retry_versioned_write(shop_id, attempt)
+
+def remove_equipment_from_shop_space(shop_id, equipment_id, expected_version=None):
     """
     Remove equipment from a shop space
     
     Args:
         shop_id (str): Shop space identifier
         equipment_id (int): Equipment ID to remove
+        expected_version (int, optional): Shop version the caller's edit is based on;
+                                          ShopVersionConflictError if the shop has moved on
         
     Returns:
         dict: Updated shop space data or None if failed
     """
-    shop_space = get_shop_space_by_id(shop_id)
-    if not shop_space:
-        raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
-    
-    # Filter out the equipment to remove
-    current_equipment = shop_space['equipment']
-    updated_equipment = [eq for eq in current_equipment if eq['equipment_id'] != equipment_id]
-    
-    # Update database
-    equipment_json = json.dumps(updated_equipment)
-    
-    with _connect_shop_spaces() as conn:
+    def write(conn):
         cursor = conn.execute(
-            "UPDATE shop_spaces SET equipment = ? WHERE shop_id = ?",
-            (equipment_json, shop_id)
+            "DELETE FROM shop_placements WHERE shop_id = ? AND equipment_id = ?",
+            (shop_id, equipment_id)
         )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return get_shop_space_by_id(shop_id)
-        return None
+        if cursor.rowcount > 0 or expected_version is not None:
+            shop_row = _compare_and_bump(conn, shop_id, expected_version)
+        else:
+            shop_row = conn.execute("SELECT * FROM shop_spaces WHERE shop_id = ?", (shop_id,)).fetchone()
+        if shop_row is None:
+            raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+        return _shop_with_placements(conn, shop_row)
+
+    return _retry_versioned_write(shop_id, lambda: _write(write), expected_version)
 
-def update_equipment_position(shop_id, equipment_id, x=None, y=None, z=None, rotation_deg=None):
+def update_equipment_position(shop_id, equipment_id, x=None, y=None, z=None, rotation_deg=None, validate=None,
+                              expected_version=None):
     """
     Update the position of equipment in a shop space
 
+    A validated move is checked against the shop as read and only written
+    if the shop version has not moved since; otherwise the check is redone.
+
     Args:
         shop_id (str): Shop space identifier
         equipment_id (int): Equipment ID to update
@@ -257,48 +724,355 @@ def update_equipment_position(shop_id, equipment_id, x=None, y=None, z=None, rot
         y (float, optional): New y coordinate
         z (float, optional): New z coordinate
         rotation_deg (float, optional): New rotation in degrees
+        validate (str, optional): 'collision' or 'clearance' to reject conflicting moves
+        expected_version (int, optional): Shop version the caller's edit is based on;
+                                          ShopVersionConflictError if the shop has moved on
 
     Returns:
         dict: Updated shop space data or None if failed
     """
-    shop_space = get_shop_space_by_id(shop_id)
-    if not shop_space:
+    def attempt():
+        based_on = expected_version
+        if validate:
+            shop_space = get_shop_space_by_id(shop_id)
+            if not shop_space:
+                raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+            based_on = _based_on(shop_space['version'], expected_version)
+            index, specs = _build_spatial_index(shop_space)
+            current = index.get(equipment_id)
+            if current is not None:
+                _check_placement(index, _footprint(
+                    equipment_id,
+                    x if x is not None else current.x,
+                    y if y is not None else current.y,
+                    rotation_deg if rotation_deg is not None else current.rotation_deg,
+                    specs[equipment_id]
+                ), validate)
+
+        def write(conn):
+            # Only the given fields change; COALESCE keeps the stored value otherwise
+            cursor = conn.execute(
+                """UPDATE shop_placements
+                   SET x_coordinate = COALESCE(?, x_coordinate),
+                       y_coordinate = COALESCE(?, y_coordinate),
+                       z_coordinate = COALESCE(?, z_coordinate),
+                       rotation_deg = COALESCE(?, rotation_deg)
+                   WHERE shop_id = ? AND equipment_id = ?""",
+                (x, y, z, rotation_deg, shop_id, equipment_id)
+            )
+            if cursor.rowcount == 0:
+                if not _shop_exists(conn, shop_id):
+                    raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+                raise ValueError(f"Equipment with ID {equipment_id} not found in shop")
+            return _shop_with_placements(conn, _compare_and_bump(conn, shop_id, based_on))
+
+        return _write(write)
+
+    return _retry_versioned_write(shop_id, attempt, expected_version)
+
+def _apply_position_updates(conn, shop_id, updates, index=None, specs=None, validate=None):
+    """
+    Write position updates for placed equipment inside the caller's transaction
+
+    Reads the shop's placed equipment IDs once and writes every valid update
+    with a single executemany. With an index (and validate), each update is
+    checked against the layout including the updates accepted before it.
+    The shop version is left to the caller.
+
+    Returns:
+        tuple: (results, wrote) - one result dict per update, and whether any row was written
+    """
+    cursor = conn.execute("SELECT equipment_id FROM shop_placements WHERE shop_id = ?", (shop_id,))
+    placed_ids = {row['equipment_id'] for row in cursor}
+
+    results = []
+    rows = []
+    for update in updates:
+        equipment_id = update.get('equipment_id')
+        if equipment_id is None:
+            results.append({"equipment_id": None, "success": False, "error": "Equipment ID is required"})
+            continue
+        if equipment_id not in placed_ids:
+            results.append({
+                "equipment_id": equipment_id,
+                "success": False,
+                "error": f"Equipment with ID {equipment_id} not found in shop"
+            })
+            continue
+        current = index.get(equipment_id) if index is not None else None
+        if current is not None:
+            # Check against the layout including the updates accepted so far
+            moved = _footprint(
+                equipment_id,
+                update['x'] if update.get('x') is not None else current.x,
+                update['y'] if update.get('y') is not None else current.y,
+                update['rotation_deg'] if update.get('rotation_deg') is not None else current.rotation_deg,
+                specs[equipment_id]
+            )
+            try:
+                _check_placement(index, moved, validate)
+            except PlacementConflictError as e:
+                results.append({
+                    "equipment_id": equipment_id,
+                    "success": False,
+                    "error": str(e),
+                    "conflicts": e.conflicts
+                })
+                continue
+            index.insert(moved)
+        rows.append((
+            update.get('x'),
+            update.get('y'),
+            update.get('z'),
+            update.get('rotation_deg'),
+            shop_id,
+            equipment_id,
+        ))
+        results.append({"equipment_id": equipment_id, "success": True, "error": None})
+
+    if rows:
+        conn.executemany(
+            """UPDATE shop_placements
+               SET x_coordinate = COALESCE(?, x_coordinate),
+                   y_coordinate = COALESCE(?, y_coordinate),
+                   z_coordinate = COALESCE(?, z_coordinate),
+                   rotation_deg = COALESCE(?, rotation_deg)
+               WHERE shop_id = ? AND equipment_id = ?""",
+            rows
+        )
+    return results, bool(rows)
+
+def update_equipment_positions(shop_id, updates, validate=None, expected_version=None):
+    """
+    Update the positions of many pieces of equipment in one transaction
+
+    Reads the shop's placed equipment IDs once, writes every valid update
+    with a single executemany and commits once. Validated updates are only
+    written if the shop version has not moved since it was read; otherwise
+    the whole batch is checked again.
+
+    Args:
+        shop_id (str): Shop space identifier
+        updates (list): Dicts with 'equipment_id' and any of 'x', 'y', 'z', 'rotation_deg'
+        validate (str, optional): 'collision' or 'clearance' to fail updates that would conflict
+        expected_version (int, optional): Shop version the caller's edit is based on;
+                                          ShopVersionConflictError if the shop has moved on
+
+    Returns:
+        list: One dict per update with 'equipment_id', 'success' and 'error' (None on success);
+              updates rejected by validation also carry 'conflicts'
+    """
+    def attempt():
+        based_on = expected_version
+        index = specs = None
+        if validate:
+            shop_space = get_shop_space_by_id(shop_id)
+            if shop_space:
+                based_on = _based_on(shop_space['version'], expected_version)
+                index, specs = _build_spatial_index(shop_space)
+
+        def write(conn):
+            if not _shop_exists(conn, shop_id):
+                raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+            results, wrote = _apply_position_updates(conn, shop_id, updates, index, specs, validate)
+            if wrote:
+                _compare_and_bump(conn, shop_id, based_on)
+            return results
+
+        return _write(write)
+
+    return _retry_versioned_write(shop_id, attempt, expected_version)
+
+# Operations accepted by apply_layout_patch
+LAYOUT_OPERATIONS = ("move", "rotate", "add", "remove")
+
+def _parse_layout_operation(number, operation):
+    """
+    Check one layout patch operation and coerce its values (JSON numbers or numeric strings)
+
+    Args:
+        number (int): Position of the operation in the patch, from 1, for error messages
+        operation (dict): {'op', 'equipment_id', ...}
+
+    Returns:
+        tuple: (op, equipment_id, values) where values maps 'x', 'y', 'z', 'rotation_deg' to floats or None
+    """
+    if not isinstance(operation, dict):
+        raise ValueError(f"Operation {number} must be an object")
+    kind = operation.get('op')
+    if kind not in LAYOUT_OPERATIONS:
+        raise ValueError(f"Operation {number}: op must be one of {', '.join(LAYOUT_OPERATIONS)}")
+    try:
+        equipment_id = int(operation.get('equipment_id'))
+    except (TypeError, ValueError):
+        raise ValueError(f"Operation {number}: invalid equipment ID {operation.get('equipment_id')!r}")
+
+    def number_field(name, required=False, default=None):
+        value = operation.get(name)
+        if value is None or value == "":
+            if required:
+                raise ValueError(f"Operation {number}: {name} is required")
+            return default
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Operation {number}: {name} must be a number")
+
+    values = {"x": None, "y": None, "z": None, "rotation_deg": None}
+    if kind == 'move':
+        values.update(x=number_field('x'), y=number_field('y'), z=number_field('z'))
+        if values['x'] is None and values['y'] is None and values['z'] is None:
+            raise ValueError(f"Operation {number}: move needs at least one of x, y, z")
+    elif kind == 'rotate':
+        values['rotation_deg'] = number_field('rotation_deg', required=True)
+    elif kind == 'add':
+        values.update(
+            x=number_field('x', required=True),
+            y=number_field('y', required=True),
+            z=number_field('z', default=0.0),
+            rotation_deg=number_field('rotation_deg', default=0.0),
+        )
+    return kind, equipment_id, values
+
+def _owned_by_shop_owner(shop_id, equipment_ids):
+    """
+    Which of equipment_ids belong to the owner of a shop, in one query across the three databases
+
+    Returns:
+        set: Owned IDs (ValueError if the shop does not exist)
+    """
+    rows = unified_connection().execute(
+        """SELECT ue.id FROM shop_spaces.shop_spaces s
+           LEFT JOIN users.users u ON u.username = s.username
+           LEFT JOIN equipment.user_equipment ue
+                  ON ue.user_id = u.id AND ue.id IN (SELECT value FROM json_each(?))
+           WHERE s.shop_id = ?""",
+        (json.dumps(sorted(equipment_ids)), shop_id)
+    ).fetchall()
+    if not rows:
         raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+    return {row['id'] for row in rows if row['id'] is not None}
 
-    # Find and update the equipment
-    current_equipment = shop_space['equipment']
-    equipment_found = False
-
-    for eq in current_equipment:
-        if eq['equipment_id'] == equipment_id:
-            equipment_found = True
-            if x is not None:
-                eq['x_coordinate'] = x
-            if y is not None:
-                eq['y_coordinate'] = y
-            if z is not None:
-                eq['z_coordinate'] = z
-            if rotation_deg is not None:
-                eq['rotation_deg'] = rotation_deg
-            break
-
-    if not equipment_found:
-        raise ValueError(f"Equipment with ID {equipment_id} not found in shop")
-
-    # Update database
-    equipment_json = json.dumps(current_equipment)
+def _check_layout_patch(index, specs, parsed, validate):
+    """Replay a parsed patch on a spatial index, raising PlacementConflictError at the first conflict"""
+    for kind, equipment_id, values in parsed:
+        if kind == 'remove':
+            index.remove(equipment_id)
+            continue
+        current = index.get(equipment_id)
+        if kind == 'add':
+            x, y, rotation_deg = values['x'], values['y'], values['rotation_deg']
+        elif current is None:
+            continue  # not placed (the write reports it) or no catalog spec to check against
+        else:
+            x = values['x'] if values['x'] is not None else current.x
+            y = values['y'] if values['y'] is not None else current.y
+            rotation_deg = values['rotation_deg'] if values['rotation_deg'] is not None else current.rotation_deg
+        footprint = _footprint(equipment_id, x, y, rotation_deg, specs[equipment_id])
+        _check_placement(index, footprint, validate)
+        index.insert(footprint)
+
+def apply_layout_patch(shop_id, operations, base_version, validate=None):
+    """
+    Apply a list of placement operations to a shop as one versioned change
+
+    Operations run in order in one transaction, and if any of them fails
+    none is applied. The shop must still be at base_version; otherwise
+    ShopVersionConflictError reports the current version and nothing is
+    written. Only the placements the patch touches are written and read
+    back, so the work follows the size of the patch, not of the shop
+    (validate needs the whole layout, though).
+
+    Operations are dicts with 'op' and 'equipment_id':
+        move    any of 'x', 'y', 'z'
+        rotate  'rotation_deg'
+        add     'x', 'y' and optional 'z', 'rotation_deg'; the equipment must belong to the shop owner
+        remove  nothing else
+
+    Args:
+        shop_id (str): Shop space identifier
+        operations (list): Operations as above
+        base_version (int): Shop version the client's edits are based on
+        validate (str, optional): 'collision' or 'clearance' to reject a patch that causes a conflict
+
+    Returns:
+        dict: 'shop_id', the new 'version', 'placements' (final state of every added, moved or
+              rotated placement, in placement order) and 'removed' (IDs no longer placed)
+    """
+    if base_version is None:
+        raise ValueError("base_version is required")
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations must be a non-empty list")
+    parsed = [_parse_layout_operation(number, operation) for number, operation in enumerate(operations, start=1)]
+
+    added = {equipment_id for kind, equipment_id, values in parsed if kind == 'add'}
+    if added:
+        missing = sorted(added - _owned_by_shop_owner(shop_id, added))
+        if missing:
+            raise ValueError(f"Equipment with ID {missing[0]} does not exist or does not belong to user")
+
+    touched = list(dict.fromkeys(equipment_id for kind, equipment_id, values in parsed))
+    date_added = datetime.now().isoformat()
+
+    def write(conn):
+        shop_row = _compare_and_bump(conn, shop_id, base_version)
+        for number, (kind, equipment_id, values) in enumerate(parsed, start=1):
+            if kind == 'add':
+                try:
+                    conn.execute(
+                        f"INSERT INTO shop_placements (shop_id, {PLACEMENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (shop_id, equipment_id, date_added, values['x'], values['y'], values['z'], values['rotation_deg'])
+                    )
+                except sqlite3.IntegrityError:
+                    raise ValueError(f"Operation {number}: Equipment with ID {equipment_id} is already placed in shop")
+                continue
+            if kind == 'remove':
+                cursor = conn.execute(
+                    "DELETE FROM shop_placements WHERE shop_id = ? AND equipment_id = ?", (shop_id, equipment_id)
+                )
+            else:
+                # Only the given fields change; COALESCE keeps the stored value otherwise
+                cursor = conn.execute(
+                    """UPDATE shop_placements
+                       SET x_coordinate = COALESCE(?, x_coordinate),
+                           y_coordinate = COALESCE(?, y_coordinate),
+                           z_coordinate = COALESCE(?, z_coordinate),
+                           rotation_deg = COALESCE(?, rotation_deg)
+                       WHERE shop_id = ? AND equipment_id = ?""",
+                    (values['x'], values['y'], values['z'], values['rotation_deg'], shop_id, equipment_id)
+                )
+            if cursor.rowcount == 0:
+                raise ValueError(f"Operation {number}: Equipment with ID {equipment_id} not found in shop")
 
-    with _connect_shop_spaces() as conn:
         cursor = conn.execute(
-            "UPDATE shop_spaces SET equipment = ? WHERE shop_id = ?",
-            (equipment_json, shop_id)
+            f"""SELECT {PLACEMENT_COLUMNS} FROM shop_placements
+                WHERE shop_id = ? AND equipment_id IN (SELECT value FROM json_each(?))
+                ORDER BY rowid""",
+            (shop_id, json.dumps(touched))
         )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return get_shop_space_by_id(shop_id)
-        return None
+        placements = [dict(row) for row in cursor]
+        placed = {placement['equipment_id'] for placement in placements}
+        return {
+            "shop_id": shop_id,
+            "version": shop_row['version'],
+            "placements": placements,
+            "removed": [equipment_id for equipment_id in touched if equipment_id not in placed],
+        }
 
-def update_shop_space_dimensions(shop_id, length=None, width=None, height=None, shop_name=None):
+    def attempt():
+        if validate:
+            shop = get_shop_space_by_id(shop_id)
+            if not shop:
+                raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+            _based_on(shop['version'], base_version)
+            index, specs = _build_spatial_index(shop, added)
+            _check_layout_patch(index, specs, parsed, validate)
+        return _write(write)
+
+    return _retry_versioned_write(shop_id, attempt, base_version)
+
+def update_shop_space_dimensions(shop_id, length=None, width=None, height=None, shop_name=None,
+                                 expected_version=None):
     """
     Update room dimensions and name of a shop space
 
@@ -308,29 +1082,73 @@ def update_shop_space_dimensions(shop_id, length=None, width=None, height=None,
         width (float, optional): New width dimension
         height (float, optional): New height dimension
         shop_name (str, optional): New shop name
+        expected_version (int, optional): Shop version the caller's edit is based on;
+                                          ShopVersionConflictError if the shop has moved on
 
     Returns:
         dict: Updated shop space data or None if failed
     """
-    shop_space = get_shop_space_by_id(shop_id)
-    if not shop_space:
-        raise ValueError(f"Shop space with ID '{shop_id}' does not exist")
+    shop, _ = update_shop_space(shop_id, length, width, height, shop_name, expected_version=expected_version)
+    return shop
 
-    # Use existing values if new ones not provided
-    new_length = length if length is not None else shop_space['length']
-    new_width = width if width is not None else shop_space['width']
-    new_height = height if height is not None else shop_space['height']
-    new_shop_name = shop_name if shop_name is not None else shop_space['shop_name']
+def update_shop_space(shop_id, length=None, width=None, height=None, shop_name=None,
+                      equipment_positions=None, validate=None, expected_version=None):
+    """
+    Update a shop's dimensions and name and move its equipment in one transaction
 
-    with _connect_shop_spaces() as conn:
-        cursor = conn.execute(
-            "UPDATE shop_spaces SET shop_name = ?, length = ?, width = ?, height = ? WHERE shop_id = ?",
-            (new_shop_name, new_length, new_width, new_height, shop_id)
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            return get_shop_space_by_id(shop_id)
-        return None
+    The shop row, the position updates and the version bump commit together,
+    so a version conflict leaves all of them unsaved. Validated position
+    updates are checked against the resized room.
+
+    Args:
+        shop_id (str): Shop space identifier
+        length, width, height (float, optional): New dimensions
+        shop_name (str, optional): New shop name
+        equipment_positions (list, optional): Position updates as for update_equipment_positions
+        validate (str, optional): 'collision' or 'clearance' to fail position updates that would conflict
+        expected_version (int, optional): Shop version the caller's edit is based on;
+                                          ShopVersionConflictError if the shop has moved on
+
+    Returns:
+        tuple: (shop dict after the update, position update results as for update_equipment_positions)
+    """
+    def attempt():
+        based_on = expected_version
+        index = specs = None
+        if equipment_positions and validate:
+            shop_space = get_shop_space_by_id(shop_id)
+            if shop_space:
+                based_on = _based_on(shop_space['version'], expected_version)
+                resized = dict(shop_space)
+                if length is not None:
+                    resized['length'] = length
+                if width is not None:
+                    resized['width'] = width
+                index, specs = _build_spatial_index(resized)
+
+        def write(conn):
+            # Only the given fields change; COALESCE keeps the stored value otherwise
+            row = conn.execute(
+                """UPDATE shop_spaces
+                   SET shop_name = COALESCE(?, shop_name),
+                       length = COALESCE(?, length),
+                       width = COALESCE(?, width),
+                       height = COALESCE(?, height),
+                       version = version + 1
+                   WHERE shop_id = ? AND (? IS NULL OR version = ?)
+                   RETURNING *""",
+                (shop_name, length, width, height, shop_id, based_on, based_on)
+            ).fetchone()
+            if row is None:
+                _missing_or_moved(conn, shop_id)
+            results = []
+            if equipment_positions:
+                results, _ = _apply_position_updates(conn, shop_id, equipment_positions, index, specs, validate)
+            return _shop_with_placements(conn, row), results
+
+        return _write(write)
+
+    return _retry_versioned_write(shop_id, attempt, expected_version)
 
 def delete_shop_space(shop_id):
     """
@@ -342,11 +1160,29 @@ def delete_shop_space(shop_id):
     Returns:
         bool: True if deleted successfully, False otherwise
     """
-    with _connect_shop_spaces() as conn:
+    def write(conn):
         cursor = conn.execute("DELETE FROM shop_spaces WHERE shop_id = ?", (shop_id,))
-        conn.commit()
         return cursor.rowcount > 0
 
+    return _write(write)
+
+def get_shop_conflicts(shop_id):
+    """
+    Find every collision and clearance problem in a shop
+
+    Args:
+        shop_id (str): Shop space identifier
+
+    Returns:
+        dict: 'shop_id', 'collisions' ([id, other_id] pairs) and 'clearance_issue_ids',
+              or None if the shop does not exist
+    """
+    shop_space = get_shop_space_by_id(shop_id)
+    if not shop_space:
+        return None
+    index, _ = _build_spatial_index(shop_space)
+    return {"shop_id": shop_id, **index.conflicts()}
+
 def get_all_shop_spaces():
     """
     Get all shop spaces in the database
@@ -354,10 +1190,38 @@ def get_all_shop_spaces():
     Returns:
         list: List of all shop spaces
     """
+    return list(iter_all_shop_spaces())
+
+def iter_all_shop_spaces():
+    """
+    Yield every shop space, newest first, reading rows lazily
+
+    One LEFT JOIN walks the shops in (creation_timestamp, shop_id) index
+    order with each shop's placements next to it, so only one shop is held
+    in memory at a time.
+
+    Yields:
+        dict: Shop space with its 'equipment' placements
+    """
+    placement_columns = [column.strip() for column in PLACEMENT_COLUMNS.split(",")]
+    aliased = ", ".join(f"p.{column} AS p_{column}" for column in placement_columns)
     with _connect_shop_spaces() as conn:
-        cursor = conn.execute("SELECT * FROM shop_spaces ORDER BY creation_timestamp DESC")
-        shop_spaces = cursor.fetchall()
-        return [_row_to_dict(space) for space in shop_spaces]
+        cursor = conn.execute(
+            f"""SELECT s.*, {aliased}
+                FROM shop_spaces s
+                LEFT JOIN shop_placements p ON p.shop_id = s.shop_id
+                ORDER BY s.creation_timestamp DESC, s.shop_id DESC, p.rowid"""
+        )
+        for shop_id, rows in groupby(cursor, key=lambda row: row['shop_id']):
+            placements = []
+            shop = None
+            for row in rows:
+                if shop is None:
+                    shop = {key: row[key] for key in row.keys() if not key.startswith("p_")}
+                if row['p_equipment_id'] is not None:
+                    placements.append({column: row[f"p_{column}"] for column in placement_columns})
+            shop['equipment'] = placements
+            yield shop
 
 # Initialize database when module is imported
 if __name__ == "__main__":
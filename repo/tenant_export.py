@@ -0,0 +1,308 @@
+import base64
+import json
+import math
+import sys
+from array import array
+from datetime import datetime
+
+import equipment_library_db
+import shop_space_functions
+from users_functions import get_user_id_by_username
+from unified_db import unified_connection, unified_snapshot
+
+# Export and import of one user's shops and equipment
+#
+# An export is a stream of JSON records, one per line, always in this order:
+#   header            format, version, source username, export time
+#   equipment_type    catalog rows the user's equipment refers to
+#   user_equipment    the user's equipment
+#   shop_space        the user's shops (without placements)
+#   placement         one placed tool                 (format 'ndjson')
+#   placement_columns up to CHUNK_SIZE placements of one shop as columns
+#                     (format 'columnar'; ids and coordinates are base64
+#                     array('q') / array('d') buffers, NaN meaning null)
+#
+# Both databases are read inside one read transaction on a dedicated read-only
+# unified connection (unified_db.unified_snapshot), so equipment and shops
+# come from the same point in time, and rows are streamed from the cursor
+# rather than collected. Placements of equipment no longer in the user's
+# library are left out, so every export can be imported.
+#
+# The importer consumes the same stream in order, remapping IDs as it goes:
+# equipment types are matched by name (and created when missing), equipment
+# and shops get new IDs on the target, and placements follow those mappings.
+# It writes through the unified connection (unified_db.py), so the whole
+# import is one transaction over both files.
+
+FORMAT_NAME = "setupshop-export"
+FORMAT_VERSION = 1
+CHUNK_SIZE = 1000
+
+_COLUMN_TYPES = {
+    "equipment_id": "q",
+    "x_coordinate": "d",
+    "y_coordinate": "d",
+    "z_coordinate": "d",
+    "rotation_deg": "d",
+}
+
+
+def _encode_column(values, typecode):
+    if typecode == "d":
+        values = [math.nan if value is None else value for value in values]
+    return base64.b64encode(array(typecode, values).tobytes()).decode("ascii")
+
+
+def _decode_column(text, typecode, byteorder):
+    column = array(typecode)
+    column.frombytes(base64.b64decode(text))
+    if byteorder != sys.byteorder:
+        column.byteswap()
+    if typecode == "d":
+        return [None if math.isnan(value) else value for value in column]
+    return column.tolist()
+
+
+def _placement_chunks(shop_id, placements):
+    """Group one shop's placement rows into columnar records of up to CHUNK_SIZE rows"""
+    chunk = []
+    for row in placements:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield _columns_record(shop_id, chunk)
+            chunk = []
+    if chunk:
+        yield _columns_record(shop_id, chunk)
+
+
+def _columns_record(shop_id, rows):
+    record = {"type": "placement_columns", "shop_id": shop_id, "count": len(rows), "byteorder": sys.byteorder}
+    for name, typecode in _COLUMN_TYPES.items():
+        record[name] = _encode_column([row[name] for row in rows], typecode)
+    record["date_added"] = [row["date_added"] for row in rows]
+    return record
+
+
+def iter_export_records(username, fmt="ndjson"):
+    """
+    Stream a user's shops and equipment as export records
+
+    Args:
+        username (str): User to export
+        fmt (str): 'ndjson' for one record per placement, 'columnar' for chunked columns
+
+    Yields:
+        dict: Export records in the order described at the top of this module
+    """
+    if fmt not in ("ndjson", "columnar"):
+        raise ValueError(f"Unknown export format '{fmt}'")
+    user_id = get_user_id_by_username(username)
+    if user_id is None:
+        raise ValueError(f"Username '{username}' does not exist in users database")
+
+    yield {
+        "type": "header",
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "username": username,
+        "exported_at": datetime.now().isoformat(),
+        "placement_format": fmt,
+    }
+
+    conn = unified_snapshot()
+    try:
+        cursor = conn.execute(
+            """SELECT * FROM equipment.equipment_types
+               WHERE id IN (SELECT equipment_type_id FROM equipment.user_equipment WHERE user_id = ?)
+               ORDER BY id""",
+            (user_id,)
+        )
+        for row in cursor:
+            yield {"type": "equipment_type", **dict(row)}
+        cursor = conn.execute(
+            "SELECT * FROM equipment.user_equipment WHERE user_id = ? ORDER BY id", (user_id,)
+        )
+        for row in cursor:
+            yield {"type": "user_equipment", **dict(row)}
+
+        cursor = conn.execute(
+            """SELECT shop_id, username, shop_name, creation_timestamp, length, width, height
+               FROM shop_spaces.shop_spaces WHERE username = ? ORDER BY creation_timestamp, shop_id""",
+            (username,)
+        )
+        shop_ids = []
+        for row in cursor:
+            shop_ids.append(row["shop_id"])
+            yield {"type": "shop_space", **dict(row)}
+        for shop_id in shop_ids:
+            # Deleting equipment leaves its placements behind (there is no
+            # cascade across files), so only placements of exported equipment go out
+            placements = conn.execute(
+                f"""SELECT {shop_space_functions.PLACEMENT_COLUMNS} FROM shop_spaces.shop_placements
+                    WHERE shop_id = ?
+                      AND equipment_id IN (SELECT id FROM equipment.user_equipment WHERE user_id = ?)
+                    ORDER BY rowid""",
+                (shop_id, user_id)
+            )
+            if fmt == "columnar":
+                yield from _placement_chunks(shop_id, placements)
+            else:
+                for row in placements:
+                    yield {"type": "placement", "shop_id": shop_id, **dict(row)}
+    finally:
+        conn.close()
+
+
+def write_export(username, fp, fmt="ndjson"):
+    """
+    Write a user's export to a text file object, one JSON record per line
+
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+    for record in iter_export_records(username, fmt):
+        fp.write(json.dumps(record, separators=(",", ":"), default=str))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def read_export(fp):
+    """Yield export records from a text file object written by write_export"""
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _expand_placements(record):
+    """Turn a placement or placement_columns record into placement dicts"""
+    if record["type"] == "placement":
+        yield record
+        return
+    byteorder = record.get("byteorder", sys.byteorder)
+    columns = {
+        name: _decode_column(record[name], typecode, byteorder)
+        for name, typecode in _COLUMN_TYPES.items()
+    }
+    for i in range(record["count"]):
+        placement = {name: columns[name][i] for name in _COLUMN_TYPES}
+        placement["date_added"] = record["date_added"][i]
+        placement["shop_id"] = record["shop_id"]
+        yield placement
+
+
+def import_records(records, username):
+    """
+    Load an export stream into this instance under an existing user
+
+    Equipment rows, shops and placements are written in one transaction
+    across the equipment and shop databases; if anything fails, nothing is
+    written to either. In WAL mode the two files still commit one after the
+    other, so a crash in the middle of the commit can leave equipment
+    imported without its shops (see unified_db.py).
+
+    Args:
+        records (iterable): Export records in export order (e.g. read_export(fp))
+        username (str): Target user; need not match the exported username
+
+    Returns:
+        dict: Counts of imported 'equipment_types' (created), 'user_equipment',
+              'shop_spaces' and 'placements', plus 'shop_ids' mapping old to new shop IDs
+    """
+    user_id = get_user_id_by_username(username)
+    if user_id is None:
+        raise ValueError(f"Username '{username}' does not exist in users database")
+
+    records = iter(records)
+    header = next(records, None)
+    if not header or header.get("type") != "header" or header.get("format") != FORMAT_NAME:
+        raise ValueError("Not a setupshop export")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported export version {header.get('version')}")
+    same_user = header.get("username") == username
+
+    type_ids, equipment_ids, shop_ids = {}, {}, {}
+    counts = {"equipment_types": 0, "user_equipment": 0, "shop_spaces": 0, "placements": 0}
+    changed_shops = set()
+
+    conn = unified_connection()
+    try:
+        for record in records:
+            kind = record.get("type")
+            if kind == "equipment_type":
+                # Looked up on the import connection, which sees the types inserted so far
+                existing = conn.execute(
+                    "SELECT id FROM equipment.equipment_types WHERE equipment_name = ?", (record["equipment_name"],)
+                ).fetchone()
+                if existing is None:
+                    cursor = conn.execute(
+                        """INSERT INTO equipment.equipment_types (equipment_name, description, width, height, depth,
+                               maintenance_interval_days, color, manufacturer, model, image_path)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (record["equipment_name"], record.get("description"), record["width"], record["height"],
+                         record["depth"], record["maintenance_interval_days"], record.get("color") or "#aaa",
+                         record.get("manufacturer"), record.get("model"), record.get("image_path"))
+                    )
+                    type_ids[record["id"]] = cursor.lastrowid
+                    counts["equipment_types"] += 1
+                else:
+                    type_ids[record["id"]] = existing["id"]
+            elif kind == "user_equipment":
+                if record["equipment_type_id"] not in type_ids:
+                    raise ValueError(f"Equipment {record['id']} refers to a type missing from the export")
+                cursor = conn.execute(
+                    """INSERT INTO equipment.user_equipment (equipment_type_id, user_id, date_purchased,
+                           last_maintenance_date, next_maintenance_date, notes)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (type_ids[record["equipment_type_id"]], user_id, record["date_purchased"],
+                     record.get("last_maintenance_date"), record.get("next_maintenance_date"), record.get("notes"))
+                )
+                equipment_ids[record["id"]] = cursor.lastrowid
+                counts["user_equipment"] += 1
+            elif kind == "shop_space":
+                new_id = record["shop_id"] if same_user else shop_space_functions._generate_shop_id(username, record["shop_name"])
+                candidate, suffix = new_id, 1
+                while shop_space_functions._shop_exists(conn, candidate):
+                    suffix += 1
+                    candidate = f"{new_id}_{suffix}"
+                conn.execute(
+                    """INSERT INTO shop_spaces.shop_spaces
+                       (shop_id, username, shop_name, creation_timestamp, length, width, height, equipment)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, '[]')""",
+                    (candidate, username, record["shop_name"], record["creation_timestamp"],
+                     record["length"], record["width"], record["height"])
+                )
+                shop_ids[record["shop_id"]] = candidate
+                counts["shop_spaces"] += 1
+            elif kind in ("placement", "placement_columns"):
+                rows = []
+                for placement in _expand_placements(record):
+                    if placement["shop_id"] not in shop_ids or placement["equipment_id"] not in equipment_ids:
+                        raise ValueError("Placement refers to a shop or equipment missing from the export")
+                    rows.append((
+                        shop_ids[placement["shop_id"]], equipment_ids[placement["equipment_id"]],
+                        placement["date_added"], placement["x_coordinate"], placement["y_coordinate"],
+                        placement["z_coordinate"], placement["rotation_deg"],
+                    ))
+                conn.executemany(
+                    f"""INSERT INTO shop_spaces.shop_placements (shop_id, {shop_space_functions.PLACEMENT_COLUMNS})
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    rows
+                )
+                changed_shops.add(shop_ids[record["shop_id"]])
+                counts["placements"] += len(rows)
+            else:
+                raise ValueError(f"Unknown export record type '{kind}'")
+
+        for shop_id in changed_shops:
+            shop_space_functions._bump_version(conn, shop_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        equipment_library_db._catalog_cache.invalidate()
+
+    return {**counts, "shop_ids": shop_ids}
@@ -0,0 +1,86 @@
+import sqlite3
+from pathlib import Path
+
+from connection_pool import get_connection
+
+# One connection that sees all three database files
+#
+# users.db, equipment.db and shop_spaces.db stay separate files, each with
+# its own migrations and (with write_queue.py) its own writer. A unified
+# connection opens an in-memory main database and ATTACHes the three files
+# under the schema names below, so one statement can JOIN users, equipment
+# and shops, and one transaction can change more than one file. Tables are
+# written schema-qualified (equipment.user_equipment, shop_spaces.shop_placements).
+#
+# Atomicity across files: SQLite only commits a multi-file transaction
+# atomically (through a super-journal) in rollback-journal mode. These files
+# run in WAL, where each file commits on its own at the end of the
+# transaction. So an error before COMMIT rolls back every file, and no
+# reader ever sees half of one file's changes. But a crash or power loss
+# in the middle of COMMIT can leave one file committed and another not, and
+# for a moment a reader of both files can see the first file's changes
+# without the second's.
+#
+# Unified writes take the write lock of every file they touch on the calling
+# thread; they do not go through the per-file write queue.
+
+SCHEMAS = ("users", "equipment", "shop_spaces")
+
+
+def _attachments():
+    """(schema, file) pairs for the current database paths, with every schema ensured"""
+    # Imported here: these modules import this one
+    import users_functions
+    import equipment_library_db
+    import shop_space_functions
+
+    users_functions._connect()
+    equipment_library_db._connect()
+    shop_space_functions._connect_shop_spaces()
+    return (
+        ("users", users_functions.DB_PATH),
+        ("equipment", equipment_library_db.DB_PATH),
+        ("shop_spaces", shop_space_functions.DB_PATH),
+    )
+
+
+def unified_connection():
+    """This thread's pooled connection with users, equipment and shop_spaces attached"""
+    return get_connection(":memory:", _attachments())
+
+
+def unified_snapshot():
+    """
+    Open a dedicated read-only unified connection holding one read transaction
+
+    The read transaction is started on every attached file by the same
+    statement, so queries on the connection see each file as of that moment
+    until the connection is closed. Meant for long reads (exports) that
+    should neither hold a pooled connection nor see writes made meanwhile.
+
+    Returns:
+        sqlite3.Connection: Caller closes it when done
+    """
+    attachments = _attachments()
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    for schema, path in attachments:
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (f"{Path(path).resolve().as_uri()}?mode=ro",))
+    conn.execute("BEGIN")
+    conn.execute("SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {schema}.sqlite_master)" for schema in SCHEMAS))
+    return conn
+
+
+def run_unified_write(work):
+    """
+    Run work(conn) in one transaction on the unified connection and commit it
+
+    Args:
+        work (callable): work(conn) -> result; uses schema-qualified tables and must not commit
+
+    Returns:
+        Whatever work returned; if work raises, every attached file is rolled back
+    """
+    conn = unified_connection()
+    with conn:
+        return work(conn)
@@ -1,24 +1,23 @@
-import sqlite3
 from pathlib import Path
+from connection_pool import get_connection
+from migrations import run_migrations
 
 DB_PATH = Path(__file__).parent.parent / "db" / "users.db"
-DDL = """
-CREATE TABLE IF NOT EXISTS users (
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  username TEXT NOT NULL UNIQUE,
-  name TEXT NOT NULL,
-  email TEXT NOT NULL UNIQUE,
-  password TEXT NOT NULL,
-  shop_spaces TEXT DEFAULT '[]'
-);
-"""
+# Schema is defined by the versioned steps in migrations.py
+
+# Database files whose schema has been checked by this process
+_initialized_paths = set()
 
 def init_db(db_path: Path = DB_PATH):
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.execute("PRAGMA journal_mode = WAL;")
-        conn.executescript(DDL)
+    conn = get_connection(db_path)
+    run_migrations(conn, "users")
+    _initialized_paths.add(str(db_path))
+
+def ensure_db(db_path: Path = DB_PATH):
+    """Run init_db the first time this process touches db_path"""
+    if str(db_path) not in _initialized_paths:
+        init_db(db_path)
 
 if __name__ == "__main__":
     init_db()
@@ -1,24 +1,26 @@
 import sqlite3, json
-import hashlib
 from pathlib import Path
+from connection_pool import get_connection
+from users_db import ensure_db
+from identity_cache import identity_cache
+from password_hashing import hash_password, verify_password, needs_rehash
+from pagination import clamp_limit, decode_cursor, page_result
 
 DB_PATH = Path(__file__).parent.parent / "db" / "users.db"
 
 #basic functions -------------------------------------------------------------------
-#create new connection to the database, ensure foreign keys are enabled, configure row_factory to return dict-like rows
+#get this thread's pooled connection (PRAGMAs and dict-like row_factory are set once by the pool)
 def _connect():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.row_factory = sqlite3.Row
-    return conn
+    ensure_db(DB_PATH)
+    return get_connection(DB_PATH)
 
-#passowrd hashing function for security
+#password hashing function: salted scrypt/PBKDF2 from password_hashing, run on its bounded pool
 def _hash_password(password):
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return hash_password(password)
 
-#function to compare hashed password to plaintext password
+#function to compare hashed password to plaintext password (also accepts legacy SHA-256 hashes)
 def _verify_password(stored_password, provided_password):
-    return stored_password == _hash_password(provided_password) 
+    return verify_password(stored_password, provided_password)
 
 #row to dict conversion function 
 def _row_to_dict(row):
@@ -39,30 +41,35 @@ def _row_to_dict(row):
 def add_user(username, name, email, password):
     hashed_password = _hash_password(password)
     with _connect() as conn:
-        cursor = conn.execute(
-            "INSERT INTO users (username, name, email, password) VALUES (?, ?, ?, ?)",
+        #RETURNING hands back the stored row, so there is no second SELECT
+        user = conn.execute(
+            "INSERT INTO users (username, name, email, password) VALUES (?, ?, ?, ?) RETURNING *",
             (username, name, email, hashed_password)
-        )
+        ).fetchone()
         conn.commit()
-        user_id = cursor.lastrowid
-        user = get_user_by_id(user_id)
+        identity_cache.put(user['id'], username) #replaces any stale entry for a re-used name
         return _row_to_dict(user) #convert row to dict and return user data
 
 #function to authenticate a user
 def auth_user(identifier, password):
     try:
         with _connect() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM users WHERE username = ? OR email = ?", #allow login by username or email
-                (identifier, identifier)
-            )
-            user = cursor.fetchone()
+            #allow login by username or email; two lookups so each one uses its UNIQUE index (an OR scans the table)
+            user = conn.execute("SELECT * FROM users WHERE username = ?", (identifier,)).fetchone()
+            if user is None:
+                user = conn.execute("SELECT * FROM users WHERE email = ?", (identifier,)).fetchone()
             if not user:
                 return None # User not found
-            if _verify_password(user['password'], password): #verify password 
-                user = _row_to_dict(user)
-                return user #convert row to dict and return user data
-            return None
+            if not _verify_password(user['password'], password): #verify password
+                return None
+            if needs_rehash(user['password']):
+                #upgrade legacy or lower-cost hashes now that we know the plaintext; skip if it changed meanwhile
+                conn.execute(
+                    "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                    (_hash_password(password), user['id'], user['password'])
+                )
+                conn.commit()
+            return _row_to_dict(user) #convert row to dict and return user data
     except sqlite3.IntegrityError as e:
         print("Error: duplicate username or email.", e)
         return None
@@ -76,17 +83,96 @@ def delete_user(user_id):
             (user_id,)
         )
         conn.commit()
+        identity_cache.invalidate(user_id=user_id)
         return cursor.rowcount > 0  # Return True if a row was deleted
 
-#function to search for users whose username or name contains the query string
-def check_usernames(search_term):
+#columns returned by user searches (everything but the password)
+SEARCH_COLUMNS = "u.id, u.username, u.name, u.email, u.shop_spaces"
+SEARCH_DEFAULT_LIMIT = 20
+
+#function to search for users whose username or name contains the query string, best matches first
+def check_usernames(search_term, limit=SEARCH_DEFAULT_LIMIT):
+    return search_users(search_term, limit=limit)
+
+#ranked user search
+#mode 'contains' matches anywhere in username or name through the trigram FTS index (terms under
+#3 characters have no trigrams, so they fall back to a LIKE walk over the username index, stopping at limit);
+#mode 'prefix' is autocomplete on the start of the username, a range seek on the NOCASE username index
+def search_users(search_term, limit=SEARCH_DEFAULT_LIMIT, mode="contains"):
+    limit = clamp_limit(limit)
+    search_term = (search_term or "").strip()
+    if not search_term:
+        return []
     with _connect() as conn:
-        cursor = conn.execute(
-            "SELECT * FROM users WHERE username LIKE ? OR name LIKE ?", #search for partial matches
-            (f"%{search_term}%", f"%{search_term}%")
-        )
-        users = cursor.fetchall()
-        return [_row_to_dict(user) for user in users] #convert each row to dict and return list of users
+        if mode == "prefix":
+            cursor = conn.execute(
+                f"""SELECT {SEARCH_COLUMNS} FROM users u
+                    WHERE u.username >= ? COLLATE NOCASE AND u.username < ? COLLATE NOCASE
+                    ORDER BY u.username COLLATE NOCASE
+                    LIMIT ?""",
+                (search_term, search_term + "\U0010ffff", limit)
+            )
+        elif mode != "contains":
+            raise ValueError(f"Unknown search mode '{mode}'")
+        elif len(search_term) >= 3:
+            phrase = '"' + search_term.replace('"', '""') + '"' #quote so FTS syntax in the term is literal
+            cursor = conn.execute(
+                f"""SELECT {SEARCH_COLUMNS} FROM users_search
+                    JOIN users u ON u.id = users_search.rowid
+                    WHERE users_search MATCH ?
+                    ORDER BY bm25(users_search, 2.0, 1.0), u.username
+                    LIMIT ?""",
+                (phrase, limit)
+            )
+        else:
+            cursor = conn.execute(
+                f"""SELECT {SEARCH_COLUMNS} FROM users u
+                    WHERE u.username LIKE ? OR u.name LIKE ?
+                    ORDER BY u.username COLLATE NOCASE
+                    LIMIT ?""",
+                (f"%{search_term}%", f"%{search_term}%", limit)
+            )
+        return [_row_to_dict(user) for user in cursor]
+
+#function to list every user lazily (for seeding and admin scripts), in id order
+def iter_users():
+    with _connect() as conn:
+        for user in conn.execute("SELECT * FROM users ORDER BY id"):
+            yield _row_to_dict(user)
+
+#function to count users without loading them
+def count_users():
+    with _connect() as conn:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+#one page of check_usernames results in username order; the cursor is the last username returned
+#terms of 3+ characters are matched through the trigram FTS index like search_users; shorter ones walk the username index
+def check_usernames_page(search_term, limit=None, cursor=None):
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor, 1)
+    after = after[0] if after else ""
+    search_term = (search_term or "").strip()
+    with _connect() as conn:
+        if len(search_term) >= 3:
+            phrase = '"' + search_term.replace('"', '""') + '"' #quote so FTS syntax in the term is literal
+            cursor = conn.execute(
+                f"""SELECT {SEARCH_COLUMNS} FROM users_search
+                    JOIN users u ON u.id = users_search.rowid
+                    WHERE users_search MATCH ? AND u.username > ?
+                    ORDER BY u.username
+                    LIMIT ?""",
+                (phrase, after, limit + 1)
+            )
+        else:
+            cursor = conn.execute(
+                f"""SELECT {SEARCH_COLUMNS} FROM users u
+                    WHERE (u.username LIKE ? OR u.name LIKE ?) AND u.username > ?
+                    ORDER BY u.username
+                    LIMIT ?""",
+                (f"%{search_term}%", f"%{search_term}%", after, limit + 1)
+            )
+        rows, next_cursor = page_result(cursor.fetchall(), limit, lambda row: (row['username'],))
+        return {"users": [_row_to_dict(user) for user in rows], "next_cursor": next_cursor}
 
 #function to get user by id
 def get_user_by_id(user_id):
@@ -98,4 +184,34 @@ def get_user_by_id(user_id):
         user = cursor.fetchone()
         return _row_to_dict(user) #convert row to dict and return user data
 
-    
\ No newline at end of file
+    
+
+#function to turn a username into a user id, served from the identity cache when possible
+def get_user_id_by_username(username):
+    user_id = identity_cache.user_id_for(username)
+    if user_id is not None:
+        return user_id
+    with _connect() as conn:
+        cursor = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
+        row = cursor.fetchone()
+    if row is None:
+        return None # unknown users are not cached so new sign-ups are seen immediately
+    identity_cache.put(row['id'], username)
+    return row['id']
+
+#function to turn a user id into a username, served from the identity cache when possible
+def get_username_by_id(user_id):
+    username = identity_cache.username_for(user_id)
+    if username is not None:
+        return username
+    with _connect() as conn:
+        cursor = conn.execute("SELECT username FROM users WHERE id = ?", (user_id,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    identity_cache.put(user_id, row['username'])
+    return row['username']
+
+#function to check a user id exists
+def user_exists(user_id):
+    return get_username_by_id(user_id) is not None
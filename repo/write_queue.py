@@ -0,0 +1,263 @@
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from connection_pool import get_connection
+
+# Group commit for database writes
+#
+# Mutations are written as work(conn) callables that run their statements
+# on conn and return a result without committing. run_write() either runs
+# one on the calling thread and commits it straight away (the default), or,
+# once the queue is enabled, hands it to the single writer thread of its
+# database file and waits for the result.
+#
+# A writer thread takes the first queued write, keeps collecting for up to
+# the batch window (or until the batch is full), and runs the whole batch in
+# one BEGIN IMMEDIATE ... COMMIT. Each write gets its own SAVEPOINT, so a
+# write that raises is rolled back alone and its caller gets the exception
+# while the rest of the batch commits. Callers are only answered after the
+# COMMIT, so a result always describes durable data and a read made after
+# run_write() returns sees the write. Under load the cost of taking the
+# write lock and committing is paid once per batch instead of once per
+# request, and writers never wait on each other through busy_timeout.
+# Each write runs in a copy of its caller's contextvars context, so request
+# profiling (query_metrics.py) still counts its statements; the shared
+# BEGIN, SAVEPOINT and COMMIT of a batch belong to no single request.
+#
+# Configuration (environment, read once at import):
+#   WRITE_QUEUE            '1' to send writes through the writer threads (default off)
+#   WRITE_QUEUE_WINDOW_MS  how long a batch waits for more writes after its first (default 2)
+#   WRITE_QUEUE_MAX_BATCH  most writes committed together (default 64)
+
+WINDOW = float(os.environ.get("WRITE_QUEUE_WINDOW_MS", 2)) / 1000
+MAX_BATCH = int(os.environ.get("WRITE_QUEUE_MAX_BATCH", 64))
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    One writer thread committing queued writes to one database file in batches
+
+    Args:
+        db_path (Path | str): Database file
+        window (float): Seconds a batch waits for more writes after its first
+        max_batch (int): Most writes committed in one transaction
+    """
+
+    def __init__(self, db_path, window=WINDOW, max_batch=MAX_BATCH):
+        self.db_key = str(db_path)
+        self.window = window
+        self.max_batch = max_batch
+        self._jobs = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._batches = 0
+        self._writes = 0
+        self._failed = 0
+        self._largest_batch = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"write-queue-{Path(self.db_key).stem}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, work):
+        """
+        Queue work(conn) for the next batch
+
+        Returns:
+            concurrent.futures.Future: Resolved with work's result (or exception) once its batch has committed
+        """
+        future = Future()
+        context = contextvars.copy_context()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Write queue for {self.db_key} is shut down")
+            self._jobs.put((work, future, context))
+        return future
+
+    def on_writer_thread(self):
+        """True when called from this queue's writer thread"""
+        return threading.current_thread() is self._thread
+
+    def shutdown(self, wait=True):
+        """Commit whatever is queued, then stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._jobs.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Past the window, still take whatever is already waiting
+                    job = self._jobs.get(timeout=remaining) if remaining > 0 else self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        """Run a batch in one transaction, each write in its own savepoint, then answer the callers"""
+        outcomes = []  # (future, result, error)
+        conn = None
+        try:
+            conn = get_connection(self.db_key)
+            conn.execute("BEGIN IMMEDIATE")
+            for work, future, context in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT queued_write")
+                try:
+                    result = context.run(work, conn)
+                except Exception as e:
+                    if not conn.in_transaction:
+                        # SQLite rolled back the whole transaction (e.g. disk full)
+                        raise
+                    conn.execute("ROLLBACK TO queued_write")
+                    conn.execute("RELEASE queued_write")
+                    outcomes.append((future, None, e))
+                else:
+                    conn.execute("RELEASE queued_write")
+                    outcomes.append((future, result, None))
+            conn.commit()
+        except Exception as e:
+            try:
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                pass
+            # Nothing in the batch was written
+            for work, future, context in batch:
+                if not future.done():
+                    future.set_exception(e)
+            with self._lock:
+                self._batches += 1
+                self._failed += len(batch)
+            return
+
+        failed = 0
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+                failed += 1
+        with self._lock:
+            self._batches += 1
+            self._writes += len(outcomes)
+            self._failed += failed
+            self._largest_batch = max(self._largest_batch, len(batch))
+
+    def stats(self):
+        """
+        Get queue counters for monitoring
+
+        Returns:
+            dict: batches committed, writes run and failed, average and largest batch size
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "writes": self._writes,
+                "failed": self._failed,
+                "average_batch": round(self._writes / self._batches, 2) if self._batches else 0,
+                "largest_batch": self._largest_batch,
+            }
+
+
+_enabled = os.environ.get("WRITE_QUEUE") == "1"
+_settings = {"window": WINDOW, "max_batch": MAX_BATCH}
+_queues = {}  # db key -> WriteQueue
+_queues_lock = threading.Lock()
+
+
+def enable(window=None, max_batch=None):
+    """Send writes through the writer threads from now on, optionally changing the batch settings"""
+    global _enabled
+    if window is not None:
+        _settings["window"] = window
+    if max_batch is not None:
+        _settings["max_batch"] = max_batch
+    _enabled = True
+
+
+def disable():
+    """Commit writes on the calling thread again; queued writes still finish"""
+    global _enabled
+    _enabled = False
+    shutdown_all()
+
+
+def is_enabled():
+    """True if writes go through the writer threads"""
+    return _enabled
+
+
+def _queue_for(db_path):
+    key = str(db_path)
+    with _queues_lock:
+        write_queue = _queues.get(key)
+        if write_queue is None:
+            write_queue = _queues[key] = WriteQueue(key, **_settings)
+        return write_queue
+
+
+def run_write(db_path, work):
+    """
+    Run work(conn) as a committed write to db_path
+
+    Args:
+        db_path (Path | str): Database file the write changes
+        work (callable): work(conn) -> result; runs its statements on conn and must not commit
+
+    Returns:
+        Whatever work returned, after its transaction has committed
+    """
+    if not _enabled:
+        conn = get_connection(db_path)
+        with conn:
+            return work(conn)
+    write_queue = _queue_for(db_path)
+    if write_queue.on_writer_thread():
+        # Already inside this file's batch transaction
+        return work(get_connection(db_path))
+    return write_queue.submit(work).result()
+
+
+def write_queue_stats():
+    """Get whether the queue is on and counters for each database's writer thread"""
+    with _queues_lock:
+        queues = dict(_queues)
+    return {
+        "enabled": _enabled,
+        "queues": {Path(key).stem: write_queue.stats() for key, write_queue in queues.items()},
+    }
+
+
+def shutdown_all():
+    """Commit what is queued and stop every writer thread"""
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for write_queue in queues:
+        write_queue.shutdown()
@@ -9,7 +9,7 @@ if repo_path.exists():
 else:
     sys.path.insert(0, str(Path(__file__).parent))
 
-from users_functions import add_user, check_usernames
+from users_functions import add_user, count_users
 from equipment_library_db import (
     add_equipment_type, add_equipment_to_user, perform_maintenance,
     get_equipment_catalog, get_equipment_by_user
@@ -22,8 +22,7 @@ def seed_database():
     """Seed all databases with sample data"""
     
     # Check if already seeded
-    existing_users = check_usernames("")  # Empty string matches all users
-    if existing_users:
+    if count_users():
         print("Db already seeded")
         return
 
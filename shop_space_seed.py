@@ -7,7 +7,7 @@ repo_path = Path(__file__).parent / "repo"
 sys.path.insert(0, str(repo_path))
 
 from shop_space_functions import create_shop_space, get_all_shop_spaces
-from users_functions import check_usernames  # Use this to get all users
+from users_functions import iter_users
 
 # List of random shop names to assign
 SHOP_NAMES = [
@@ -25,8 +25,7 @@ def seed_shop_spaces():
         print(f"Shop spaces already seeded ({len(existing_shops)} spaces found)")
         return
     
-    # Get all users by searching for empty string (matches all users)
-    users = check_usernames("")
+    users = list(iter_users())
     if not users:
         print("No users found. Run seed.py first to create users")
         return
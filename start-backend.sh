@@ -18,4 +18,9 @@ echo "Starting server on http://localhost:5001"
 echo "Press Ctrl+C to stop"
 echo ""
 
+# ./start-backend.sh --prod runs gunicorn instead of the dev server
+if [ "$1" = "--prod" ]; then
+    exec gunicorn -c gunicorn.conf.py wsgi:app
+fi
+
 python3 server.py